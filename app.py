@@ -1,17 +1,83 @@
-from flask import Flask, render_template, request, jsonify
+import hashlib
+import json
+import os
+from functools import lru_cache, wraps
+from time import perf_counter
+
+from flask import Flask, Response, abort, g, render_template, request, jsonify, stream_with_context
+from werkzeug.exceptions import RequestEntityTooLarge
+import artifacts
+from assets import IMMUTABLE_MAX_AGE, Asset, AssetManifest
+from messages import DEFAULT_LANGUAGE, LANGUAGES
+from metrics import metrics
+from passphrase import PassphraseGenerator, Wordlist
+from policies import PolicyRegistry
+from ratelimit import SharedMemoryLimiter, TokenBucketLimiter, retry_after_header
+from result_cache import ResultCache, estimate_summary
+from sessions import SessionStore
 from validator import PasswordValidator
 
 app = Flask(__name__)
+# Índice offline de filtraciones (ver breach_index.py); sin él se usa la lista de comunes
+app.config['BREACH_INDEX_PATH'] = os.environ.get('BREACH_INDEX_PATH')
+# Diccionario de palabras comunes buscadas como subcadenas (ver dictionary.py)
+app.config['DICTIONARY_PATH'] = os.environ.get('DICTIONARY_PATH')
+# Autómatas, tablas de caracteres y diccionario precompilados (ver artifacts.py);
+# si el archivo trae diccionario se usa cuando no hay DICTIONARY_PATH
+app.config['VALIDATOR_ARTIFACTS_PATH'] = os.environ.get('VALIDATOR_ARTIFACTS_PATH')
+# Archivo JSON/TOML con políticas con nombre; se recarga al cambiar en disco
+app.config['POLICY_FILE'] = os.environ.get('PASSWORD_POLICY_FILE')
+# Caché de resultados de /validate (clave HMAC, nunca la contraseña en claro)
+app.config['RESULT_CACHE_ENABLED'] = os.environ.get('RESULT_CACHE_ENABLED', '1') != '0'
+app.config['RESULT_CACHE_SIZE'] = int(os.environ.get('RESULT_CACHE_SIZE', 10000))
+app.config['RESULT_CACHE_TTL'] = float(os.environ.get('RESULT_CACHE_TTL', 300))
+# Sesiones de validación incremental (en memoria, por proceso)
+app.config['SESSION_MAX'] = int(os.environ.get('VALIDATION_SESSION_MAX', 10000))
+app.config['SESSION_TTL'] = float(os.environ.get('VALIDATION_SESSION_TTL', 300))
+# Caracteres máximos de la contraseña de una sesión; las ediciones que lo superan dan 400
+app.config['SESSION_MAX_LENGTH'] = int(os.environ.get('VALIDATION_SESSION_MAX_LENGTH', 4096))
+# Máximo de contraseñas por petición a /generate con count
+app.config['GENERATE_MAX_COUNT'] = int(os.environ.get('GENERATE_MAX_COUNT', 100000))
+# Longitud máxima de las contraseñas de /generate (acota también count × length)
+app.config['GENERATE_MAX_LENGTH'] = int(os.environ.get('GENERATE_MAX_LENGTH', 1024))
+# Lista de palabras de passphrase.py para /generate con mode=passphrase
+app.config['PASSPHRASE_WORDLIST'] = os.environ.get('PASSPHRASE_WORDLIST')
+# Métricas Prometheus en /metrics; con 0 no se instrumenta nada
+app.config['METRICS_ENABLED'] = os.environ.get('METRICS_ENABLED', '1') != '0'
+# Límite por IP en /validate (también las sesiones) y /generate: RATE peticiones/s con ráfagas de BURST.
+# Con RATE_LIMIT_SHARED_PATH los workers comparten los cubos en ese archivo
+app.config['RATE_LIMIT_ENABLED'] = os.environ.get('RATE_LIMIT_ENABLED', '1') != '0'
+app.config['RATE_LIMIT_RATE'] = float(os.environ.get('RATE_LIMIT_RATE', 50))
+app.config['RATE_LIMIT_BURST'] = float(os.environ.get('RATE_LIMIT_BURST', 300))
+app.config['RATE_LIMIT_SHARED_PATH'] = os.environ.get('RATE_LIMIT_SHARED_PATH')
+# Segundos que el navegador puede reutilizar /policy sin revalidar (ETag)
+app.config['POLICY_MAX_AGE'] = int(os.environ.get('POLICY_MAX_AGE', 300))
+# Segundos de caché de los recursos con huella en /assets/ (nunca cambian de contenido)
+app.config['ASSET_MAX_AGE'] = int(os.environ.get('ASSET_MAX_AGE', IMMUTABLE_MAX_AGE))
+# Máximo de contraseñas por petición a /validate/lookup
+app.config['LOOKUP_MAX_BATCH'] = int(os.environ.get('LOOKUP_MAX_BATCH', 64))
+# Bytes máximos del cuerpo de una petición; con Content-Length mayor se responde
+# 413 sin leerlo. /validate/batch (NDJSON en streaming) tiene su propio límite
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_CONTENT_LENGTH', 64 * 1024))
+app.config['BATCH_MAX_CONTENT_LENGTH'] = int(os.environ.get('BATCH_MAX_CONTENT_LENGTH',
+                                                            4 * 1024 * 1024))
+# Contraseñas máximas por petición a /validate/batch; cada BATCH_RATE_CHUNK
+# contraseñas se cobra una ficha más del límite por IP
+app.config['BATCH_MAX_ITEMS'] = int(os.environ.get('BATCH_MAX_ITEMS', 10000))
+app.config['BATCH_RATE_CHUNK'] = int(os.environ.get('BATCH_RATE_CHUNK', 100))
 
-@app.route('/')
-def index():
-    return render_template('index.html')
+# Se instalan antes de compilar cualquier política para que todas usen las tablas mapeadas
+validator_artifacts = None
+if app.config['VALIDATOR_ARTIFACTS_PATH']:
+    validator_artifacts = artifacts.install(app.config['VALIDATOR_ARTIFACTS_PATH'])
+# Mapeada una vez; los workers comparten las páginas del archivo
+passphrase_wordlist = None
+if app.config['PASSPHRASE_WORDLIST']:
+    passphrase_wordlist = Wordlist(app.config['PASSPHRASE_WORDLIST'])
+
+def create_policy_registry():
+    registry = PolicyRegistry(app.config['POLICY_FILE'])
 
-@app.route('/validate', methods=['POST'])
-def validate():
-    data = request.get_json()
-    password = data.get('password', '')
-    
     # Crear esquema de validación
     validator = PasswordValidator()
     validator.min_length(8)\
@@ -21,45 +87,423 @@ def validate():
              .has_digits(1)\
              .has_symbols(1)\
              .no_spaces()
-    
-    is_valid, results, score = validator.validate(password)
-    
-    return jsonify({
+    if app.config['BREACH_INDEX_PATH']:
+        validator.check_breaches(app.config['BREACH_INDEX_PATH'])
+    if app.config['DICTIONARY_PATH']:
+        validator.check_dictionary(app.config['DICTIONARY_PATH'])
+    elif validator_artifacts is not None and 'dictionary' in validator_artifacts:
+        validator.check_dictionary(validator_artifacts.dictionary())
+    registry.register('validate', validator)
+
+    generator = PasswordValidator()
+    generator.min_length(8)\
+             .has_uppercase(2)\
+             .has_lowercase(2)\
+             .has_digits(2)\
+             .has_symbols(1)
+    registry.register('generate', generator)
+    return registry
+
+# Políticas compiladas una vez y compartidas por todas las peticiones
+policies = create_policy_registry()
+result_cache = ResultCache(app.config['RESULT_CACHE_SIZE'], app.config['RESULT_CACHE_TTL'])
+validation_sessions = SessionStore(app.config['SESSION_MAX'], app.config['SESSION_TTL'],
+                                   app.config['SESSION_MAX_LENGTH'])
+if app.config['METRICS_ENABLED']:
+    metrics.install()
+
+def create_rate_limiter():
+    if not app.config['RATE_LIMIT_ENABLED']:
+        return None
+    rate, burst = app.config['RATE_LIMIT_RATE'], app.config['RATE_LIMIT_BURST']
+    if app.config['RATE_LIMIT_SHARED_PATH']:
+        return SharedMemoryLimiter(app.config['RATE_LIMIT_SHARED_PATH'], rate, burst)
+    return TokenBucketLimiter(rate, burst)
+
+rate_limiter = create_rate_limiter()
+
+# CSS y JS con huella en el nombre, comprimidos una vez al arrancar
+assets = AssetManifest(os.path.join(app.root_path, 'static'))
+app.jinja_env.globals['asset_url'] = assets.url
+
+def rate_limited(view):
+    @wraps(view)
+    def limited_view(*args, **kwargs):
+        if rate_limiter is not None:
+            allowed, retry_after = rate_limiter.acquire(request.remote_addr or '')
+            if not allowed:
+                response = jsonify({'error': 'demasiadas peticiones, inténtalo más tarde'})
+                response.status_code = 429
+                response.headers['Retry-After'] = retry_after_header(retry_after)
+                return response
+        return view(*args, **kwargs)
+    return limited_view
+
+@app.errorhandler(RequestEntityTooLarge)
+def request_too_large(error):
+    limit = request.max_content_length
+    return jsonify({'error': f'el cuerpo de la petición supera {limit} bytes'}), 413
+
+@app.before_request
+def start_request_timer():
+    if app.config['METRICS_ENABLED']:
+        g.request_started = perf_counter()
+
+@app.after_request
+def observe_request_latency(response):
+    # En las respuestas en streaming mide hasta el primer byte
+    started = g.pop('request_started', None)
+    if started is not None:
+        metrics.observe_request(request.endpoint or 'unknown', request.method,
+                                response.status_code, perf_counter() - started)
+    return response
+
+def assess_password(policy, password, context=None):
+    # (resultado compacto, estimación por patrones); en caché van juntos
+    if app.config['RESULT_CACHE_ENABLED']:
+        return result_cache.assess(policy, password, context)
+    result = policy.compact(password, context)
+    return result, estimate_summary(password, result.overlong)
+
+@lru_cache(maxsize=1)
+def index_page():
+    # La página no depende de la petición: se renderiza y comprime una vez
+    return Asset(render_template('index.html').encode('utf-8'), 'text/html; charset=utf-8')
+
+@app.route('/')
+def index():
+    return index_page().response(request)
+
+@app.route('/assets/<path:filename>')
+def asset(filename):
+    static_asset = assets.get(filename)
+    if static_asset is None:
+        abort(404)
+    return static_asset.response(request, app.config['ASSET_MAX_AGE'], immutable=True)
+
+def estimate_score(estimate):
+    return None if estimate is None else estimate['score']
+
+def validation_response(is_valid, results, score, estimate):
+    # Estimación por patrones (zxcvbn) junto a la puntuación por reglas;
+    # sin ella (contraseña mayor que max_length) la etiqueta sale sólo de las reglas
+    response = {
         'valid': is_valid,
         'results': results,
         'score': score,
-        'strength': get_strength_label(score)
-    })
+        'strength': get_strength_label(score, estimate_score(estimate)),
+    }
+    if estimate is not None:
+        response['estimate'] = estimate
+    return response
+
+@app.route('/validate', methods=['POST'])
+@rate_limited
+def validate():
+    data = request.get_json()
+    if not isinstance(data, dict):
+        return jsonify({'error': 'el cuerpo debe ser un objeto JSON'}), 400
+    password = data.get('password', '')
+    if not isinstance(password, str):
+        return jsonify({'error': 'password debe ser texto'}), 400
+    language = data.get('lang', DEFAULT_LANGUAGE)
+    if not isinstance(language, str) or language not in LANGUAGES:
+        return jsonify({'error': f'lang debe ser uno de {", ".join(LANGUAGES)}'}), 400
+    
+    policy = policies.get('validate')
+    # Datos del usuario (username, email...) que la contraseña no debe parecerse
+    context = data.get('context')
+    try:
+        policy.context_matcher(context)
+    except TypeError:
+        return jsonify({'error': 'context debe ser un objeto o lista de textos'}), 400
+    result, estimate = assess_password(policy, password, context)
+    if data.get('compact'):
+        body = _compact_json.encode(compact_response(result, estimate))
+        return Response(body, mimetype='application/json')
+    is_valid, results, score = result.render(language)
+    
+    return jsonify(validation_response(is_valid, results, score, estimate))
+
+# Sin espacios ni orden de claves: la respuesta compacta se pide en cada pulsación
+_compact_json = json.JSONEncoder(separators=(',', ':'))
+
+def compact_response(result, estimate):
+    # Máscara y conteos en lugar de textos: las etiquetas están en /policy
+    response = result.as_dict()
+    response['strength'] = get_strength_level(result.score, estimate_score(estimate))
+    return response
+
+@lru_cache(maxsize=32)
+def policy_document(policy, language):
+    """Cuerpo JSON de /policy y su ETag, calculados una vez por política e idioma."""
+    document = policy.describe(language)
+    document['strength_labels'] = STRENGTH_LABELS
+    # Reglas estructurales para evaluarlas en el navegador
+    document['definition'] = policy.export()
+    body = json.dumps(document, ensure_ascii=False, sort_keys=True).encode('utf-8')
+    return body, hashlib.sha256(body).hexdigest()[:32]
+
+@app.route('/policy')
+def policy_description():
+    """Textos de las reglas de /validate para renderizar respuestas compactas."""
+    language = request.args.get('lang', DEFAULT_LANGUAGE)
+    if language not in LANGUAGES:
+        return jsonify({'error': f'lang debe ser uno de {", ".join(LANGUAGES)}'}), 400
+    body, etag = policy_document(policies.get('validate'), language)
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = app.config['POLICY_MAX_AGE']
+    return response.make_conditional(request)
+
+@app.route('/validate/lookup', methods=['POST'])
+@rate_limited
+def validate_lookup():
+    """Comprobaciones que necesitan datos del servidor, para varias contraseñas.
+
+    El navegador evalúa las reglas estructurales con la definición de
+    /policy; aquí sólo se consulta la lista de comunes (o el índice de
+    filtraciones), el diccionario y el estimador de patrones.
+    """
+    data = request.get_json(silent=True) or {}
+    passwords = data.get('passwords') if isinstance(data, dict) else None
+    max_batch = app.config['LOOKUP_MAX_BATCH']
+    if not isinstance(passwords, list) or not all(isinstance(p, str) for p in passwords):
+        return jsonify({'error': 'passwords debe ser una lista de textos'}), 400
+    if len(passwords) > max_batch:
+        return jsonify({'error': f'como máximo {max_batch} contraseñas por petición'}), 400
+    policy = policies.get('validate')
+    results = []
+    for password in passwords:
+        # Misma entrada de caché (y mismo atajo para las demasiado largas) que /validate
+        compact, estimate = assess_password(policy, password)
+        result = {'common': compact.common}
+        if estimate is not None:
+            result['estimate'] = estimate['score']
+        if compact.dictionary:
+            result['dictionary'] = True
+        results.append(result)
+    return jsonify({'version': policy.fingerprint, 'results': results})
+
+@app.route('/validate/batch', methods=['POST'])
+@rate_limited
+def validate_batch():
+    """Valida contraseñas NDJSON ({"password": ...} por línea) en streaming."""
+    policy = policies.get('validate')
+    dumps = app.json.dumps
+    # Se aplica al leer el stream; cada línea cuenta contra el total
+    request.max_content_length = app.config['BATCH_MAX_CONTENT_LENGTH']
+    stream = request.stream
+    max_items = app.config['BATCH_MAX_ITEMS']
+    chunk = app.config['BATCH_RATE_CHUNK']
+    client = request.remote_addr or ''
+
+    def generate_results():
+        # La respuesta ya empezó con 200: los límites se notifican con una línea de error
+        items = 0
+        for line in stream:
+            line = line.strip()
+            if not line:
+                continue
+            items += 1
+            if items > max_items:
+                yield dumps({'error': f'como máximo {max_items} contraseñas por petición'}) + '\n'
+                return
+            if rate_limiter is not None and items % chunk == 0:
+                # La primera ficha la cobró rate_limited; el resto, por tramos
+                allowed, retry_after = rate_limiter.acquire(client)
+                if not allowed:
+                    yield dumps({'error': 'demasiadas peticiones, inténtalo más tarde',
+                                 'retry_after': int(retry_after_header(retry_after))}) + '\n'
+                    return
+            try:
+                item = json.loads(line)
+                password = item.get('password', '')
+                if not isinstance(password, str):
+                    raise TypeError('password debe ser texto')
+            except (ValueError, TypeError, AttributeError) as exc:
+                yield dumps({'error': str(exc)}) + '\n'
+                continue
+            compact = policy.compact(password)
+            is_valid, results, score = compact.render()
+            result = validation_response(is_valid, results, score,
+                                         estimate_summary(password, compact.overlong))
+            if 'id' in item:
+                result['id'] = item['id']
+            yield dumps(result) + '\n'
+
+    return Response(stream_with_context(generate_results()),
+                    mimetype='application/x-ndjson')
+
+@app.route('/validate/session', methods=['POST'])
+@rate_limited
+def open_validation_session():
+    """Abre una sesión incremental y devuelve el estado completo inicial."""
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({'error': 'el cuerpo debe ser un objeto JSON'}), 400
+    password = data.get('password', '')
+    if not isinstance(password, str):
+        return jsonify({'error': 'password debe ser texto'}), 400
+    try:
+        session_id, session = validation_sessions.create(policies.get('validate'), password)
+    except ValueError as exc:
+        return jsonify({'error': str(exc)}), 400
+    is_valid, results, score = session.result
+    estimate = estimate_summary(password, session.policy.overlong(len(password)))
+    response = validation_response(is_valid, results, score, estimate)
+    response['session'] = session_id
+    return jsonify(response)
+
+@app.route('/validate/session/<session_id>', methods=['POST'])
+@rate_limited
+def edit_validation_session(session_id):
+    """Aplica ediciones a la sesión y devuelve sólo las reglas que cambiaron."""
+    session = validation_sessions.get(session_id)
+    if session is None:
+        return jsonify({'error': 'sesión no encontrada o caducada'}), 404
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({'error': 'el cuerpo debe ser un objeto JSON'}), 400
+    edits = data.get('edits', [])
+    if not isinstance(edits, list) or not all(isinstance(e, dict) for e in edits):
+        return jsonify({'error': 'edits debe ser una lista de objetos'}), 400
+    with session.lock:
+        try:
+            changes = session.apply(edits)
+        except ValueError as exc:
+            return jsonify({'error': str(exc)}), 400
+        password = session.password
+    estimate = estimate_summary(password, session.policy.overlong(len(password)))
+    if estimate is not None:
+        changes['estimate'] = estimate
+    changes['strength'] = get_strength_label(changes['score'], estimate_score(estimate))
+    return jsonify(changes)
+
+@app.route('/validate/session/<session_id>', methods=['DELETE'])
+@rate_limited
+def close_validation_session(session_id):
+    validation_sessions.close(session_id)
+    return '', 204
 
 @app.route('/generate', methods=['POST'])
+@rate_limited
 def generate():
     data = request.get_json()
+    if not isinstance(data, dict):
+        return jsonify({'error': 'el cuerpo debe ser un objeto JSON'}), 400
+    if data.get('mode') == 'passphrase':
+        return generate_passphrase(data)
     length = data.get('length', 12)
     
-    validator = PasswordValidator()
-    validator.min_length(8)\
-             .has_uppercase(2)\
-             .has_lowercase(2)\
-             .has_digits(2)\
-             .has_symbols(1)
-    
-    password = validator.generate_password(length)
+    if 'count' in data:
+        return generate_bulk(data['count'], length)
+    error = valid_length(length)
+    if error:
+        return jsonify({'error': error}), 400
+
+    try:
+        password = policies.get('generate').generate_password(length)
+    except ValueError as e:
+        # La longitud pedida no puede cumplir la política
+        return jsonify({'error': str(e)}), 400
     
     return jsonify({
         'password': password
     })
 
-def get_strength_label(score):
+def valid_count(count):
+    max_count = app.config['GENERATE_MAX_COUNT']
+    if not isinstance(count, int) or isinstance(count, bool) or not 1 <= count <= max_count:
+        return f'count debe ser un entero entre 1 y {max_count}'
+    return None
+
+def valid_length(length):
+    max_length = app.config['GENERATE_MAX_LENGTH']
+    if not isinstance(length, int) or isinstance(length, bool) or not 1 <= length <= max_length:
+        return f'length debe ser un entero entre 1 y {max_length}'
+    return None
+
+def ndjson_lines(passwords):
+    # Se envía por lotes para no pagar una escritura por contraseña
+    lines = []
+    for password in passwords:
+        lines.append('{"password": %s}\n' % json.dumps(password))
+        if len(lines) == 1024:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
+
+def generate_bulk(count, length):
+    """Devuelve `count` contraseñas en streaming NDJSON ({"password": ...} por línea)."""
+    error = valid_count(count) or valid_length(length)
+    if error:
+        return jsonify({'error': error}), 400
+    try:
+        passwords = policies.get('generate').generate_many(count, length)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return Response(ndjson_lines(passwords), mimetype='application/x-ndjson')
+
+def generate_passphrase(data):
+    """Frase diceware; con count se devuelven en NDJSON y la entropía va en una cabecera."""
+    if passphrase_wordlist is None:
+        return jsonify({'error': 'no hay lista de palabras configurada (PASSPHRASE_WORDLIST)'}), 503
+    try:
+        generator = PassphraseGenerator(
+            passphrase_wordlist,
+            words=data.get('words', 6),
+            separator=data.get('separator', '-'),
+            capitalize=data.get('capitalize', 'lower'),
+            digits=data.get('digits', 0))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    entropy = round(generator.entropy, 1)
+
+    if 'count' in data:
+        error = valid_count(data['count'])
+        if error:
+            return jsonify({'error': error}), 400
+        response = Response(ndjson_lines(generator.generate_many(data['count'])),
+                            mimetype='application/x-ndjson')
+        response.headers['X-Passphrase-Entropy'] = str(entropy)
+        return response
+
+    return jsonify({
+        'password': generator.generate(),
+        'entropy': entropy
+    })
+
+@app.route('/metrics')
+def prometheus_metrics():
+    if not app.config['METRICS_ENABLED']:
+        return jsonify({'error': 'métricas desactivadas'}), 404
+    body = metrics.render(result_cache.stats())
+    return Response(body, content_type='text/plain; version=0.0.4; charset=utf-8')
+
+STRENGTH_LABELS = ('Muy Débil', 'Débil', 'Media', 'Fuerte', 'Muy Fuerte')
+
+def get_strength_level(score, estimate_score=None):
     if score < 40:
-        return 'Muy Débil'
+        level = 0
     elif score < 60:
-        return 'Débil'
+        level = 1
     elif score < 80:
-        return 'Media'
+        level = 2
     elif score < 95:
-        return 'Fuerte'
+        level = 3
     else:
-        return 'Muy Fuerte'
+        level = 4
+    # El estimador de patrones (0-4) limita la etiqueta de las reglas
+    if estimate_score is not None:
+        level = min(level, estimate_score)
+    return level
+
+def get_strength_label(score, estimate_score=None):
+    return STRENGTH_LABELS[get_strength_level(score, estimate_score)]
 
 if __name__ == '__main__':  # pragma: no cover
     app.run(debug=True, host='0.0.0.0', port=5000)
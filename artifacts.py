@@ -0,0 +1,227 @@
+"""Artefactos precompilados del validador en un único archivo mapeable.
+
+Todo lo que el validador construye al arrancar (autómatas de secuencias,
+tabla de clases de carácter y, opcionalmente, el diccionario) se serializa
+una vez; al arrancar sólo se lee o se mapea en memoria de solo lectura, de
+modo que los workers comparten las mismas páginas y no pagan la construcción.
+
+    cabecera    8s magic + I número de secciones
+    directorio  secciones x (32s nombre + Q posición + Q tamaño)
+    secciones   alineadas a 8 bytes
+
+Secciones:
+
+    manifest               JSON: versión de Unicode, orden de bytes y
+                           metadatos de cada autómata
+    automaton.N.table      int32 nativos: tabla de transiciones del autómata N
+    automaton.N.out        int32 nativos: longitud del patrón de cada estado
+    charclass.flags        1 byte por punto de código (charclass.flags_table(),
+                           se consulta mapeada, sin copiarla)
+    charclass.extras       UTF-8: dígitos numéricos fuera de Nd
+    dictionary             trie de dictionary.py (opcional)
+
+Las tablas dependen de la versión de Unicode y del orden de bytes, así que
+un archivo generado en otra plataforma se rechaza en lugar de dar
+resultados distintos.
+
+Uso:
+    python artifacts.py build validator.art --banned acme,contoso --dictionary words.txt
+    python artifacts.py info validator.art
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import unicodedata
+from array import array
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import charclass
+import patterns
+from dictionary import WordDictionary, build_trie
+from patterns import SequenceAutomaton, fold
+
+MAGIC = b'PWART1\x00\x00'
+HEADER = struct.Struct('<8sI')
+ENTRY = struct.Struct('<32sQQ')
+ALIGNMENT = 8
+
+
+def _normalize_tokens(tokens: Iterable[str]) -> Tuple[str, ...]:
+    # Misma clave que CompiledPolicy.banned_tokens
+    return tuple(sorted({''.join(map(fold, token)) for token in tokens if token}))
+
+
+def _platform() -> Dict:
+    return {'unicode': unicodedata.unidata_version, 'byteorder': sys.byteorder,
+            'maxunicode': sys.maxunicode}
+
+
+def build_artifacts(output: str, banned_token_sets: Sequence[Iterable[str]] = ((),),
+                    dictionary_words: Optional[Iterable[str]] = None) -> Dict:
+    """Escribe los artefactos en `output` y devuelve el manifiesto.
+
+    Se compila un autómata por cada conjunto de tokens prohibidos (el
+    conjunto vacío es el de las políticas sin banned_tokens()).
+    """
+    sections = []
+    automata = []
+    for tokens in dict.fromkeys(map(_normalize_tokens, banned_token_sets)):
+        automaton = patterns._compile_automaton(tokens)
+        index = len(automata)
+        automata.append({'tokens': list(tokens), 'alphabet': automaton.alphabet,
+                         'max_length': automaton.max_length,
+                         'pattern_count': automaton.pattern_count})
+        sections.append((f'automaton.{index}.table', array('i', automaton.table).tobytes()))
+        sections.append((f'automaton.{index}.out', array('i', automaton.out).tobytes()))
+    sections.append(('charclass.flags', charclass.flags_table()))
+    sections.append(('charclass.extras', charclass._numeric_extras().encode('utf-8')))
+    if dictionary_words is not None:
+        sections.append(('dictionary', build_trie(dictionary_words)))
+    manifest = dict(_platform(), automata=automata)
+    sections.insert(0, ('manifest', json.dumps(manifest, ensure_ascii=False).encode('utf-8')))
+
+    position = HEADER.size + ENTRY.size * len(sections)
+    directory = []
+    for name, data in sections:
+        position += -position % ALIGNMENT
+        directory.append(ENTRY.pack(name.encode('ascii'), position, len(data)))
+        position += len(data)
+    tmp_output = f'{output}.tmp'
+    with open(tmp_output, 'wb') as out:
+        out.write(HEADER.pack(MAGIC, len(sections)))
+        out.write(b''.join(directory))
+        for name, data in sections:
+            out.write(b'\x00' * (-out.tell() % ALIGNMENT))
+            out.write(data)
+    os.replace(tmp_output, output)
+    return manifest
+
+
+class ValidatorArtifacts:
+    """Artefactos de build_artifacts() mapeados en memoria (solo lectura)."""
+
+    def __init__(self, path: str):
+        self.path = os.fspath(path)
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._sections = self._read_directory()
+            self.manifest = json.loads(self._section('manifest').tobytes())
+            expected = _platform()
+            found = {key: self.manifest.get(key) for key in expected}
+            if found != expected:
+                raise ValueError(f'{self.path}: generado para otra plataforma ({found})')
+        except Exception:
+            self._mmap.close()
+            raise
+
+    def _read_directory(self) -> Dict[str, Tuple[int, int]]:
+        if len(self._mmap) < HEADER.size:
+            raise ValueError(f'{self.path}: artefactos truncados')
+        magic, count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f'{self.path}: no es un archivo de artefactos')
+        if HEADER.size + count * ENTRY.size > len(self._mmap):
+            raise ValueError(f'{self.path}: directorio truncado')
+        sections = {}
+        for name, offset, length in ENTRY.iter_unpack(
+                self._mmap[HEADER.size:HEADER.size + count * ENTRY.size]):
+            if offset + length > len(self._mmap):
+                raise ValueError(f'{self.path}: sección fuera del archivo')
+            sections[name.rstrip(b'\x00').decode('ascii')] = (offset, length)
+        return sections
+
+    def _section(self, name: str) -> memoryview:
+        offset, length = self._sections[name]
+        return memoryview(self._mmap)[offset:offset + length]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._sections
+
+    def _int_array(self, name: str) -> array:
+        # Copia a un array: indexar un memoryview es ~30% más lento en el bucle
+        # del autómata y las tablas son pequeñas (cientos de KB). Cargadas en el
+        # maestro, los workers las comparten por copy-on-write
+        values = array('i')
+        values.frombytes(self._section(name))
+        return values
+
+    def automata(self) -> Dict[Tuple[str, ...], SequenceAutomaton]:
+        """Tokens prohibidos -> autómata con las tablas del archivo."""
+        automata = {}
+        for index, meta in enumerate(self.manifest['automata']):
+            automata[tuple(meta['tokens'])] = SequenceAutomaton.from_tables(
+                meta['alphabet'], meta['max_length'], meta['pattern_count'],
+                self._int_array(f'automaton.{index}.table'),
+                self._int_array(f'automaton.{index}.out'))
+        return automata
+
+    def char_flags(self) -> memoryview:
+        return self._section('charclass.flags')
+
+    def numeric_extras(self) -> str:
+        return self._section('charclass.extras').tobytes().decode('utf-8')
+
+    def dictionary(self) -> Optional[WordDictionary]:
+        """El diccionario incluido, mapeado de nuevo desde el mismo archivo."""
+        if 'dictionary' not in self._sections:
+            return None
+        offset, length = self._sections['dictionary']
+        return WordDictionary(self.path, offset, length)
+
+    def install(self):
+        """Hace que build_automaton() y los clasificadores usen estas tablas.
+
+        Debe llamarse antes de compilar las políticas (p. ej. en el proceso
+        maestro antes del fork) para que todas compartan el mapeo.
+        """
+        for tokens, automaton in self.automata().items():
+            patterns.register_automaton(tokens, automaton)
+        charclass.install_flags(self.char_flags(), self.numeric_extras())
+
+    def info(self) -> Dict:
+        return {'path': self.path, 'size': len(self._mmap),
+                'sections': {name: length for name, (_, length) in self._sections.items()},
+                'manifest': self.manifest}
+
+
+def install(path: str) -> ValidatorArtifacts:
+    """Mapea los artefactos de `path` y los instala (ver ValidatorArtifacts.install)."""
+    artifacts = ValidatorArtifacts(path)
+    artifacts.install()
+    return artifacts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Artefactos precompilados del validador')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help='generar el archivo de artefactos')
+    build.add_argument('output', help='ruta del archivo a generar')
+    build.add_argument('--banned', action='append', default=[],
+                       help='tokens prohibidos separados por comas (se puede repetir)')
+    build.add_argument('--dictionary', help="lista de palabras (una por línea, '-' para stdin)")
+
+    info = commands.add_parser('info', help='mostrar las secciones de un archivo')
+    info.add_argument('path')
+
+    args = parser.parse_args(argv)
+    if args.command == 'build':
+        token_sets = [()] + [value.split(',') for value in args.banned]
+        words = None
+        if args.dictionary:
+            source = sys.stdin if args.dictionary == '-' else open(args.dictionary, encoding='utf-8')
+            with source:
+                words = list(source)
+        manifest = build_artifacts(args.output, token_sets, words)
+        print(f"{len(manifest['automata'])} autómatas escritos en {args.output}")
+    else:
+        print(json.dumps(ValidatorArtifacts(args.path).info(), ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(main())
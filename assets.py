@@ -0,0 +1,110 @@
+"""Archivos estáticos con huella de contenido, precomprimidos y cacheables.
+
+Al arrancar se leen todos los archivos de static/, se calcula el SHA-256 de
+cada uno y se publican con la huella en el nombre (css/index.<huella>.css),
+de modo que el navegador puede guardarlos un año sin revalidar: si el
+contenido cambia, cambia la URL. Las variantes gzip y brotli (si el módulo
+`brotli` está instalado) se comprimen una sola vez con el nivel máximo y se
+eligen según Accept-Encoding. Cada variante lleva un ETag fuerte propio.
+
+La página HTML usa la misma clase: se renderiza una vez, se comprime y se
+sirve desde memoria con revalidación por ETag.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+from typing import Dict, Optional
+
+from flask import Response
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depende del entorno
+    brotli = None
+
+# Un año: las URL con huella nunca cambian de contenido
+IMMUTABLE_MAX_AGE = 31_536_000
+
+# Por debajo de este tamaño comprimir no compensa
+MIN_COMPRESS_SIZE = 256
+
+
+class Asset:
+    """Un recurso en memoria con sus variantes comprimidas."""
+
+    __slots__ = ('content_type', 'digest', 'variants')
+
+    def __init__(self, body: bytes, content_type: str):
+        self.content_type = content_type
+        self.digest = hashlib.sha256(body).hexdigest()
+        # Codificación -> cuerpo; sólo se guardan las que reducen el tamaño
+        self.variants = {'identity': body}
+        if len(body) >= MIN_COMPRESS_SIZE:
+            compressed = gzip.compress(body, compresslevel=9, mtime=0)
+            if len(compressed) < len(body):
+                self.variants['gzip'] = compressed
+            if brotli is not None:
+                compressed = brotli.compress(body, quality=11)
+                if len(compressed) < len(body):
+                    self.variants['br'] = compressed
+
+    def negotiate(self, accept_encodings) -> str:
+        """La variante más pequeña que acepta el cliente (Accept-Encoding)."""
+        for encoding in ('br', 'gzip'):
+            if encoding in self.variants and accept_encodings[encoding]:
+                return encoding
+        return 'identity'
+
+    def response(self, request, max_age: int = 0, immutable: bool = False) -> Response:
+        encoding = self.negotiate(request.accept_encodings)
+        response = Response(self.variants[encoding], content_type=self.content_type)
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        # Cada representación tiene su propio ETag fuerte
+        response.set_etag(f'{self.digest[:32]}-{encoding}')
+        response.cache_control.public = True
+        if max_age:
+            response.cache_control.max_age = max_age
+            response.cache_control.immutable = immutable
+        else:
+            response.cache_control.no_cache = True
+        return response.make_conditional(request)
+
+
+class AssetManifest:
+    """Recursos de un directorio, publicados con la huella en el nombre."""
+
+    def __init__(self, root: str, url_prefix: str = '/assets/'):
+        self.root = root
+        self.url_prefix = url_prefix
+        # Nombre lógico (css/index.css) -> nombre publicado (css/index.<huella>.css)
+        self.names: Dict[str, str] = {}
+        self.assets: Dict[str, Asset] = {}
+        if os.path.isdir(root):
+            for directory, _, files in os.walk(root):
+                for filename in sorted(files):
+                    path = os.path.join(directory, filename)
+                    self.add(os.path.relpath(path, root).replace(os.sep, '/'), path)
+
+    def add(self, name: str, path: str) -> str:
+        with open(path, 'rb') as f:
+            body = f.read()
+        content_type, _ = mimetypes.guess_type(name)
+        content_type = content_type or 'application/octet-stream'
+        if content_type.startswith('text/') or content_type.endswith('javascript'):
+            content_type += '; charset=utf-8'
+        asset = Asset(body, content_type)
+        stem, ext = os.path.splitext(name)
+        published = f'{stem}.{asset.digest[:12]}{ext}'
+        self.names[name] = published
+        self.assets[published] = asset
+        return published
+
+    def url(self, name: str) -> str:
+        """URL con huella para usar en las plantillas (asset_url)."""
+        return self.url_prefix + self.names[name]
+
+    def get(self, published: str) -> Optional[Asset]:
+        return self.assets.get(published)
@@ -0,0 +1,187 @@
+"""Auditoría masiva de listas de contraseñas contra una política.
+
+Lee el archivo mediante mmap en bloques alineados a fin de línea y los reparte
+entre un ProcessPoolExecutor con un worker por núcleo. Cada worker valida su
+bloque con la política compilada y devuelve sólo agregados (fallos por regla
+e histograma de puntuaciones), así que la memoria no depende del tamaño del
+archivo.
+
+Uso:
+    python audit.py passwords.txt
+    python audit.py passwords.txt --policy-file policies.json --policy strict -o stats.json
+"""
+import argparse
+import json
+import mmap
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterator, Tuple
+
+from batch import np, score_batch
+from validator import CompiledPolicy
+
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+
+_worker_policy = None
+
+
+def iter_chunks(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Tuple[int, int]]:
+    """Divide el archivo en rangos [inicio, fin) que terminan en un salto de línea."""
+    size = os.path.getsize(path)
+    if size == 0:
+        return
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        while start < size:
+            end = min(start + chunk_size, size)
+            if end < size:
+                newline = mm.find(b'\n', end)
+                end = size if newline == -1 else newline + 1
+            yield start, end
+            start = end
+
+
+def audit_lines(policy: CompiledPolicy, lines) -> Dict:
+    """Agregados de validación para un iterable de contraseñas."""
+    if np is not None:
+        # Con NumPy el bloque se puntúa de forma vectorizada
+        batch = score_batch(policy, lines)
+        buckets = np.bincount(np.minimum(batch.scores // 10, 10), minlength=11)
+        return {
+            'total': len(batch),
+            'valid': int(batch.valid.sum()),
+            'failures': Counter(batch.failure_counts()),
+            'histogram': Counter({bucket * 10: int(n) for bucket, n in enumerate(buckets) if n}),
+        }
+    total = valid = 0
+    failures = Counter()
+    histogram = Counter()
+    for password in lines:
+        is_valid, results, score = policy.validate(password)
+        total += 1
+        if is_valid:
+            valid += 1
+        else:
+            for result in results:
+                if not result['passed']:
+                    failures[result['rule']] += 1
+        histogram[min(score // 10 * 10, 100)] += 1
+    return {'total': total, 'valid': valid, 'failures': failures, 'histogram': histogram}
+
+
+def _init_worker(policy: CompiledPolicy):
+    global _worker_policy
+    _worker_policy = policy
+
+
+def _audit_chunk(path: str, start: int, end: int, policy: CompiledPolicy = None) -> Dict:
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        data = mm[start:end]
+    # surrogateescape conserva los bytes que no son UTF-8 válido
+    lines = (line.rstrip('\r') for line in
+             data.decode('utf-8', 'surrogateescape').split('\n'))
+    stats = audit_lines(policy or _worker_policy, (line for line in lines if line))
+    stats['bytes'] = end - start
+    return stats
+
+
+def merge_stats(total: Dict, partial: Dict):
+    total['total'] += partial['total']
+    total['valid'] += partial['valid']
+    total['failures'].update(partial['failures'])
+    total['histogram'].update(partial['histogram'])
+    total['bytes'] += partial['bytes']
+
+
+def run_audit(path: str, policy: CompiledPolicy, workers: int = None,
+              chunk_size: int = DEFAULT_CHUNK_SIZE, progress=None) -> Dict:
+    """Audita el archivo y devuelve las estadísticas agregadas."""
+    workers = workers or os.cpu_count() or 1
+    size = os.path.getsize(path)
+    stats = {'total': 0, 'valid': 0, 'failures': Counter(), 'histogram': Counter(), 'bytes': 0}
+    started = time.perf_counter()
+
+    if workers == 1:
+        for start, end in iter_chunks(path, chunk_size):
+            merge_stats(stats, _audit_chunk(path, start, end, policy))
+            if progress:
+                progress(stats, size, time.perf_counter() - started)
+    else:
+        chunks = iter_chunks(path, chunk_size)
+        # Como mucho dos bloques en vuelo por worker: memoria acotada
+        max_pending = workers * 2
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(policy,)) as pool:
+            pending = set()
+            for start, end in chunks:
+                pending.add(pool.submit(_audit_chunk, path, start, end))
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        merge_stats(stats, future.result())
+                    if progress:
+                        progress(stats, size, time.perf_counter() - started)
+            for future in pending:
+                merge_stats(stats, future.result())
+
+    elapsed = time.perf_counter() - started
+    return {
+        'total': stats['total'],
+        'valid': stats['valid'],
+        'invalid': stats['total'] - stats['valid'],
+        'failures': dict(stats['failures'].most_common()),
+        'score_histogram': {str(bucket): stats['histogram'][bucket] for bucket in range(0, 101, 10)
+                            if stats['histogram'][bucket]},
+        'elapsed_seconds': round(elapsed, 3),
+        'passwords_per_second': round(stats['total'] / elapsed) if elapsed > 0 else None,
+        'workers': workers,
+    }
+
+
+def print_progress(stats, size, elapsed):
+    percent = 100 * stats['bytes'] / size if size else 100
+    rate = stats['total'] / elapsed if elapsed > 0 else 0
+    print(f'\r{percent:5.1f}%  {stats["total"]:,} contraseñas  {rate:,.0f}/s',
+          end='', file=sys.stderr, flush=True)
+
+
+def load_policy(policy_file: str, name: str) -> CompiledPolicy:
+    if policy_file:
+        from policies import PolicyRegistry
+        registry = PolicyRegistry(policy_file)
+    else:
+        # Mismas políticas que la aplicación web
+        from app import policies as registry
+    return registry.get(name)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Auditoría masiva de contraseñas contra una política')
+    parser.add_argument('input', help='archivo con una contraseña por línea')
+    parser.add_argument('--policy-file', help='archivo JSON/TOML de políticas (por defecto, las de la app)')
+    parser.add_argument('--policy', default='validate', help='nombre de la política (por defecto: validate)')
+    parser.add_argument('--workers', type=int, default=None, help='procesos (por defecto: núcleos disponibles)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='bytes por bloque')
+    parser.add_argument('-o', '--output', help='escribir las estadísticas JSON en este archivo')
+    parser.add_argument('-q', '--quiet', action='store_true', help='no mostrar el progreso')
+    args = parser.parse_args(argv)
+
+    policy = load_policy(args.policy_file, args.policy)
+    progress = None if args.quiet else print_progress
+    report = run_audit(args.input, policy, args.workers, args.chunk_size, progress)
+    if progress:
+        print(file=sys.stderr)
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(main())
@@ -0,0 +1,270 @@
+"""Puntuación vectorizada de lotes grandes de contraseñas (analítica offline).
+
+Con NumPy, cada bloque de contraseñas se codifica en una matriz de puntos de
+código uint32 (una fila por contraseña, rellenada con ceros) y todas las
+reglas se calculan con operaciones sobre la matriz:
+
+- clases de carácter: tabla de búsqueda ASCII más una clasificación por
+  punto de código distinto (no por carácter) para el resto
+- repeticiones: comparación de columnas desplazadas
+- secuencias: todo patrón por defecto de longitud >= 3 contiene un trigrama
+  que también es patrón, así que basta buscar trigramas (códigos enteros) en
+  un conjunto ordenado; los tokens prohibidos se comparan por ventanas
+- diccionario: se consulta policy.dictionary_match() sólo en las filas que
+  no son ya comunes
+
+Las filas más largas que max_length (o que MAX_ENCODED_WIDTH) no se meten en
+la matriz, que se rellenaría hasta la más larga del bloque: se resuelven con
+CompiledPolicy.compact(), que para las de más de max_length sólo cuenta clases.
+
+El resultado es el mismo vector de reglas superadas y la misma puntuación que
+CompiledPolicy.validate. Sin NumPy se usa CompiledPolicy.compact() fila a
+fila. Las reglas se identifican por policy.rule_ids y los bits de la
+máscara; las etiquetas sólo se resuelven al mostrarlas, en el idioma pedido.
+"""
+from itertools import islice
+from typing import Iterable, List, Sequence, Tuple
+
+from messages import DEFAULT_LANGUAGE
+from patterns import MIN_PATTERN_LENGTH, default_patterns
+from validator import CompactResult, CompiledPolicy
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depende del entorno
+    np = None
+
+# Contraseñas por matriz: acota la memoria con listas de millones
+DEFAULT_CHUNK_SIZE = 65536
+# Ancho máximo de la matriz (puntos de código por fila)
+MAX_ENCODED_WIDTH = 256
+
+# Reglas adicionales (validator.EXTRA_RULES) que se calculan aquí
+COMMON_RULE = 'common'
+SEQUENCE_RULE = 'sequence'
+REPETITION_RULE = 'repetition'
+
+
+class BatchResult:
+    """Resultados por columnas: `passed` tiene una fila por contraseña y una
+    columna por regla de la política (`rules`, sus rule_ids); las reglas
+    adicionales son vectores de fallo aparte, igual que en validate() sólo
+    aparecen cuando fallan."""
+
+    def __init__(self, policy: CompiledPolicy, valid, scores, passed,
+                 common, sequence, repetition):
+        self.policy = policy
+        self.rules = policy.rule_ids[:len(policy.rule_checks)]
+        self.valid = valid
+        self.scores = scores
+        self.passed = passed
+        self.common = common
+        self.sequence = sequence
+        self.repetition = repetition
+
+    def __len__(self) -> int:
+        return len(self.valid)
+
+    def _extras(self):
+        # (bit de la regla en la máscara, vector de fallos)
+        rule_ids = self.policy.rule_ids
+        return ((rule_ids.index(COMMON_RULE), self.common),
+                (rule_ids.index(SEQUENCE_RULE), self.sequence),
+                (rule_ids.index(REPETITION_RULE), self.repetition))
+
+    def outcomes(self, index: int, language: str = DEFAULT_LANGUAGE) -> List[Tuple[str, bool]]:
+        """(etiqueta, superada) en el mismo orden que los resultados de validate()."""
+        labels = self.policy.catalog(language).labels
+        outcome = [(label, bool(passed)) for label, passed in zip(labels, self.passed[index])]
+        for bit, failed in self._extras():
+            if failed[index]:
+                outcome.append((labels[bit], False))
+        return outcome
+
+    def failure_counts(self, language: str = DEFAULT_LANGUAGE):
+        """Fallos por regla (por etiqueta) en todo el lote."""
+        labels = self.policy.catalog(language).labels
+        rules = len(self.rules)
+        if np is not None:
+            passed = np.asarray(self.passed, dtype=bool).reshape(len(self), rules)
+            failed = (len(self) - passed.sum(axis=0)).tolist()
+            count = np.count_nonzero
+        else:
+            failed = [len(self) - sum(row[column] for row in self.passed)
+                      for column in range(rules)]
+            count = sum
+        counts = dict(zip(labels, failed))
+        for bit, vector in self._extras():
+            counts[labels[bit]] = int(count(vector))
+        return {rule: n for rule, n in counts.items() if n}
+
+
+def score_batch(policy: CompiledPolicy, passwords: Sequence[str],
+                chunk_size: int = DEFAULT_CHUNK_SIZE) -> BatchResult:
+    """Puntúa todas las contraseñas; vectorizado si NumPy está disponible."""
+    if np is None:
+        return _score_python(policy, passwords)
+    parts = []
+    iterator = iter(passwords)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            break
+        parts.append(_score_numpy(policy, chunk))
+    if not parts:
+        empty = np.zeros(0, dtype=bool)
+        return BatchResult(policy, empty, np.zeros(0, dtype=np.int64),
+                           np.zeros((0, len(policy.rule_checks)), dtype=bool),
+                           empty, empty, empty)
+    return BatchResult(policy, *(np.concatenate(arrays) for arrays in zip(*parts)))
+
+
+def _unpack(policy: CompiledPolicy, result: CompactResult):
+    # (válida, puntuación, superadas por regla, común, secuencia, repetición) desde la máscara
+    mask = result.mask
+    rule_ids = policy.rule_ids
+    passed = [bool(mask >> i & 1) for i in range(len(policy.rule_checks))]
+    failed = [not mask >> rule_ids.index(rule) & 1
+              for rule in (COMMON_RULE, SEQUENCE_RULE, REPETITION_RULE)]
+    return (result.valid, result.score, passed, *failed)
+
+
+def _score_python(policy: CompiledPolicy, passwords: Iterable[str]) -> BatchResult:
+    columns = [[] for _ in range(6)]
+    for password in passwords:
+        for column, value in zip(columns, _unpack(policy, policy.compact(password))):
+            column.append(value)
+    return BatchResult(policy, *columns)
+
+
+def encode(passwords: List[str]):
+    """Matriz (N, longitud máxima) de puntos de código y vector de longitudes."""
+    lengths = np.fromiter(map(len, passwords), dtype=np.int64, count=len(passwords))
+    flat = np.frombuffer(''.join(passwords).encode('utf-32-le', 'surrogatepass'),
+                         dtype='<u4')
+    width = int(lengths.max()) if len(passwords) else 0
+    matrix = np.zeros((len(passwords), max(width, 1)), dtype=np.uint32)
+    rows = np.repeat(np.arange(len(passwords)), lengths)
+    starts = np.cumsum(lengths) - lengths
+    columns = np.arange(len(flat)) - np.repeat(starts, lengths)
+    matrix[rows, columns] = flat
+    return matrix, lengths
+
+
+def _lookup(matrix, ascii_table, classify, dtype):
+    # Tabla para ASCII; el resto se resuelve una vez por punto de código distinto
+    table = np.frombuffer(ascii_table, dtype=np.uint8).astype(dtype)
+    result = table[np.minimum(matrix, 127)]
+    high = matrix > 127
+    if high.any():
+        codes, inverse = np.unique(matrix[high], return_inverse=True)
+        values = np.fromiter(map(classify, codes.tolist()), dtype=dtype, count=len(codes))
+        result[high] = values[inverse]
+    return result
+
+
+def _score_numpy(policy: CompiledPolicy, passwords: List[str]):
+    width_limit = MAX_ENCODED_WIDTH
+    if policy.max_length is not None:
+        width_limit = min(policy.max_length, width_limit)
+    # Las filas largas se sustituyen por '' en la matriz y se resuelven aparte
+    long_rows = [i for i, password in enumerate(passwords) if len(password) > width_limit]
+    if long_rows:
+        passwords = list(passwords)
+        long_passwords = [passwords[i] for i in long_rows]
+        for i in long_rows:
+            passwords[i] = ''
+    matrix, lengths = encode(passwords)
+    count, width = matrix.shape
+    inside = np.arange(width) < lengths[:, None]
+
+    # Clases de carácter (las posiciones de relleno no cuentan)
+    classifier = policy.classifier
+    classes = _lookup(matrix, classifier.ascii_table,
+                      lambda code: ord(classifier.table[code]), np.uint8)
+    classes[~inside] = 0
+    counts = {cls: (classes == ord(cls)).sum(axis=1) for cls in policy.counted_classes}
+
+    passed = np.empty((count, len(policy.rule_checks)), dtype=bool)
+    for column, (cls, low, high) in enumerate(policy.rule_checks):
+        found = lengths if cls is None else counts[cls]
+        passed[:, column] = (found >= low) & (found <= high)
+    score = passed.sum(axis=1) * 10
+
+    # Contraseñas comunes o filtradas
+    if policy.breach_index is not None:
+        common = np.fromiter(map(policy.breach_index.count, passwords),
+                             dtype=np.int64, count=count) > 0
+    else:
+        common = np.fromiter(map(policy.common_passwords.__contains__,
+                                 map(str.lower, passwords)), dtype=bool, count=count)
+
+    sequence = _sequences(policy, matrix)
+
+    # (.)\1{2,}: tres iguales seguidos dentro de la contraseña, sin saltos de línea
+    if width >= 3:
+        repetition = ((matrix[:, :-2] == matrix[:, 1:-1]) & (matrix[:, 1:-1] == matrix[:, 2:])
+                      & (matrix[:, :-2] != 10) & inside[:, 2:]).any(axis=1)
+    else:
+        repetition = np.zeros(count, dtype=bool)
+
+    # Palabras del diccionario, sólo donde no es ya común (como en resolve())
+    if policy.dictionary is not None:
+        candidates = np.flatnonzero(~common)
+        found = np.fromiter((policy.dictionary_match(passwords[i]) for i in candidates.tolist()),
+                            dtype=bool, count=len(candidates))
+        common[candidates[found]] = True
+
+    # Penalizaciones en el mismo orden y con el mismo recorte que evaluate()
+    score = np.where(common, np.maximum(0, score - 20), score)
+    score = np.where(sequence, np.maximum(0, score - 10), score)
+    score = np.where(repetition, np.maximum(0, score - 10), score)
+    max_score = policy.max_score
+    if max_score > 0:
+        scores = (score / max_score * 100).astype(np.int64)
+    else:
+        scores = np.zeros(count, dtype=np.int64)
+    valid = passed.all(axis=1) & ~common & ~sequence & ~repetition
+    if long_rows:
+        _resolve_rows(policy, long_rows, long_passwords,
+                      valid, scores, passed, common, sequence, repetition)
+    return valid, scores, passed, common, sequence, repetition
+
+
+def _resolve_rows(policy: CompiledPolicy, rows: List[int], passwords: List[str],
+                  *vectors):
+    # Resultados de compact() escritos en las filas `rows` de los vectores
+    for row, password in zip(rows, passwords):
+        for vector, value in zip(vectors, _unpack(policy, policy.compact(password))):
+            vector[row] = value
+
+
+def _sequences(policy: CompiledPolicy, matrix):
+    automaton = policy.sequences
+    columns = _lookup(matrix, bytes(automaton.column(code) for code in range(128)),
+                      automaton.column, np.int64)
+    # Relleno y caracteres fuera del alfabeto son la columna 0: no forman patrón
+    count, width = columns.shape
+    found = np.zeros(count, dtype=bool)
+    if width >= MIN_PATTERN_LENGTH:
+        trigrams = _trigram_codes(automaton)
+        base = automaton.width
+        codes = (columns[:, :-2] * base + columns[:, 1:-1]) * base + columns[:, 2:]
+        found |= np.isin(codes, trigrams).any(axis=1)
+    for token in policy.banned_tokens:
+        size = len(token)
+        if size > width:
+            continue
+        window = np.ones((count, width - size + 1), dtype=bool)
+        for offset, c in enumerate(token):
+            window &= columns[:, offset:width - size + 1 + offset] == automaton.columns[c]
+        found |= window.any(axis=1)
+    return found
+
+
+def _trigram_codes(automaton):
+    base = automaton.width
+    columns = automaton.columns
+    codes = [(columns[p[0]] * base + columns[p[1]]) * base + columns[p[2]]
+             for p in default_patterns() if len(p) == MIN_PATTERN_LENGTH]
+    return np.unique(np.array(codes, dtype=np.int64))
@@ -0,0 +1,448 @@
+"""Benchmarks de latencia y control de regresiones de rendimiento.
+
+Recorre longitudes de contraseña, mezclas de caracteres y tamaños de política;
+mide validate (con y sin contexto del usuario), is_valid, la búsqueda en el
+diccionario, generate y las rutas /validate y /generate (con el cliente de
+pruebas de Flask) y guarda p50/p99 y operaciones por segundo en JSON. Con
+--compare falla (código 1) si algún caso empeora más allá del umbral respecto
+a una línea base guardada antes.
+
+Con --startup mide en procesos nuevos el tiempo de importar la app y la
+latencia de la primera petición a /validate, /policy y /, sin artefactos, con
+artefactos precompilados (artifacts.py) y tras preload() (lo que hereda un
+worker de gunicorn).
+
+Con --worst-case valida entradas patológicas (rachas, casi repeticiones,
+secuencias cortadas, leet, parecidos parciales con el contexto) con una
+política sin max_length y comprueba cuánto crece el tiempo con la longitud:
+todas las comprobaciones deben ser lineales.
+
+Uso:
+    python benchmark.py --save baseline.json
+    python benchmark.py --compare baseline.json --threshold 0.25
+    python benchmark.py --filter validate/ --iterations 500
+    python benchmark.py --startup --runs 5
+    python benchmark.py --worst-case
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import statistics
+import string
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+from dictionary import WordDictionary
+from validator import PasswordValidator
+
+LENGTHS = (8, 16, 64, 256)
+
+# Mezcla -> alfabeto del que se sacan las contraseñas de prueba
+MIXES = {
+    'lower': string.ascii_lowercase,
+    'alnum': string.ascii_letters + string.digits,
+    'full': string.ascii_letters + string.digits + string.punctuation,
+    'unicode': string.ascii_letters + 'áéíóúñÁÉÍÓÚÑ٣€…',
+}
+
+
+def _policy(size: str) -> PasswordValidator:
+    validator = PasswordValidator()
+    if size == 'minimal':
+        return validator.min_length(8)
+    validator.min_length(8).max_length(128).has_uppercase().has_lowercase()\
+        .has_digits().has_symbols().no_spaces()
+    if size == 'strict':
+        validator.has_uppercase(2).has_digits(2).has_symbols(2)\
+            .banned_tokens(['acme', 'contoso', 'admin', 'welcome'])
+    return validator
+
+
+POLICY_SIZES = ('minimal', 'default', 'strict')
+
+# Datos de usuario típicos para los casos con contexto
+CONTEXT = {'username': 'jsmith88', 'email': 'john.smith@example.com', 'company': 'Contoso Ltd'}
+
+DEFAULT_ITERATIONS = 2000
+DEFAULT_THRESHOLD = 0.25
+# Las colas son más ruidosas que la mediana
+DEFAULT_P99_THRESHOLD = 0.5
+
+
+def _passwords(mix: str, length: int, count: int = 64) -> List[str]:
+    # Semilla fija: las mismas contraseñas en todas las ejecuciones
+    rnd = random.Random(f'{mix}/{length}')
+    alphabet = MIXES[mix]
+    return [''.join(rnd.choice(alphabet) for _ in range(length)) for _ in range(count)]
+
+
+def _words(count: int) -> List[str]:
+    # Palabras pronunciables sintéticas, algunas con sufijo numérico como en
+    # las listas de contraseñas reales
+    rnd = random.Random('words')
+    words = []
+    for _ in range(count):
+        word = ''.join(rnd.choice('bcdfghjklmnprstvz') + rnd.choice('aeiou')
+                       for _ in range(rnd.randint(2, 5)))
+        if rnd.random() < 0.3:
+            word += str(rnd.randint(0, 9999))
+        words.append(word)
+    return words
+
+
+@contextmanager
+def _route_overrides(application):
+    # Todas las peticiones salen de la misma dirección: sin quitar el límite por
+    # IP acabarían en 429 a mitad de caso. Los casos repiten 64 contraseñas, así
+    # que con la caché de resultados se mediría sobre todo aciertos y el umbral
+    # de regresiones no vería el validador: también se desactiva. Todo se
+    # restaura al terminar los casos de rutas, para no alterar a quien importe
+    # benchmark en el mismo proceso
+    limiter = application.rate_limiter
+    cache_enabled = application.app.config['RESULT_CACHE_ENABLED']
+    application.rate_limiter = None
+    application.app.config['RESULT_CACHE_ENABLED'] = False
+    try:
+        yield
+    finally:
+        application.rate_limiter = limiter
+        application.app.config['RESULT_CACHE_ENABLED'] = cache_enabled
+
+
+def cases() -> Iterator[Tuple[str, Callable[[int], None]]]:
+    """Pares (nombre, función que ejecuta la operación i-ésima)."""
+    for size in POLICY_SIZES:
+        policy = _policy(size).compile()
+        for mix in MIXES:
+            for length in LENGTHS:
+                passwords = _passwords(mix, length)
+                yield (f'validate/{size}/{mix}/len{length}',
+                       lambda i, v=policy.validate, p=passwords: v(p[i % len(p)]))
+        # Con datos del usuario: parecido por distancia de edición (similarity.py)
+        for length in (16, 64):
+            passwords = _passwords('alnum', length)
+            yield (f'validate-context/{size}/alnum/len{length}',
+                   lambda i, v=policy.validate, p=passwords: v(p[i % len(p)], context=CONTEXT))
+        # Camino de sólo sí/no que se detiene en el primer fallo
+        for mix in ('lower', 'full'):
+            passwords = _passwords(mix, 16)
+            yield (f'is_valid/{size}/{mix}/len16',
+                   lambda i, v=policy.is_valid, p=passwords: v(p[i % len(p)]))
+
+    # Palabras del diccionario (trie con variantes leet) como subcadenas
+    dictionary = WordDictionary.from_words(_words(100_000))
+    for mix in ('alnum', 'full'):
+        for length in (16, 64):
+            passwords = _passwords(mix, length)
+            yield (f'dictionary/{mix}/len{length}',
+                   lambda i, s=dictionary.search, p=passwords: s(p[i % len(p)]))
+
+    generator = _policy('default').compile()
+    for length in (8, 16, 64):
+        yield (f'generate/len{length}',
+               lambda i, g=generator.generate_password, n=length: g(n))
+
+    # Rutas con la configuración de la app, sin límite por IP ni caché de resultados
+    import app as application
+    with _route_overrides(application):
+        client = application.app.test_client()
+        for mix in ('alnum', 'full'):
+            for length in (16, 64):
+                bodies = [json.dumps({'password': p}) for p in _passwords(mix, length)]
+                yield (f'route/validate/{mix}/len{length}',
+                       lambda i, b=bodies: _post(client, '/validate', b[i % len(b)]))
+                bodies = [json.dumps({'password': p, 'compact': True})
+                          for p in _passwords(mix, length)]
+                yield (f'route/validate-compact/{mix}/len{length}',
+                       lambda i, b=bodies: _post(client, '/validate', b[i % len(b)]))
+        # Más larga que max_length: sólo se cuentan las clases
+        body = json.dumps({'password': _passwords('full', 256)[0] * 64})
+        yield ('route/validate-overlong/len16384',
+               lambda i, b=body: _post(client, '/validate', b))
+        for length in (12, 32):
+            body = json.dumps({'length': length})
+            yield (f'route/generate/len{length}',
+                   lambda i, b=body: _post(client, '/generate', b))
+
+
+_FUZZ_BLOCK = ''.join(random.Random('fuzz').choice('aA1!@$0qwejsmitl ') for _ in range(251))
+
+# Entradas patológicas para cada comprobación: rachas y casi repeticiones
+# (regex de repeticiones), secuencias y recorridos que se cortan (autómata),
+# prefijos leet de una palabra y ramas leet sin salida (diccionario),
+# prefijos del contexto (Myers) y puntos de código distintos (tabla de clases
+# fuera de ASCII)
+ADVERSARIAL = {
+    'run': lambda n: 'a' * n,
+    'near-repeat': lambda n: ('aab' * n)[:n],
+    'broken-sequence': lambda n: ('abcx' * n)[:n],
+    'keyboard': lambda n: ('qwertyuiop' * n)[:n],
+    'leet': lambda n: ('p@$$w0r' * n)[:n],
+    'leet-branching': lambda n: '1' * n,
+    'context': lambda n: ('jsmit' * n)[:n],
+    'unicode': lambda n: ''.join(map(chr, range(0x4E00, 0x4E00 + n))),
+    # Un bloque aleatorio fijo repetido: el mismo contenido a cualquier longitud
+    'random': lambda n: (_FUZZ_BLOCK * (n // len(_FUZZ_BLOCK) + 1))[:n],
+}
+
+WORST_CASE_LENGTHS = (1024, 8192)
+
+
+def _worst_case_policy():
+    # Sin max_length: todas las comprobaciones recorren la entrada completa
+    # Más prefijos con l/i que nunca cierran palabra: '1' abre dos ramas leet por carácter
+    branching = [''.join(p) + 'x' for p in itertools.product('li', repeat=10)]
+    dictionary = WordDictionary.from_words(_words(20_000) + branching
+                                           + ['password', 'dragon', 'jsmith'])
+    return PasswordValidator().min_length(8).has_uppercase().has_digits().has_symbols()\
+        .banned_tokens(['acme', 'contoso']).check_dictionary(dictionary).compile()
+
+
+def measure_worst_case(lengths: Sequence[int] = WORST_CASE_LENGTHS, runs: int = 3,
+                       progress=None) -> Dict:
+    """Milisegundos de validate() con contexto por entrada patológica y longitud.
+
+    Se toma el mínimo de `runs` ejecuciones; `growth` es el cociente entre la
+    última longitud y la primera, que en comprobaciones lineales se queda
+    cerca del cociente de longitudes (lengths[-1] / lengths[0]).
+    """
+    policy = _worst_case_policy()
+    results = {}
+    for name, make in ADVERSARIAL.items():
+        timings = {}
+        for length in lengths:
+            password = make(length)
+            samples = []
+            for _ in range(runs):
+                started = time.perf_counter()
+                policy.validate(password, context=CONTEXT)
+                samples.append(time.perf_counter() - started)
+            timings[f'len{length}_ms'] = round(min(samples) * 1000, 3)
+        first, last = timings[f'len{lengths[0]}_ms'], timings[f'len{lengths[-1]}_ms']
+        timings['growth'] = round(last / first, 2) if first else None
+        results[name] = timings
+        if progress:
+            progress(name, timings)
+    return results
+
+
+def _post(client, url: str, body: str):
+    response = client.post(url, data=body, content_type='application/json')
+    if response.status_code != 200:
+        raise RuntimeError(f'{url} devolvió {response.status_code}')
+
+
+def _percentile(ordered: List[int], fraction: float) -> int:
+    # Rango más cercano sobre una lista ya ordenada
+    index = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+def measure(operation: Callable[[int], None], iterations: int, warmup: int = None) -> Dict:
+    """Latencias por llamada (p50/p99 en microsegundos) y operaciones por segundo."""
+    for i in range(warmup if warmup is not None else max(1, iterations // 10)):
+        operation(i)
+    clock = time.perf_counter_ns
+    timings = []
+    started = clock()
+    for i in range(iterations):
+        before = clock()
+        operation(i)
+        timings.append(clock() - before)
+    total = clock() - started
+    timings.sort()
+    return {
+        'iterations': iterations,
+        'p50_us': round(_percentile(timings, 0.50) / 1000, 3),
+        'p99_us': round(_percentile(timings, 0.99) / 1000, 3),
+        'ops_per_second': round(iterations / (total / 1e9), 1) if total else None,
+    }
+
+
+def run_benchmarks(iterations: int = DEFAULT_ITERATIONS, filter: str = None,
+                   progress=None) -> Dict:
+    results = {}
+    for name, operation in cases():
+        if filter and filter not in name:
+            continue
+        results[name] = measure(operation, iterations)
+        if progress:
+            progress(name, results[name])
+    return {'meta': dict(_meta(), iterations=iterations), 'results': results}
+
+
+def _meta() -> Dict:
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+    }
+
+
+# Primera petición de cada tipo tras arrancar: (nombre, método, ruta, cuerpo JSON)
+STARTUP_REQUESTS = (
+    ('validate', 'POST', '/validate', {'password': 'Tr0ub4dor&3xyz'}),
+    ('policy', 'GET', '/policy', None),
+    ('index', 'GET', '/', None),
+)
+
+# Modo -> (usar artefactos, llamar a preload() antes de las peticiones)
+STARTUP_MODES = {
+    'cold': (False, False),
+    'artifacts': (True, False),
+    'preload': (False, True),
+    'artifacts+preload': (True, True),
+}
+
+DEFAULT_STARTUP_RUNS = 5
+
+# Se ejecuta en un intérprete nuevo por medición: los módulos ya importados
+# en este proceso falsearían el arranque
+_STARTUP_SCRIPT = '''
+import json, sys, time
+clock = time.perf_counter
+timings = {}
+started = clock()
+import app
+timings['import_ms'] = (clock() - started) * 1000
+if sys.argv[1] == '1':
+    from preload import preload
+    started = clock()
+    preload()
+    timings['preload_ms'] = (clock() - started) * 1000
+client = app.app.test_client()
+for name, method, url, body in json.loads(sys.argv[2]):
+    started = clock()
+    response = client.open(url, method=method, json=body)
+    timings[name + '_ms'] = (clock() - started) * 1000
+    if response.status_code != 200:
+        raise SystemExit(url + ' devolvió %d' % response.status_code)
+print(json.dumps(timings))
+'''
+
+
+def _startup_run(artifacts_path: str = None, preload: bool = False) -> Dict[str, float]:
+    env = dict(os.environ)
+    env.pop('VALIDATOR_ARTIFACTS_PATH', None)
+    if artifacts_path:
+        env['VALIDATOR_ARTIFACTS_PATH'] = artifacts_path
+    completed = subprocess.run(
+        [sys.executable, '-c', _STARTUP_SCRIPT, '1' if preload else '0',
+         json.dumps(STARTUP_REQUESTS)],
+        cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+        capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.splitlines()[-1])
+
+
+def measure_startup(runs: int = DEFAULT_STARTUP_RUNS,
+                    modes: Sequence[str] = tuple(STARTUP_MODES), progress=None) -> Dict:
+    """Mediana en ms de importar la app y de la primera petición de cada tipo, por modo."""
+    from artifacts import build_artifacts
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        artifacts_path = os.path.join(directory, 'validator.art')
+        if any(STARTUP_MODES[mode][0] for mode in modes):
+            build_artifacts(artifacts_path)
+        for mode in modes:
+            use_artifacts, preload = STARTUP_MODES[mode]
+            samples = [_startup_run(artifacts_path if use_artifacts else None, preload)
+                       for _ in range(runs)]
+            results[mode] = {metric: round(statistics.median(s[metric] for s in samples), 3)
+                             for metric in samples[0]}
+            if progress:
+                progress(mode, results[mode])
+    return results
+
+
+def compare(baseline: Dict, current: Dict, threshold: float = DEFAULT_THRESHOLD,
+            p99_threshold: float = DEFAULT_P99_THRESHOLD) -> List[str]:
+    """Lista de regresiones de `current` frente a `baseline` (vacía si no hay)."""
+    regressions = []
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        for metric, limit in (('p50_us', threshold), ('p99_us', p99_threshold)):
+            if base[metric] and result[metric] > base[metric] * (1 + limit):
+                regressions.append(f'{name}: {metric} {base[metric]} -> {result[metric]} '
+                                   f'(+{result[metric] / base[metric] - 1:.0%})')
+        before, after = base['ops_per_second'], result['ops_per_second']
+        if before and after is not None and after < before / (1 + threshold):
+            regressions.append(f'{name}: ops_per_second {before} -> {after} '
+                               f'({after / before - 1:.0%})')
+    return regressions
+
+
+def print_result(name, result):
+    print(f'{name:<40} p50 {result["p50_us"]:>10.1f} µs  p99 {result["p99_us"]:>10.1f} µs  '
+          f'{result["ops_per_second"]:>12,.0f} op/s', file=sys.stderr)
+
+
+def print_worst_case(name, timings):
+    columns = '  '.join(f'{metric} {value:>9}' for metric, value in timings.items())
+    print(f'{name:<20} {columns}', file=sys.stderr)
+
+
+def print_startup(mode, timings):
+    columns = '  '.join(f'{metric[:-3]} {value:>8.1f} ms' for metric, value in timings.items())
+    print(f'{mode:<20} {columns}', file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks de validación y generación')
+    parser.add_argument('--iterations', type=int, default=DEFAULT_ITERATIONS,
+                        help='llamadas medidas por caso')
+    parser.add_argument('--filter', help='ejecutar sólo los casos cuyo nombre contenga este texto')
+    parser.add_argument('--save', help='guardar los resultados como línea base JSON')
+    parser.add_argument('--compare', help='línea base JSON con la que comparar')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='empeoramiento máximo de p50 y op/s (0.25 = 25%%)')
+    parser.add_argument('--p99-threshold', type=float, default=DEFAULT_P99_THRESHOLD,
+                        help='empeoramiento máximo de p99')
+    parser.add_argument('--startup', action='store_true',
+                        help='medir sólo el arranque: importación y primera petición')
+    parser.add_argument('--runs', type=int, default=DEFAULT_STARTUP_RUNS,
+                        help='procesos por modo de arranque (se toma la mediana)')
+    parser.add_argument('--worst-case', action='store_true',
+                        help='medir sólo el crecimiento con la longitud de entradas patológicas')
+    parser.add_argument('-q', '--quiet', action='store_true', help='no mostrar cada caso')
+    args = parser.parse_args(argv)
+
+    if args.startup:
+        report = {'meta': _meta(), 'results': {},
+                  'startup': measure_startup(args.runs,
+                                             progress=None if args.quiet else print_startup)}
+    elif args.worst_case:
+        report = {'meta': _meta(), 'results': {},
+                  'worst_case': measure_worst_case(
+                      progress=None if args.quiet else print_worst_case)}
+    else:
+        report = run_benchmarks(args.iterations, args.filter,
+                                None if args.quiet else print_result)
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, args.threshold, args.p99_threshold)
+        for regression in regressions:
+            print(f'REGRESIÓN {regression}', file=sys.stderr)
+        if regressions:
+            return 1
+    if not args.save and not args.compare:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(main())
@@ -0,0 +1,221 @@
+"""Índice offline de contraseñas filtradas (estilo Have I Been Pwned).
+
+El índice es un archivo binario ordenado de registros de ancho fijo:
+
+    cabecera   8s magic + Q número de registros
+    buckets    65537 x Q: primer registro de cada prefijo de 16 bits
+    registros  20 bytes SHA-1 + I número de apariciones, ordenados
+
+La búsqueda mapea el archivo en memoria, salta al bucket del prefijo y hace
+una búsqueda binaria dentro de él, así que cada proceso sólo mantiene
+residentes las páginas que toca.
+
+Uso:
+    python breach_index.py build pwned-passwords-sha1.txt breaches.idx
+    python breach_index.py build --plaintext wordlist.txt breaches.idx
+    python breach_index.py lookup breaches.idx 'P@ssw0rd'
+"""
+import argparse
+import hashlib
+import heapq
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from typing import Iterable, Iterator, Tuple
+
+MAGIC = b'PWNIDX1\x00'
+HEADER = struct.Struct('<8sQ')
+BUCKETS = 1 << 16
+BUCKET_TABLE = struct.Struct('<%dQ' % (BUCKETS + 1))
+DIGEST_SIZE = 20
+RECORD = struct.Struct('<20sI')
+MAX_COUNT = 0xFFFFFFFF
+DATA_OFFSET = HEADER.size + BUCKET_TABLE.size
+
+
+def password_digest(password: str) -> bytes:
+    # JSON puede traer surrogates sueltos ("\ud800"): se codifican en lugar de fallar
+    return hashlib.sha1(password.encode('utf-8', 'surrogatepass')).digest()
+
+
+class BreachIndex:
+    """Consulta de solo lectura sobre un índice construido con build_index()."""
+
+    def __init__(self, path: str):
+        self.path = os.fspath(path)
+        with open(self.path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < DATA_OFFSET:
+                raise ValueError(f'{self.path}: índice truncado')
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self._mmap.close()
+            raise ValueError(f'{self.path}: no es un índice de filtraciones')
+        if size != DATA_OFFSET + count * RECORD.size:
+            self._mmap.close()
+            raise ValueError(f'{self.path}: tamaño inconsistente')
+        if hasattr(self._mmap, 'madvise'):
+            self._mmap.madvise(mmap.MADV_RANDOM)
+        self._records = count
+
+    def __len__(self) -> int:
+        return self._records
+
+    def __contains__(self, password: str) -> bool:
+        return self.count(password) > 0
+
+    def __reduce__(self):
+        # Cada proceso (p. ej. workers de multiprocessing) vuelve a mapear el archivo
+        return (type(self), (self.path,))
+
+    def count(self, password: str) -> int:
+        """Número de apariciones de la contraseña en el corpus (0 si no está)."""
+        return self.count_digest(password_digest(password))
+
+    def count_digest(self, digest: bytes) -> int:
+        view = self._mmap
+        bucket = (digest[0] << 8) | digest[1]
+        lo, hi = struct.unpack_from('<2Q', view, HEADER.size + bucket * 8)
+        # Búsqueda binaria dentro del bucket
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            offset = DATA_OFFSET + mid * RECORD.size
+            key = view[offset:offset + DIGEST_SIZE]
+            if key < digest:
+                lo = mid + 1
+            elif key > digest:
+                hi = mid
+            else:
+                return struct.unpack_from('<I', view, offset + DIGEST_SIZE)[0]
+        return 0
+
+    def close(self):
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def parse_hash_lines(lines: Iterable[str], plaintext: bool = False) -> Iterator[Tuple[bytes, int]]:
+    """Convierte líneas 'SHA1[:count]' (o texto plano) en pares (digest, count)."""
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if not line:
+            continue
+        if plaintext:
+            yield password_digest(line), 1
+            continue
+        digest, _, count = line.partition(':')
+        if len(digest) != DIGEST_SIZE * 2:
+            raise ValueError(f'hash SHA-1 inválido: {digest!r}')
+        yield bytes.fromhex(digest), int(count) if count else 1
+
+
+def _write_run(records, directory):
+    records.sort()
+    run = tempfile.TemporaryFile(dir=directory)
+    for digest, count in records:
+        run.write(RECORD.pack(digest, min(count, MAX_COUNT)))
+    run.seek(0)
+    return run
+
+
+def _read_run(run):
+    size = RECORD.size
+    while True:
+        chunk = run.read(size * 4096)
+        if not chunk:
+            return
+        yield from RECORD.iter_unpack(chunk)
+
+
+def build_index(entries: Iterable[Tuple[bytes, int]], output: str,
+                chunk_records: int = 5_000_000, tmp_dir: str = None) -> int:
+    """Construye el índice ordenando por bloques (merge externo) con memoria acotada.
+
+    Devuelve el número de hashes distintos escritos. Los duplicados suman
+    sus apariciones.
+    """
+    runs = []
+    records = []
+    try:
+        for entry in entries:
+            records.append(entry)
+            if len(records) >= chunk_records:
+                runs.append(_write_run(records, tmp_dir))
+                records = []
+        if records or not runs:
+            runs.append(_write_run(records, tmp_dir))
+        records = None
+
+        buckets = [0] * (BUCKETS + 1)
+        written = 0
+        tmp_output = f'{output}.tmp'
+        with open(tmp_output, 'wb') as out:
+            out.write(HEADER.pack(MAGIC, 0))
+            out.write(BUCKET_TABLE.pack(*buckets))
+            current, total = None, 0
+            for digest, count in heapq.merge(*(_read_run(run) for run in runs)):
+                if digest == current:
+                    total += count
+                    continue
+                if current is not None:
+                    out.write(RECORD.pack(current, min(total, MAX_COUNT)))
+                    buckets[((current[0] << 8) | current[1]) + 1] += 1
+                    written += 1
+                current, total = digest, count
+            if current is not None:
+                out.write(RECORD.pack(current, min(total, MAX_COUNT)))
+                buckets[((current[0] << 8) | current[1]) + 1] += 1
+                written += 1
+            # Conteos por bucket -> índice del primer registro de cada bucket
+            for i in range(1, BUCKETS + 1):
+                buckets[i] += buckets[i - 1]
+            out.seek(0)
+            out.write(HEADER.pack(MAGIC, written))
+            out.write(BUCKET_TABLE.pack(*buckets))
+        os.replace(tmp_output, output)
+    finally:
+        for run in runs:
+            run.close()
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Índice offline de contraseñas filtradas')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help='construir un índice desde una lista de hashes')
+    build.add_argument('input', help="archivo con líneas 'SHA1:count' (formato HIBP) o '-' para stdin")
+    build.add_argument('output', help='ruta del índice a generar')
+    build.add_argument('--plaintext', action='store_true',
+                       help='la entrada son contraseñas en claro, una por línea')
+    build.add_argument('--chunk-records', type=int, default=5_000_000,
+                       help='registros ordenados en memoria por bloque')
+    build.add_argument('--tmp-dir', default=None, help='directorio para los bloques temporales')
+
+    lookup = commands.add_parser('lookup', help='consultar una contraseña')
+    lookup.add_argument('index')
+    lookup.add_argument('password')
+
+    args = parser.parse_args(argv)
+    if args.command == 'build':
+        source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+        with source:
+            written = build_index(parse_hash_lines(source, args.plaintext), args.output,
+                                  args.chunk_records, args.tmp_dir)
+        print(f'{written} hashes escritos en {args.output}')
+    else:
+        with BreachIndex(args.index) as index:
+            print(index.count(args.password))
+    return 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(main())
@@ -0,0 +1,207 @@
+"""Clasificación de caracteres por tablas precalculadas.
+
+Cada carácter se traduce a una letra de clase y los conteos de las reglas
+salen de contar esas letras. Las contraseñas ASCII (casi todas) van por el
+camino rápido: encode('ascii') y bytes.translate con una tabla de 256
+bytes. El resto usa str.translate con una tabla que se rellena bajo demanda
+aplicando reglas explícitas de categorías de unicodedata.
+
+Qué cuenta como dígito o símbolo es configurable:
+
+- digits='numeric' (por defecto): str.isdigit(), incluye '²' o '٣'
+- digits='decimal': categoría Nd (dígitos decimales de cualquier escritura)
+- digits='ascii': sólo 0-9
+- symbols='ascii' (por defecto): string.punctuation
+- symbols='unicode': categorías P* y S* ('€', '¿', '…', '→'...)
+
+En ASCII todas las variantes coinciden, así que la tabla rápida es única.
+
+Las propiedades de todos los puntos de código se pueden precalcular en una
+tabla de un byte por carácter (flags_table(), guardada por artifacts.py);
+con install_flags() las tablas bajo demanda la consultan en lugar de
+unicodedata y los dígitos numéricos extra no se recalculan.
+"""
+import string
+import sys
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Iterable
+
+# Clases de carácter: cada carácter se traduce a una letra de clase
+UPPER, LOWER, DIGIT, SYMBOL, SPACE, OTHER = 'U', 'l', 'd', 's', ' ', 'o'
+
+DIGIT_SEMANTICS = ('numeric', 'decimal', 'ascii')
+SYMBOL_SEMANTICS = ('ascii', 'unicode')
+
+_PUNCTUATION = frozenset(string.punctuation)
+
+# Propiedades de un carácter, un bit cada una (flags_table)
+FLAG_SPACE = 1
+FLAG_UPPER = 2
+FLAG_LOWER = 4
+FLAG_NUMERIC = 8        # str.isdigit()
+FLAG_DECIMAL = 16       # categoría Nd
+FLAG_ASCII_DIGIT = 32   # 0-9
+FLAG_PUNCTUATION = 64   # string.punctuation
+FLAG_UNICODE_SYMBOL = 128  # categorías P* y S*
+
+_DIGIT_FLAGS = {'numeric': FLAG_NUMERIC, 'decimal': FLAG_DECIMAL, 'ascii': FLAG_ASCII_DIGIT}
+_SYMBOL_FLAGS = {'ascii': FLAG_PUNCTUATION, 'unicode': FLAG_UNICODE_SYMBOL}
+
+# Tabla de propiedades instalada (install_flags) y los dígitos extra asociados
+_flags = None
+_installed_extras = None
+
+
+def _is_digit(c: str, semantics: str) -> bool:
+    if semantics == 'numeric':
+        return c.isdigit()
+    if semantics == 'decimal':
+        return unicodedata.category(c) == 'Nd'
+    return '0' <= c <= '9'
+
+
+def _is_symbol(c: str, semantics: str) -> bool:
+    if semantics == 'unicode':
+        return unicodedata.category(c)[0] in 'PS'
+    return c in _PUNCTUATION
+
+
+class _ClassTable(dict):
+    """Tabla ord -> letra de clase para str.translate, rellenada bajo demanda."""
+
+    def __init__(self, digits: str, symbols: str):
+        super().__init__()
+        self.digits = digits
+        self.symbols = symbols
+
+    def __missing__(self, code):
+        if _flags is not None:
+            cls = _class_from_flags(_flags[code], self.digits, self.symbols)
+            self[code] = cls
+            return cls
+        c = chr(code)
+        if c == ' ':
+            cls = SPACE
+        elif c.isupper():
+            cls = UPPER
+        elif c.islower():
+            cls = LOWER
+        elif _is_digit(c, self.digits):
+            cls = DIGIT
+        elif _is_symbol(c, self.symbols):
+            cls = SYMBOL
+        else:
+            cls = OTHER
+        self[code] = cls
+        return cls
+
+
+class CharClassifier:
+    """Clasificador con una semántica concreta de dígitos y símbolos."""
+
+    def __init__(self, digits: str = 'numeric', symbols: str = 'ascii'):
+        if digits not in DIGIT_SEMANTICS:
+            raise ValueError(f'digits debe ser uno de {DIGIT_SEMANTICS}')
+        if symbols not in SYMBOL_SEMANTICS:
+            raise ValueError(f'symbols debe ser uno de {SYMBOL_SEMANTICS}')
+        self.digits = digits
+        self.symbols = symbols
+        self.table = _ClassTable(digits, symbols)
+        # Camino rápido: byte ASCII -> código de la letra de clase
+        self.ascii_table = bytes(ord(self.table[code]) for code in range(128)) + bytes(128)
+
+    def counts(self, password: str, classes: Iterable[str]) -> Dict[str, int]:
+        """Número de caracteres de cada clase pedida, en una sola traducción."""
+        if password.isascii():
+            classified = password.encode('ascii').translate(self.ascii_table)
+            return {cls: classified.count(ord(cls)) for cls in classes}
+        classified = password.translate(self.table)
+        return {cls: classified.count(cls) for cls in classes}
+
+    def classify(self, c: str) -> str:
+        return self.table[ord(c)]
+
+    def export(self) -> Dict[str, str]:
+        """Semántica en términos que un cliente pueda reproducir (ver
+        CompiledPolicy.export): mayúsculas y minúsculas son las propiedades
+        Uppercase/Lowercase de Unicode y, con digits='numeric', los dígitos son
+        la categoría Nd más `extra_digits`."""
+        exported = {'digits': self.digits, 'symbols': self.symbols,
+                    'punctuation': string.punctuation}
+        if self.digits == 'numeric':
+            exported['extra_digits'] = _numeric_extras()
+        return exported
+
+
+def _class_from_flags(flags: int, digits: str, symbols: str) -> str:
+    # Mismo orden de reglas que _ClassTable.__missing__
+    if flags & FLAG_SPACE:
+        return SPACE
+    if flags & FLAG_UPPER:
+        return UPPER
+    if flags & FLAG_LOWER:
+        return LOWER
+    if flags & _DIGIT_FLAGS[digits]:
+        return DIGIT
+    if flags & _SYMBOL_FLAGS[symbols]:
+        return SYMBOL
+    return OTHER
+
+
+def char_flags(c: str) -> int:
+    """Propiedades (FLAG_*) de un carácter."""
+    category = unicodedata.category(c)
+    flags = 0
+    if c == ' ':
+        flags |= FLAG_SPACE
+    if c.isupper():
+        flags |= FLAG_UPPER
+    if c.islower():
+        flags |= FLAG_LOWER
+    if c.isdigit():
+        flags |= FLAG_NUMERIC
+    if category == 'Nd':
+        flags |= FLAG_DECIMAL
+    if '0' <= c <= '9':
+        flags |= FLAG_ASCII_DIGIT
+    if c in _PUNCTUATION:
+        flags |= FLAG_PUNCTUATION
+    if category[0] in 'PS':
+        flags |= FLAG_UNICODE_SYMBOL
+    return flags
+
+
+def flags_table() -> bytes:
+    """Propiedades de todos los puntos de código (1,1 MB; se genera offline)."""
+    return bytes(map(char_flags, map(chr, range(sys.maxunicode + 1))))
+
+
+def install_flags(table, numeric_extras: str):
+    """Usa una tabla de flags_table() ya calculada (p. ej. mapeada desde disco).
+
+    Debe generarse con la misma versión de Unicode (unicodedata.unidata_version).
+    """
+    global _flags, _installed_extras
+    if len(table) != sys.maxunicode + 1:
+        raise ValueError('tabla de propiedades con tamaño incorrecto')
+    _flags = table
+    _installed_extras = numeric_extras
+    # Los clasificadores ya creados pueden tener entradas calculadas sin la tabla:
+    # son equivalentes, así que se conservan
+    _numeric_extras.cache_clear()
+
+
+@lru_cache(maxsize=None)
+def _numeric_extras() -> str:
+    # Caracteres con str.isdigit() fuera de Nd: '²', '①'...
+    if _installed_extras is not None:
+        return _installed_extras
+    return ''.join(c for c in map(chr, range(sys.maxunicode + 1))
+                   if c.isdigit() and unicodedata.category(c) != 'Nd')
+
+
+@lru_cache(maxsize=None)
+def classifier(digits: str = 'numeric', symbols: str = 'ascii') -> CharClassifier:
+    """Clasificador compartido para cada semántica."""
+    return CharClassifier(digits, symbols)
@@ -0,0 +1,344 @@
+"""Diccionario de palabras y contraseñas comunes para buscar como subcadenas.
+
+Las palabras se guardan en un trie compacto respaldado por arrays, sin un
+objeto de Python por nodo. Los nodos están numerados en anchura (BFS), de
+modo que las aristas de cada nodo son contiguas y la arista j lleva siempre
+al nodo j + 1:
+
+    cabecera   8s magic + I nodos + I longitud mínima de palabra
+    first      (nodos + 1) x I: primera arista de cada nodo
+    terminal   ceil(nodos / 8) bytes: bit n encendido si el nodo n cierra una palabra
+    labels     (nodos - 1) bytes: byte UTF-8 de cada arista, ordenados por nodo
+
+Buscar un hijo es un bytes.find() (en C) dentro del tramo de aristas del
+nodo y el archivo se mapea en memoria, así que 1M de palabras ocupan unos
+pocos MB compartidos entre procesos. La contraseña se recorre desde cada
+posición en minúsculas y las sustituciones leet (@ -> a, 0 -> o, 1 -> l/i,
+$ -> s) se prueban sólo cuando el trie tiene esa arista, en lugar de
+generar de antemano todas las variantes.
+
+Uso:
+    python dictionary.py build wordlist.txt words.dict
+    python dictionary.py lookup words.dict 'P@ssw0rd2024!'
+"""
+import argparse
+import hashlib
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+from collections import deque
+from typing import Iterable, List, Tuple, Union
+
+MAGIC = b'PWDICT1\x00'
+HEADER = struct.Struct('<8sII')
+# Las palabras más cortas aparecen por azar en cualquier contraseña
+DEFAULT_MIN_LENGTH = 4
+# Sustituciones leet seguidas como máximo desde cada posición de inicio. Cada
+# (nodo, posición) ya es único por inicio, así que memorizar no ahorra nada:
+# lo que crece con listas grandes es el número de ramas ('1' -> l/i en cada
+# carácter). Con el tope el trabajo por posición es constante
+MAX_LEET_EXPANSIONS = 32
+
+# Carácter de la contraseña -> letras que puede estar sustituyendo
+LEET = {'@': 'a', '0': 'o', '1': 'li', '$': 's'}
+
+# mmap.find() sólo acepta bytes: un objeto de un byte por valor, creado una vez
+_BYTES = tuple(bytes((i,)) for i in range(256))
+
+
+def _variants(c: str) -> Tuple[bytes, ...]:
+    # Variantes de un carácter: él mismo en minúsculas y UTF-8 y las letras
+    # leet que puede representar
+    c = c.lower()
+    return (c.encode('utf-8', 'surrogatepass'),) + tuple(s.encode() for s in LEET.get(c, ''))
+
+
+# Variantes de cada carácter ASCII, calculadas una vez
+_ASCII_VARIANTS = tuple(_variants(chr(i)) for i in range(128))
+
+
+def _normalize(word: str) -> bytes:
+    return word.strip().lower().encode('utf-8', 'surrogatepass')
+
+
+def build_trie(words: Iterable[str], min_length: int = DEFAULT_MIN_LENGTH) -> bytes:
+    """Serializa las palabras (en minúsculas, sin repetir) en el formato del módulo.
+
+    El trie se construye por niveles sobre la lista ordenada: cada nodo es el
+    rango de palabras que comparten su prefijo, así que no hace falta crear
+    nodos intermedios.
+    """
+    ordered = sorted({word for word in map(_normalize, words)
+                      if len(word.decode('utf-8', 'surrogatepass')) >= min_length})
+    first = array('I')
+    terminal = bytearray()
+    labels = bytearray()
+    # (inicio, fin, profundidad): palabras ordered[inicio:fin] con el prefijo del nodo
+    pending = deque([(0, len(ordered), 0)])
+    node = 0
+    while pending:
+        lo, hi, depth = pending.popleft()
+        first.append(len(labels))
+        if node % 8 == 0:
+            terminal.append(0)
+        # Al estar ordenadas, la palabra igual al prefijo va primero
+        if lo < hi and len(ordered[lo]) == depth:
+            terminal[node >> 3] |= 1 << (node & 7)
+            lo += 1
+        while lo < hi:
+            label = ordered[lo][depth]
+            end = lo + 1
+            while end < hi and ordered[end][depth] == label:
+                end += 1
+            labels.append(label)
+            pending.append((lo, end, depth + 1))
+            lo = end
+        node += 1
+    first.append(len(labels))
+    if sys.byteorder != 'little':  # pragma: no cover - depende de la plataforma
+        first.byteswap()
+    return HEADER.pack(MAGIC, node, min_length) + first.tobytes() + bytes(terminal) + bytes(labels)
+
+
+class WordDictionary:
+    """Consulta de solo lectura sobre un trie de build_trie() (en memoria o en disco).
+
+    Con `offset` y `length` el trie es un tramo de un archivo mayor (p. ej. los
+    artefactos de artifacts.py); todas las posiciones son absolutas en el mapeo.
+    """
+
+    def __init__(self, source: Union[str, os.PathLike, bytes], offset: int = 0,
+                 length: int = None):
+        if isinstance(source, (bytes, bytearray)):
+            self.path = None
+            self._buffer = bytes(source)
+            # Identifica el contenido en la huella de las políticas
+            self.source_id = hashlib.sha256(self._buffer).hexdigest()[:16]
+        else:
+            self.path = self.source_id = os.fspath(source)
+            with open(self.path, 'rb') as f:
+                self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if offset:
+                self.source_id = f'{self.path}@{offset}'
+        self._offset = offset
+        self._length = length
+        end = len(self._buffer) if length is None else offset + length
+        name = self.path or 'diccionario'
+        if end - offset < HEADER.size or end > len(self._buffer):
+            raise ValueError(f'{name}: diccionario truncado')
+        magic, nodes, min_length = HEADER.unpack_from(self._buffer, offset)
+        if magic != MAGIC:
+            raise ValueError(f'{name}: no es un diccionario')
+        first_offset = offset + HEADER.size
+        self._terminal = first_offset + (nodes + 1) * 4
+        self._labels = self._terminal + (nodes + 7) // 8
+        if end != self._labels + max(nodes - 1, 0):
+            raise ValueError(f'{name}: tamaño inconsistente')
+        view = memoryview(self._buffer)[first_offset:self._terminal]
+        if sys.byteorder == 'little':
+            self._first = view.cast('I')
+        else:  # pragma: no cover - depende de la plataforma
+            self._first = array('I', view.tobytes())
+            self._first.byteswap()
+        self.nodes = nodes
+        self.min_length = min_length
+        self._starts = self._start_pattern()
+
+    @classmethod
+    def from_words(cls, words: Iterable[str],
+                   min_length: int = DEFAULT_MIN_LENGTH) -> 'WordDictionary':
+        return cls(build_trie(words, min_length))
+
+    def __reduce__(self):
+        # Desde archivo, cada proceso vuelve a mapearlo; en memoria se copian los bytes
+        if self.path is None:
+            return (type(self), (self._buffer,))
+        return (type(self), (self.path, self._offset, self._length))
+
+    def _child(self, node: int, label: bytes) -> int:
+        # Arista con ese byte entre las del nodo; el hijo es arista + 1 (-1 si no hay)
+        first = self._first
+        start = self._labels + first[node]
+        position = self._buffer.find(label, start, self._labels + first[node + 1])
+        return -1 if position == -1 else position - self._labels + 1
+
+    def _is_terminal(self, node: int) -> bool:
+        return self._buffer[self._terminal + (node >> 3)] >> (node & 7) & 1 == 1
+
+    def __contains__(self, word: str) -> bool:
+        node = 0
+        for label in _normalize(word):
+            node = self._child(node, _BYTES[label])
+            if node == -1:
+                return False
+        return self._is_terminal(node)
+
+    def _start_pattern(self):
+        # Caracteres que pueden empezar una palabra (por sí mismos o como leet):
+        # un finditer() en C descarta el resto de posiciones de inicio
+        first = self._first
+        roots = {self._buffer[self._labels + edge] for edge in range(first[0], first[1])}
+        chars = {chr(b) for b in roots if b < 0x80}
+        chars.update(c for c, substitutes in LEET.items() if chars.intersection(substitutes))
+        pattern = ''.join(sorted(map(re.escape, chars)))
+        if any(b >= 0x80 for b in roots):
+            # Letras no ASCII: cualquier carácter no ASCII puede empezar una palabra
+            pattern += '\\u0080-\\U0010ffff'
+        if not pattern:
+            return re.compile(r'(?!)')
+        return re.compile(f'[{pattern}]', re.IGNORECASE)
+
+    def _options(self, password: str) -> List[Tuple[bytes, ...]]:
+        # Variantes de cada carácter; una entrada por carácter, para que los
+        # tramos sean posiciones de `password`
+        if password.isascii():
+            return [_ASCII_VARIANTS[b] for b in password.encode()]
+        return [_variants(c) for c in password]
+
+    def _candidates(self, password: str) -> List[int]:
+        # Posiciones donde puede empezar una palabra de min_length caracteres o más
+        last = len(password) - self.min_length
+        return [m.start() for m in self._starts.finditer(password, 0, max(last + 1, 0))]
+
+    def _descend(self, node: int, encoded: bytes) -> int:
+        # Caracteres de varios bytes: una arista por byte
+        for label in encoded:
+            node = self._child(node, _BYTES[label])
+            if node == -1:
+                break
+        return node
+
+    def _matches(self, password: str, first_match: bool = False) -> List[Tuple[int, int]]:
+        """Pares (inicio, fin) de la palabra más larga que empieza en cada posición.
+
+        Se recorre el trie desde todas las posiciones candidatas a la vez
+        (una pila de (nodo, inicio, posición)); las variantes leet sólo se
+        siguen si el trie tiene la arista, y como mucho MAX_LEET_EXPANSIONS
+        desde cada inicio (los caracteres tal cual se siguen siempre). Con
+        `first_match` se detiene en la primera palabra. Es el bucle caliente:
+        _child() y _is_terminal() van en línea.
+        """
+        starts = self._candidates(password)
+        if not starts:
+            return []
+        options = self._options(password)
+        buffer = self._buffer
+        find = buffer.find
+        first = self._first
+        base = self._labels
+        terminal = self._terminal
+        min_length = self.min_length
+        limit = len(options)
+        longest = {}
+        # LIFO: cada inicio se recorre entero antes de pasar al siguiente
+        stack = [(0, start, start) for start in reversed(starts)]
+        pop = stack.pop
+        push = stack.append
+        current = -1
+        budget = 0
+        while stack:
+            node, start, position = pop()
+            if start != current:
+                current = start
+                budget = MAX_LEET_EXPANSIONS
+            if (position - start >= min_length
+                    and buffer[terminal + (node >> 3)] >> (node & 7) & 1):
+                if first_match:
+                    return [(start, position)]
+                if position > longest.get(start, -1):
+                    longest[start] = position
+            if position == limit:
+                continue
+            low = base + first[node]
+            high = base + first[node + 1]
+            if low == high:
+                continue
+            variants = options[position]
+            position += 1
+            for index, variant in enumerate(variants):
+                if len(variant) == 1:
+                    if index:
+                        # Las variantes leet van después del carácter tal cual
+                        if not budget:
+                            break
+                    found = find(variant, low, high)
+                    if found != -1:
+                        push((found - base + 1, start, position))
+                        if index:
+                            budget -= 1
+                else:
+                    target = self._descend(node, variant)
+                    if target != -1:
+                        push((target, start, position))
+        return sorted(longest.items())
+
+    def find_spans(self, password: str) -> List[Tuple[int, int]]:
+        """Tramos [inicio, fin) de la contraseña que son palabras del diccionario."""
+        spans = []
+        for start, end in self._matches(password):
+            if spans and start < spans[-1][1]:
+                spans[-1] = (spans[-1][0], max(spans[-1][1], end))
+            else:
+                spans.append((start, end))
+        return spans
+
+    def search(self, password: str) -> bool:
+        """Si alguna subcadena es una palabra del diccionario (se detiene en la primera)."""
+        return bool(self._matches(password, True))
+
+    def close(self):
+        if isinstance(self._buffer, mmap.mmap):
+            if isinstance(self._first, memoryview):
+                self._first.release()
+            self._buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def build_dictionary(words: Iterable[str], output: str,
+                     min_length: int = DEFAULT_MIN_LENGTH) -> int:
+    """Escribe el diccionario en `output` y devuelve el número de nodos."""
+    data = build_trie(words, min_length)
+    tmp_output = f'{output}.tmp'
+    with open(tmp_output, 'wb') as out:
+        out.write(data)
+    os.replace(tmp_output, output)
+    return HEADER.unpack_from(data, 0)[1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Diccionario de palabras comunes (trie compacto)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help='construir el diccionario desde una lista de palabras')
+    build.add_argument('input', help="archivo con una palabra por línea o '-' para stdin")
+    build.add_argument('output', help='ruta del diccionario a generar')
+    build.add_argument('--min-length', type=int, default=DEFAULT_MIN_LENGTH,
+                       help='descartar palabras más cortas')
+
+    lookup = commands.add_parser('lookup', help='buscar las palabras contenidas en una contraseña')
+    lookup.add_argument('dictionary')
+    lookup.add_argument('password')
+
+    args = parser.parse_args(argv)
+    if args.command == 'build':
+        source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+        with source:
+            nodes = build_dictionary(source, args.output, args.min_length)
+        print(f'{nodes} nodos escritos en {args.output}')
+    else:
+        with WordDictionary(args.dictionary) as dictionary:
+            for start, end in dictionary.find_spans(args.password):
+                print(f'{start}-{end}\t{args.password[start:end]}')
+    return 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(main())
@@ -0,0 +1,330 @@
+"""Generación de contraseñas con CSPRNG, individual y masiva.
+
+Los caracteres salen de bloques grandes de os.urandom: bytes.translate
+convierte cada byte en un carácter del alfabeto y descarta a la vez los
+bytes por encima del mayor múltiplo del tamaño del alfabeto, así que la
+reducción módulo n no introduce sesgo y el trabajo por carácter ocurre en C.
+Las candidatas que no cumplen los mínimos de la política se rechazan (y las
+que falten en el lote se construyen), de modo que el coste de cada lote está
+acotado.
+
+Después, una sola pasada por el autómata de secuencias (patterns.py)
+sustituye cada carácter que cerraría una secuencia, un recorrido de
+teclado, un token prohibido o una triple repetición por otro de su misma
+clase: los conteos no cambian y la contraseña cumple la política por
+construcción, sin generar, validar y reintentar. Para que la sustitución
+nunca se quede sin opciones sólo se pasa por estados "seguros" del
+autómata, calculados una vez por política (_safe_states).
+"""
+import os
+import random
+import re
+import string
+from collections import Counter
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from patterns import SequenceAutomaton, build_automaton
+
+# Mismo alfabeto que el generador original (sin espacios)
+ALPHABET = string.ascii_letters + string.digits + string.punctuation
+
+# Tipo de regla -> caracteres de su clase
+CLASS_CHARS = {
+    'uppercase': string.ascii_uppercase,
+    'lowercase': string.ascii_lowercase,
+    'digits': string.digits,
+    'symbols': string.punctuation,
+}
+
+# Cada byte del alfabeto -> letra de su clase, para contar con bytes.count
+_CLASS_CODES = {'uppercase': b'U', 'lowercase': b'l', 'digits': b'd', 'symbols': b's'}
+_CLASS_TABLE = bytes.maketrans(
+    ''.join(CLASS_CHARS.values()).encode('ascii'),
+    b''.join(code * len(CLASS_CHARS[rule]) for rule, code in _CLASS_CODES.items()))
+
+# Contraseñas por lote y límite de candidatas por llamada a os.urandom
+BATCH_SIZE = 1024
+_MAX_CANDIDATES = 65536
+# Por debajo de esta tasa de aceptación se construyen en lugar de rechazar
+_MIN_ACCEPTANCE = 0.02
+# Lotes seguidos sin ninguna contraseña aceptada por el filtro antes de rendirse
+MAX_REJECTED_BATCHES = 8
+
+# Tres caracteres iguales seguidos (la regla `repetition` de validator.py)
+_REPETITION = re.compile(r'(.)\1{2,}')
+
+# Conteo por estado (un byte) -> 1 si hay al menos dos opciones
+_AT_LEAST_TWO = bytes(2) + b'\x01' * 254
+
+_system_random = random.SystemRandom()
+
+
+class UniformSource:
+    """Caracteres uniformes de un alfabeto de hasta 256 símbolos ASCII."""
+
+    def __init__(self, alphabet: str):
+        size = len(alphabet)
+        if not 0 < size <= 256:
+            raise ValueError('el alfabeto debe tener entre 1 y 256 caracteres')
+        encoded = alphabet.encode('ascii')
+        self.alphabet = alphabet
+        # Mayor múltiplo de size que cabe en un byte: lo que sobra se descarta
+        self._limit = 256 - 256 % size
+        self._table = bytes(encoded[b % size] for b in range(256))
+        self._reject = bytes(range(self._limit, 256))
+
+    def draw(self, n: int) -> bytes:
+        chunks = []
+        needed = n
+        while needed > 0:
+            # Se pide algo más de lo necesario para compensar los descartes
+            raw = os.urandom(needed * 256 // self._limit + 16)
+            chunk = raw.translate(self._table, self._reject)
+            chunks.append(chunk)
+            needed -= len(chunk)
+        data = b''.join(chunks)
+        return data[:n] if len(data) > n else data
+
+
+def requirements(rules: Iterable[Tuple[str, object]]) -> Tuple[Tuple[str, int], ...]:
+    """Mínimo por clase de carácter que exige la política."""
+    required = {}
+    for rule, value in rules:
+        if rule in CLASS_CHARS and value:
+            required[rule] = max(required.get(rule, 0), value)
+    return tuple(sorted(required.items()))
+
+
+def length_bounds(rules: Iterable[Tuple[str, object]]) -> Tuple[int, Optional[int]]:
+    """Longitud mínima y máxima (None si no hay) que exige la política."""
+    low, high = 0, None
+    for rule, value in rules:
+        if rule == 'min_length':
+            low = max(low, value)
+        elif rule == 'max_length':
+            high = value if high is None else min(high, value)
+    return low, high
+
+
+def _safe_states(automaton: SequenceAutomaton, pools: Iterable[str]) -> bytes:
+    """Un byte por estado: 1 si desde él cualquier clase de `pools` puede seguir.
+
+    Un estado es seguro si no cierra ningún patrón y, para cada clase, al
+    menos dos de sus caracteres llevan a otro estado seguro (dos, porque la
+    triple repetición puede prohibir uno). Es el mayor punto fijo: se parte
+    de todos los estados y se quitan los que no cumplen hasta que no cambia.
+    Los conteos de todos los estados se suman a la vez como enteros grandes
+    de un byte por estado (ninguna clase llega a 256 caracteres).
+
+    Es conservador: una clase con un único carácter admitido se trata como
+    bloqueada aunque algunas contraseñas aún fueran posibles.
+    """
+    table = automaton.table
+    width = automaton.width
+    states = automaton.states
+    # Por clase: (estado siguiente desde cada estado, caracteres con esa columna)
+    moves = []
+    for pool in pools:
+        columns = Counter(automaton.column(ord(c)) for c in pool)
+        moves.append([(table[column::width], n) for column, n in columns.items()])
+    safe = bytes(0 if length else 1 for length in automaton.out)
+    while True:
+        current = int.from_bytes(safe, 'little')
+        for class_moves in moves:
+            total = 0
+            for following, n in class_moves:
+                total += int.from_bytes(bytes(map(safe.__getitem__, following)), 'little') * n
+            enough = total.to_bytes(states, 'little').translate(_AT_LEAST_TWO)
+            current &= int.from_bytes(enough, 'little')
+        updated = current.to_bytes(states, 'little')
+        if updated == safe:
+            return safe
+        safe = updated
+
+
+class BulkGenerator:
+    """Generador para una política (mínimos por clase, longitudes y tokens
+    prohibidos); seguro entre hilos.
+
+    Lanza ValueError al crearse si las secuencias y los tokens prohibidos no
+    dejan formar contraseñas, y generate_many() si la longitud pedida no
+    puede cumplir la política.
+    """
+
+    def __init__(self, required: Tuple[Tuple[str, int], ...] = (),
+                 banned_tokens: Tuple[str, ...] = (), min_length: int = 0,
+                 max_length: Optional[int] = None):
+        self.required = required
+        self.minimum = sum(count for _, count in required)
+        self.min_length = min_length
+        self.max_length = max_length
+        self._checks = tuple((_CLASS_CODES[rule], count) for rule, count in required)
+        self._automaton = automaton = build_automaton(banned_tokens)
+        classes = list(CLASS_CHARS)
+        safe = _safe_states(automaton, [CLASS_CHARS[rule] for rule in classes])
+        if not safe[0] and required:
+            # Alguna clase no exigida está bloqueada: se rellena sólo con las exigidas
+            classes = [rule for rule, _ in required]
+            safe = _safe_states(automaton, [CLASS_CHARS[rule] for rule in classes])
+        if not safe[0]:
+            raise ValueError('las secuencias y los tokens prohibidos no dejan '
+                             'formar contraseñas con estas clases')
+        self._safe = safe
+        self._class_of: Dict[str, str] = {c: CLASS_CHARS[rule] for rule in classes
+                                          for c in CLASS_CHARS[rule]}
+        self._chars = UniformSource(''.join(c for c in ALPHABET if c in self._class_of))
+        self._pools = {rule: UniformSource(CLASS_CHARS[rule]) for rule, _ in required}
+        # Las contraseñas generadas son ASCII: columnas con bytes.translate
+        if automaton.width < 256:
+            self._columns = bytes(map(automaton.column, range(128))) + bytes(128)
+        else:
+            self._columns = None
+
+    def _encode(self, password: str):
+        if self._columns is None:
+            return list(self._automaton.encode(password))
+        return password.encode('ascii').translate(self._columns)
+
+    def check_length(self, length: int):
+        """ValueError si ninguna contraseña de `length` caracteres cumple la política."""
+        if length < 1:
+            raise ValueError('la longitud debe ser positiva')
+        if length < self.min_length:
+            raise ValueError(f'la política exige al menos {self.min_length} caracteres')
+        if self.max_length is not None and length > self.max_length:
+            raise ValueError(f'la política admite como máximo {self.max_length} caracteres')
+        if length < self.minimum:
+            raise ValueError(f'los mínimos por clase suman {self.minimum} caracteres, '
+                             f'más que la longitud pedida ({length})')
+
+    def generate(self, length: int = 12, accept: Callable[[str], bool] = None) -> str:
+        return next(self.generate_many(1, length, accept))
+
+    def generate_many(self, count: int, length: int = 12,
+                      accept: Callable[[str], bool] = None) -> Iterator[str]:
+        """Genera `count` contraseñas en lotes, bajo demanda.
+
+        La longitud se comprueba antes de devolver el iterador. `accept`
+        filtra lo que no se puede garantizar al construir (lista de comunes,
+        diccionario, filtraciones): las rechazadas se reemplazan, y tras
+        MAX_REJECTED_BATCHES lotes seguidos sin ninguna aceptada se lanza
+        ValueError.
+        """
+        self.check_length(length)
+        return self._generate(count, length, accept)
+
+    def _generate(self, count: int, length: int, accept) -> Iterator[str]:
+        remaining = count
+        acceptance = 1.0
+        rejected_batches = 0
+        while remaining > 0:
+            batch, acceptance = self._batch(min(remaining, BATCH_SIZE), length, acceptance)
+            batch = list(map(self._repair, batch))
+            if accept is not None:
+                batch = list(filter(accept, batch))
+                if not batch:
+                    rejected_batches += 1
+                    if rejected_batches == MAX_REJECTED_BATCHES:
+                        raise ValueError('la política rechaza todas las contraseñas generadas '
+                                         '(lista de comunes o diccionario)')
+                    continue
+                rejected_batches = 0
+            remaining -= len(batch)
+            yield from batch
+
+    def _batch(self, wanted: int, length: int, acceptance: float) -> Tuple[List[str], float]:
+        # Exactamente `wanted` contraseñas con los mínimos: por rechazo mientras
+        # la tasa de aceptación lo permita y construyendo las que falten
+        batch = []
+        if acceptance >= _MIN_ACCEPTANCE:
+            candidates = min(int(wanted / acceptance) + 8, _MAX_CANDIDATES)
+            batch = self._sample(candidates, length)
+            acceptance = len(batch) / candidates
+            del batch[wanted:]
+        batch.extend(self._construct(length) for _ in range(wanted - len(batch)))
+        return batch, acceptance
+
+    def _sample(self, candidates: int, length: int) -> List[str]:
+        data = self._chars.draw(candidates * length)
+        text = data.decode('ascii')
+        size = len(text)
+        if not self._checks:
+            return [text[i:i + length] for i in range(0, size, length)]
+        classes = data.translate(_CLASS_TABLE)
+        checks = self._checks
+        accepted = []
+        for i in range(0, size, length):
+            found = classes[i:i + length]
+            for code, count in checks:
+                if found.count(code) < count:
+                    break
+            else:
+                accepted.append(text[i:i + length])
+        return accepted
+
+    def _construct(self, length: int) -> str:
+        # Políticas muy ajustadas: mínimos de cada clase más relleno, mezclado
+        password = []
+        for rule, count in self.required:
+            password.extend(self._pools[rule].draw(count).decode('ascii'))
+        password.extend(self._chars.draw(length - len(password)).decode('ascii'))
+        _system_random.shuffle(password)
+        return ''.join(password)
+
+    def _repair(self, password: str) -> str:
+        """Una pasada por el autómata sustituyendo los caracteres que no se admiten.
+
+        Un carácter se admite si lleva a un estado seguro (no cierra ningún
+        patrón) y no es el tercero igual seguido. Si no, se cambia por otro de
+        su clase que cumpla ambas cosas: desde un estado seguro siempre hay al
+        menos uno, así que el coste es O(longitud) en el peor caso.
+        """
+        automaton = self._automaton
+        table = automaton.table
+        width = automaton.width
+        safe = self._safe
+        columns = self._encode(password)
+        # Lo habitual es que no haya nada que cambiar: recorrido sin más trabajo
+        state = 0
+        for column in columns:
+            state = table[state * width + column]
+            if not safe[state]:
+                break
+        else:
+            if _REPETITION.search(password) is None:
+                return password
+        chars = None
+        state = 0
+        previous = before = ''
+        for i, column in enumerate(columns):
+            following = table[state * width + column]
+            c = password[i]
+            if not safe[following] or c == previous == before:
+                c, following = self._substitute(state, previous, before, self._class_of[c])
+                if chars is None:
+                    chars = list(password)
+                chars[i] = c
+            state = following
+            before, previous = previous, c
+        return password if chars is None else ''.join(chars)
+
+    def _substitute(self, state: int, previous: str, before: str, pool: str) -> Tuple[str, int]:
+        automaton = self._automaton
+        table = automaton.table
+        base = state * automaton.width
+        safe = self._safe
+        options = []
+        for c in pool:
+            following = table[base + automaton.column(ord(c))]
+            if safe[following] and not c == previous == before:
+                options.append((c, following))
+        return _system_random.choice(options)
+
+
+@lru_cache(maxsize=64)
+def bulk_generator(required: Tuple[Tuple[str, int], ...] = (),
+                   banned_tokens: Tuple[str, ...] = (), min_length: int = 0,
+                   max_length: Optional[int] = None) -> BulkGenerator:
+    """Generador compartido por todas las políticas con las mismas restricciones."""
+    return BulkGenerator(required, banned_tokens, min_length, max_length)
@@ -0,0 +1,24 @@
+"""Configuración de gunicorn: la app se carga una vez en el maestro.
+
+    VALIDATOR_ARTIFACTS_PATH=validator.art gunicorn -c gunicorn.conf.py
+
+Con preload_app el maestro importa app.py (políticas, autómatas, índices
+mapeados) y preload.py calienta el resto antes del fork; los workers heredan
+todo por copy-on-write en lugar de construir cada uno su copia.
+"""
+import os
+
+wsgi_app = 'app:app'
+bind = os.environ.get('BIND', '0.0.0.0:8000')
+# Las sesiones de /validate/session viven en cada worker (ver sessions.py):
+# para usarlas, WEB_CONCURRENCY=1 y concurrencia con GUNICORN_THREADS
+workers = int(os.environ.get('WEB_CONCURRENCY', os.cpu_count() or 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+preload_app = True
+
+
+def when_ready(server):
+    # Se ejecuta en el maestro, con la app ya importada y antes del primer fork
+    from preload import preload
+    timings = preload()
+    server.log.info('Validador precargado (ms): %s', timings)
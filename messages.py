@@ -0,0 +1,96 @@
+"""Catálogos de mensajes de validación por idioma.
+
+Los resultados compactos (validator.CompactResult) sólo guardan qué reglas
+se superaron y los conteos; etiquetas y mensajes se generan al serializar.
+compile_catalog() resuelve una vez por reglas e idioma las etiquetas con sus
+valores, así que renderizar un resultado sólo concatena conteos y el mismo
+resultado sirve para respuestas en cualquier idioma.
+"""
+from functools import lru_cache
+from typing import Tuple
+
+DEFAULT_LANGUAGE = 'es'
+
+CATALOGS = {
+    'es': {
+        # Tipo de regla -> (etiqueta, prefijo del mensaje seguido del conteo)
+        'rules': {
+            'min_length': ('Mínimo {} caracteres', 'Longitud actual: '),
+            'max_length': ('Máximo {} caracteres', 'Longitud actual: '),
+            'uppercase': ('Al menos {} mayúscula(s)', 'Encontradas: '),
+            'lowercase': ('Al menos {} minúscula(s)', 'Encontradas: '),
+            'digits': ('Al menos {} número(s)', 'Encontrados: '),
+            'symbols': ('Al menos {} símbolo(s)', 'Encontrados: '),
+            'no_spaces': ('Sin espacios', None),
+        },
+        # Mensajes de no_spaces (superada, fallada)
+        'no_spaces': ('OK', 'Espacios encontrados'),
+        # Reglas adicionales: (etiqueta, mensaje al fallar)
+        'common': ('No usar contraseñas comunes', 'Esta es una contraseña muy común'),
+        'breached': 'Esta contraseña aparece {} veces en filtraciones',
+        # Palabra del diccionario (dictionary.py) dentro de la contraseña
+        'dictionary': 'Contiene una palabra o contraseña común',
+        'sequence': ('Sin secuencias obvias', 'Contiene secuencias como abc, 123, qwerty, etc.'),
+        'repetition': ('Sin caracteres repetidos', 'Contiene 3+ caracteres repetidos'),
+        # {} son los campos del contexto (username, email...) a los que se parece
+        'context': ('Sin parecido con tus datos', 'Se parece a tus datos: {}'),
+    },
+    'en': {
+        'rules': {
+            'min_length': ('At least {} characters', 'Current length: '),
+            'max_length': ('At most {} characters', 'Current length: '),
+            'uppercase': ('At least {} uppercase letter(s)', 'Found: '),
+            'lowercase': ('At least {} lowercase letter(s)', 'Found: '),
+            'digits': ('At least {} digit(s)', 'Found: '),
+            'symbols': ('At least {} symbol(s)', 'Found: '),
+            'no_spaces': ('No spaces', None),
+        },
+        'no_spaces': ('OK', 'Spaces found'),
+        'common': ('Do not use common passwords', 'This is a very common password'),
+        'breached': 'This password appears {} times in breaches',
+        'dictionary': 'Contains a common word or password',
+        'sequence': ('No obvious sequences', 'Contains sequences such as abc, 123, qwerty, etc.'),
+        'repetition': ('No repeated characters', 'Contains 3+ repeated characters'),
+        'context': ('Not similar to your details', 'Too similar to your details: {}'),
+    },
+}
+
+LANGUAGES = tuple(CATALOGS)
+
+
+class Catalog:
+    """Mensajes ya resueltos para unas reglas concretas en un idioma."""
+
+    __slots__ = ('language', 'rules', 'common', 'breached', 'dictionary', 'sequence',
+                 'repetition', 'context', 'labels')
+
+    def __init__(self, rules: Tuple, language: str):
+        catalog = CATALOGS[language]
+        passed_message, failed_message = catalog['no_spaces']
+        resolved = []
+        for rule, value in rules:
+            spec = catalog['rules'].get(rule)
+            if spec is None:
+                continue
+            label, prefix = spec
+            # (etiqueta, prefijo del conteo o None, mensaje si pasa, mensaje si falla)
+            resolved.append((label.format(value), prefix, passed_message, failed_message))
+        self.language = language
+        self.rules = tuple(resolved)
+        self.common = catalog['common']
+        self.breached = catalog['breached']
+        self.dictionary = catalog['dictionary']
+        self.sequence = catalog['sequence']
+        self.repetition = catalog['repetition']
+        self.context = catalog['context']
+        # Etiqueta de cada bit de la máscara, en orden
+        self.labels = tuple(entry[0] for entry in self.rules) + (
+            self.common[0], self.sequence[0], self.repetition[0], self.context[0])
+
+
+@lru_cache(maxsize=256)
+def compile_catalog(rules: Tuple, language: str = DEFAULT_LANGUAGE) -> Catalog:
+    """Catálogo compartido para cada combinación de reglas e idioma."""
+    if language not in CATALOGS:
+        raise ValueError(f'idioma no soportado: {language!r} (disponibles: {", ".join(LANGUAGES)})')
+    return Catalog(rules, language)
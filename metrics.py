@@ -0,0 +1,234 @@
+"""Métricas de validación y de peticiones en formato de texto de Prometheus.
+
+Cada hilo acumula en su propio fragmento (threading.local) sin locks; sólo
+al exportar se suman los fragmentos. Por validación se guardan el tiempo de
+cada fase (validator.CHECKS) y una única entrada con la máscara de reglas
+superadas (CompactResult.mask), que se desglosa por regla al exportar. Los
+resultados servidos desde la caché de resultados cuentan igual, con la
+etiqueta cached="true" y sin tiempos de fase. Así
+el coste por llamada es un puñado de operaciones y se puede dejar activo en
+producción; uninstall() quita el observador y validate() vuelve a no
+pagar nada.
+
+Los contadores son del proceso: con varios workers de gunicorn, /metrics
+devuelve los del worker que atiende la petición, no la suma.
+"""
+import threading
+import weakref
+from bisect import bisect_left
+from time import perf_counter
+from typing import Dict, List, Tuple
+
+import validator
+from messages import compile_catalog
+from validator import CHECKS, CompactResult, CompiledPolicy
+
+# Límites (en segundos) del histograma de latencia de peticiones
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class _Shard:
+    """Acumuladores de un solo hilo."""
+
+    __slots__ = ('check_seconds', 'validations', 'cached', 'outcomes', 'requests')
+
+    def __init__(self, buckets: int):
+        self.check_seconds = [0.0] * len(CHECKS)
+        self.validations = 0
+        # Resultados servidos desde la caché (no cuentan en validations)
+        self.cached = 0
+        # (huella de la política, máscara de reglas superadas) -> veces
+        self.outcomes = {}
+        # (endpoint, método, estado) -> [conteo por límite..., +Inf, suma, total]
+        self.requests = {}
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels) -> str:
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + '}'
+
+
+def _number(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _cache_lines(stats: Dict[str, int]) -> List[str]:
+    lines = []
+    for name, kind, text in (('size', 'gauge', 'Entradas en la caché de resultados.'),
+                             ('maxsize', 'gauge', 'Capacidad de la caché de resultados.'),
+                             ('hits', 'counter', 'Aciertos de la caché de resultados.'),
+                             ('misses', 'counter', 'Fallos de la caché de resultados.'),
+                             ('evictions', 'counter', 'Entradas descartadas por tamaño.'),
+                             ('expirations', 'counter', 'Entradas caducadas.')):
+        metric = f'password_validator_result_cache_{name}'
+        if kind == 'counter':
+            metric += '_total'
+        lines += [f'# HELP {metric} {text}', f'# TYPE {metric} {kind}',
+                  f'{metric} {stats[name]}']
+    return lines
+
+
+class Metrics:
+    """Registro de métricas con un fragmento por hilo."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # (referencia débil al hilo, fragmento); los de hilos terminados se
+        # suman a _retired para que la lista no crezca con cada hilo
+        self._shards = []
+        self._retired = _Shard(len(self.buckets))
+        # Huella -> etiquetas de sus reglas. Se guarda la huella y no la
+        # política: las recargas no retienen políticas viejas y una política
+        # recargada sin cambios sigue sumando en los mismos contadores
+        self._rule_labels = {}
+
+    def _shard(self) -> _Shard:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = _Shard(len(self.buckets))
+            with self._lock:
+                self._collect_retired()
+                self._shards.append((weakref.ref(threading.current_thread()), shard))
+            return shard
+
+    def _collect_retired(self):
+        alive = []
+        for ref, shard in self._shards:
+            thread = ref()
+            if thread is None or not thread.is_alive():
+                # El hilo ya no escribe: se puede sumar sin carreras
+                self._merge(self._retired, shard)
+            else:
+                alive.append((ref, shard))
+        self._shards = alive
+
+    @staticmethod
+    def _merge(total: _Shard, shard: _Shard):
+        for i, seconds in enumerate(list(shard.check_seconds)):
+            total.check_seconds[i] += seconds
+        total.validations += shard.validations
+        total.cached += shard.cached
+        for key, count in dict(shard.outcomes).items():
+            total.outcomes[key] = total.outcomes.get(key, 0) + count
+        for key, values in dict(shard.requests).items():
+            current = total.requests.get(key)
+            if current is None:
+                total.requests[key] = list(values)
+            else:
+                for i, value in enumerate(list(values)):
+                    current[i] += value
+
+    def validate(self, policy: CompiledPolicy, password: str, context=None) -> CompactResult:
+        """Observador para validator.set_observer(): valida y anota tiempos y resultados."""
+        laps = [perf_counter()]
+        result = policy.resolve(password, policy.scan(password, laps), laps, context)
+        shard = self._shard()
+        seconds = shard.check_seconds
+        for i in range(len(CHECKS)):
+            seconds[i] += laps[i + 1] - laps[i]
+        shard.validations += 1
+        self._count_outcome(shard, policy, result.mask)
+        return result
+
+    def observe_cached(self, policy: CompiledPolicy, result: CompactResult):
+        """Observador de aciertos de caché: cuenta el resultado sin tiempos de fase."""
+        shard = self._shard()
+        shard.cached += 1
+        self._count_outcome(shard, policy, result.mask)
+
+    def _count_outcome(self, shard: _Shard, policy: CompiledPolicy, mask: int):
+        fingerprint = policy.fingerprint
+        if fingerprint not in self._rule_labels:
+            self._rule_labels[fingerprint] = compile_catalog(policy.rules).labels
+        key = (fingerprint, mask)
+        outcomes = shard.outcomes
+        outcomes[key] = outcomes.get(key, 0) + 1
+
+    def observe_request(self, endpoint: str, method: str, status: int, seconds: float):
+        requests = self._shard().requests
+        key = (endpoint, method, status)
+        values = requests.get(key)
+        if values is None:
+            values = requests[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        values[bisect_left(self.buckets, seconds)] += 1
+        values[-2] += seconds
+        values[-1] += 1
+
+    def snapshot(self) -> _Shard:
+        """Suma de todos los fragmentos en este momento."""
+        total = _Shard(len(self.buckets))
+        with self._lock:
+            self._collect_retired()
+            self._merge(total, self._retired)
+            for _, shard in self._shards:
+                self._merge(total, shard)
+        return total
+
+    def rule_results(self, snapshot: _Shard = None) -> Dict[Tuple[str, bool], int]:
+        """Veces que cada regla se superó o falló."""
+        snapshot = snapshot or self.snapshot()
+        counts = {}
+        for (fingerprint, mask), times in snapshot.outcomes.items():
+            for i, rule in enumerate(self._rule_labels[fingerprint]):
+                key = (rule, bool(mask >> i & 1))
+                counts[key] = counts.get(key, 0) + times
+        return counts
+
+    def render(self, cache_stats: Dict[str, int] = None) -> str:
+        """Exposición en formato de texto de Prometheus (0.0.4).
+
+        `cache_stats` es ResultCache.stats(), que se exporta si se pasa.
+        """
+        snapshot = self.snapshot()
+        lines = [
+            '# HELP password_validator_validations_total Contraseñas validadas.',
+            '# TYPE password_validator_validations_total counter',
+            f'password_validator_validations_total{_labels(cached="false")} '
+            f'{snapshot.validations}',
+            f'password_validator_validations_total{_labels(cached="true")} {snapshot.cached}',
+            '# HELP password_validator_check_seconds_total Tiempo acumulado por fase de validación.',
+            '# TYPE password_validator_check_seconds_total counter',
+        ]
+        for check, seconds in zip(CHECKS, snapshot.check_seconds):
+            lines.append(f'password_validator_check_seconds_total{_labels(check=check)} '
+                         f'{_number(seconds)}')
+        lines += [
+            '# HELP password_validator_rule_results_total Resultados por regla.',
+            '# TYPE password_validator_rule_results_total counter',
+        ]
+        for (rule, passed), count in sorted(self.rule_results(snapshot).items()):
+            result = 'passed' if passed else 'failed'
+            lines.append(f'password_validator_rule_results_total{_labels(rule=rule, result=result)} '
+                         f'{count}')
+        lines += [
+            '# HELP http_request_duration_seconds Latencia de las peticiones HTTP.',
+            '# TYPE http_request_duration_seconds histogram',
+        ]
+        for (endpoint, method, status), values in sorted(snapshot.requests.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), values):
+                cumulative += count
+                labels = _labels(endpoint=endpoint, method=method, status=status, le=bound)
+                lines.append(f'http_request_duration_seconds_bucket{labels} {cumulative}')
+            labels = _labels(endpoint=endpoint, method=method, status=status)
+            lines.append(f'http_request_duration_seconds_sum{labels} {_number(values[-2])}')
+            lines.append(f'http_request_duration_seconds_count{labels} {values[-1]}')
+        if cache_stats is not None:
+            lines += _cache_lines(cache_stats)
+        return '\n'.join(lines) + '\n'
+
+    def install(self):
+        """Cronometra todas las validaciones (CompiledPolicy.compact() y validate())."""
+        validator.set_observer(self.validate, self.observe_cached)
+
+    def uninstall(self):
+        validator.set_observer(None)
+
+
+metrics = Metrics()
@@ -0,0 +1,285 @@
+"""Frases de contraseña estilo diceware con listas de palabras mapeadas.
+
+La lista (p. ej. la EFF long list o listas propias de 100k+ palabras) se
+guarda como un índice de posiciones fijas, sin un objeto de Python por
+palabra:
+
+    cabecera   8s magic + I palabras + I flags
+    offsets    (palabras + 1) x I: inicio de cada palabra en `words`
+    words      palabras en UTF-8, concatenadas
+
+La palabra i es words[offsets[i]:offsets[i + 1]], así que elegirla cuesta
+O(1) y el archivo mapeado se comparte entre procesos. Los índices salen de
+bloques de os.urandom con rechazo (sin sesgo de módulo) y la entropía se
+calcula a partir del tamaño de la lista y de las opciones.
+
+Uso:
+    python passphrase.py build eff_large_wordlist.txt words.idx
+    python passphrase.py generate words.idx --words 6 --capitalize title --digits 1
+"""
+import argparse
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+from typing import Iterable, Iterator, List, Union
+
+MAGIC = b'PWWORD1\x00'
+HEADER = struct.Struct('<8sII')
+# Todas las palabras empiezan por una letra con mayúscula distinta
+FLAG_CASED = 1
+
+CAPITALIZATION = ('lower', 'title', 'upper', 'random')
+DEFAULT_WORDS = 6
+DEFAULT_SEPARATOR = '-'
+# Frases por lote de os.urandom en generate_many()
+BATCH_SIZE = 1024
+
+# Prefijo de tiradas de dados de las listas EFF ("11111\tabacus")
+_DICE_PREFIX = re.compile(r'^\d+\s+')
+
+
+def _normalize(line: str) -> str:
+    return _DICE_PREFIX.sub('', line.strip()).strip()
+
+
+def pack_wordlist(words: Iterable[str]) -> bytes:
+    """Serializa las palabras (sin vacías ni repetidas sin distinguir mayúsculas)."""
+    seen = set()
+    encoded = []
+    cased = True
+    for word in map(_normalize, words):
+        key = word.lower()
+        if not word or key in seen:
+            continue
+        seen.add(key)
+        encoded.append(word.encode('utf-8'))
+        first = word[0]
+        cased = cased and first.upper() != first.lower()
+    offsets = array('I', [0])
+    position = 0
+    for word in encoded:
+        position += len(word)
+        offsets.append(position)
+    if sys.byteorder != 'little':  # pragma: no cover - depende de la plataforma
+        offsets.byteswap()
+    flags = FLAG_CASED if cased and encoded else 0
+    return HEADER.pack(MAGIC, len(encoded), flags) + offsets.tobytes() + b''.join(encoded)
+
+
+class Wordlist:
+    """Lista de palabras de pack_wordlist() (en memoria o mapeada desde disco)."""
+
+    def __init__(self, source: Union[str, os.PathLike, bytes]):
+        if isinstance(source, (bytes, bytearray)):
+            self.path = None
+            self._buffer = bytes(source)
+        else:
+            self.path = os.fspath(source)
+            with open(self.path, 'rb') as f:
+                self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        name = self.path or 'lista de palabras'
+        if len(self._buffer) < HEADER.size:
+            raise ValueError(f'{name}: lista truncada')
+        magic, count, flags = HEADER.unpack_from(self._buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f'{name}: no es una lista de palabras')
+        self._words = HEADER.size + (count + 1) * 4
+        if len(self._buffer) < self._words:
+            raise ValueError(f'{name}: lista truncada')
+        view = memoryview(self._buffer)[HEADER.size:self._words]
+        if sys.byteorder == 'little':
+            self._offsets = view.cast('I')
+        else:  # pragma: no cover - depende de la plataforma
+            self._offsets = array('I', view.tobytes())
+            self._offsets.byteswap()
+        if len(self._buffer) != self._words + self._offsets[count]:
+            raise ValueError(f'{name}: tamaño inconsistente')
+        self.count = count
+        self.cased = bool(flags & FLAG_CASED)
+
+    @classmethod
+    def from_words(cls, words: Iterable[str]) -> 'Wordlist':
+        return cls(pack_wordlist(words))
+
+    def __reduce__(self):
+        # Desde archivo, cada proceso vuelve a mapearlo; en memoria se copian los bytes
+        return (type(self), (self.path if self.path is not None else self._buffer,))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> str:
+        if not 0 <= index < self.count:
+            raise IndexError('índice de palabra fuera de rango')
+        base = self._words
+        offsets = self._offsets
+        return self._buffer[base + offsets[index]:base + offsets[index + 1]].decode('utf-8')
+
+    def close(self):
+        if isinstance(self._buffer, mmap.mmap):
+            if isinstance(self._offsets, memoryview):
+                self._offsets.release()
+            self._buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class UniformIndexes:
+    """Índices uniformes en [0, n) a partir de enteros de 32 bits de os.urandom."""
+
+    def __init__(self, n: int):
+        if not 0 < n <= 1 << 32:
+            raise ValueError('el rango debe tener entre 1 y 2**32 valores')
+        self.n = n
+        # Mayor múltiplo de n representable: lo que sobra se descarta
+        self._limit = (1 << 32) - (1 << 32) % n
+
+    def draw(self, k: int) -> List[int]:
+        n = self.n
+        limit = self._limit
+        indexes = []
+        while len(indexes) < k:
+            needed = k - len(indexes)
+            values = array('I')
+            values.frombytes(os.urandom(4 * (needed + needed // 16 + 1)))
+            indexes.extend(v % n for v in values if v < limit)
+        del indexes[k:]
+        return indexes
+
+
+class PassphraseGenerator:
+    """Frases de `words` palabras de una lista; seguro entre hilos.
+
+    capitalize: 'lower', 'title' (inicial en mayúscula), 'upper' o 'random'
+    (cada palabra en 'title' o 'lower' al azar, un bit por palabra si todas
+    empiezan por letra). digits: número de palabras distintas, elegidas al
+    azar, que llevan un dígito al final.
+    """
+
+    def __init__(self, wordlist: Wordlist, words: int = DEFAULT_WORDS,
+                 separator: str = DEFAULT_SEPARATOR, capitalize: str = 'lower',
+                 digits: int = 0):
+        if len(wordlist) < 2:
+            raise ValueError('la lista necesita al menos 2 palabras')
+        if not isinstance(words, int) or isinstance(words, bool) or not 1 <= words <= 64:
+            raise ValueError('words debe ser un entero entre 1 y 64')
+        if not isinstance(separator, str) or len(separator) > 8:
+            raise ValueError('separator debe ser un texto de hasta 8 caracteres')
+        if capitalize not in CAPITALIZATION:
+            raise ValueError(f'capitalize debe ser uno de {", ".join(CAPITALIZATION)}')
+        if not isinstance(digits, int) or isinstance(digits, bool) or not 0 <= digits <= words:
+            raise ValueError('digits debe ser un entero entre 0 y words')
+        self.wordlist = wordlist
+        self.words = words
+        self.separator = separator
+        self.capitalize = capitalize
+        self.digits = digits
+        self._indexes = UniformIndexes(len(wordlist))
+        self._positions = [UniformIndexes(words - j) for j in range(digits)]
+        self._digit_values = UniformIndexes(10)
+
+    @property
+    def entropy(self) -> float:
+        """Bits de entropía de cada frase (suponiendo que el atacante conoce la lista)."""
+        bits = self.words * math.log2(len(self.wordlist))
+        if self.capitalize == 'random' and self.wordlist.cased:
+            bits += self.words
+        if self.digits:
+            bits += self.digits * math.log2(10) + math.log2(math.comb(self.words, self.digits))
+        return bits
+
+    def generate(self) -> str:
+        return next(self.generate_many(1))
+
+    def generate_many(self, count: int) -> Iterator[str]:
+        """Genera `count` frases; todo el azar de cada lote sale de pocas lecturas de os.urandom."""
+        words = self.words
+        digits = self.digits
+        remaining = count
+        while remaining > 0:
+            batch = min(remaining, BATCH_SIZE)
+            indexes = self._indexes.draw(batch * words)
+            caps = os.urandom(batch * words) if self.capitalize == 'random' else None
+            if digits:
+                # Fisher-Yates parcial: la posición j sale de las words - j restantes
+                picks = [source.draw(batch) for source in self._positions]
+                values = self._digit_values.draw(batch * digits)
+            for b in range(batch):
+                phrase = self._words(indexes[b * words:(b + 1) * words],
+                                     caps[b * words:(b + 1) * words] if caps else None)
+                if digits:
+                    positions = list(range(words))
+                    for j, pick in enumerate(picks):
+                        k = j + pick[b]
+                        positions[j], positions[k] = positions[k], positions[j]
+                        phrase[positions[j]] += str(values[b * digits + j])
+                yield self.separator.join(phrase)
+            remaining -= batch
+
+    def _words(self, indexes: List[int], caps: bytes = None) -> List[str]:
+        wordlist = self.wordlist
+        phrase = [wordlist[i] for i in indexes]
+        capitalize = self.capitalize
+        if capitalize == 'lower':
+            return [word.lower() for word in phrase]
+        if capitalize == 'upper':
+            return [word.upper() for word in phrase]
+        if capitalize == 'title':
+            return [word[:1].upper() + word[1:].lower() for word in phrase]
+        return [word[:1].upper() + word[1:].lower() if bit & 1 else word.lower()
+                for word, bit in zip(phrase, caps)]
+
+
+def build_wordlist(lines: Iterable[str], output: str) -> int:
+    """Escribe la lista en `output` y devuelve el número de palabras."""
+    data = pack_wordlist(lines)
+    tmp_output = f'{output}.tmp'
+    with open(tmp_output, 'wb') as out:
+        out.write(data)
+    os.replace(tmp_output, output)
+    return HEADER.unpack_from(data, 0)[1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Frases de contraseña estilo diceware')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help='construir el índice desde una lista de palabras')
+    build.add_argument('input', help="archivo con una palabra por línea (formato EFF admitido) "
+                                     "o '-' para stdin")
+    build.add_argument('output', help='ruta del índice a generar')
+
+    generate = commands.add_parser('generate', help='generar frases de contraseña')
+    generate.add_argument('wordlist')
+    generate.add_argument('--words', type=int, default=DEFAULT_WORDS)
+    generate.add_argument('--separator', default=DEFAULT_SEPARATOR)
+    generate.add_argument('--capitalize', choices=CAPITALIZATION, default='lower')
+    generate.add_argument('--digits', type=int, default=0)
+    generate.add_argument('--count', type=int, default=1)
+
+    args = parser.parse_args(argv)
+    if args.command == 'build':
+        source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8')
+        with source:
+            count = build_wordlist(source, args.output)
+        print(f'{count} palabras escritas en {args.output}')
+    else:
+        with Wordlist(args.wordlist) as wordlist:
+            generator = PassphraseGenerator(wordlist, args.words, args.separator,
+                                            args.capitalize, args.digits)
+            for phrase in generator.generate_many(args.count):
+                print(phrase)
+            print(f'{generator.entropy:.1f} bits de entropía por frase', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(main())
@@ -0,0 +1,249 @@
+"""Detección de secuencias y recorridos de teclado con Aho-Corasick.
+
+El conjunto de patrones incluye todas las secuencias ascendentes y
+descendentes de letras y números de longitud >= 3, los recorridos por filas
+y columnas de los teclados QWERTY, AZERTY y QWERTZ y una lista configurable
+de tokens prohibidos. Son miles de patrones, así que se compilan una vez en
+un autómata determinista (tabla de transiciones plana en un array) que
+recorre la contraseña en una sola pasada lineal e informa de los tramos
+que coinciden.
+
+Las mayúsculas se pliegan carácter a carácter, de modo que las posiciones
+de los tramos son siempre posiciones de la contraseña original.
+
+Las tablas se pueden precompilar en disco (artifacts.py) y registrarse con
+register_automaton(): build_automaton() devuelve entonces el autómata
+mapeado en lugar de construirlo.
+"""
+import string
+from array import array
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
+
+MIN_PATTERN_LENGTH = 3
+
+# Filas de cada teclado (sin Shift); las columnas se obtienen de ellas
+KEYBOARD_ROWS = {
+    'qwerty': ('1234567890', 'qwertyuiop', 'asdfghjkl', 'zxcvbnm'),
+    'azerty': ('1234567890', 'azertyuiop', 'qsdfghjklm', 'wxcvbn'),
+    'qwertz': ('1234567890', 'qwertzuiop', 'asdfghjkl', 'yxcvbnm'),
+}
+
+
+def fold(c: str) -> str:
+    """Plegado de mayúsculas carácter a carácter (conserva la longitud)."""
+    lower = c.lower()
+    return lower if len(lower) == 1 else c
+
+
+def _runs(line: str, min_length: int) -> Iterable[str]:
+    # Todas las subcadenas de longitud >= min_length, en ambos sentidos
+    for start in range(len(line)):
+        for end in range(start + min_length, len(line) + 1):
+            run = line[start:end]
+            yield run
+            yield run[::-1]
+
+
+def keyboard_lines() -> List[str]:
+    lines = []
+    for rows in KEYBOARD_ROWS.values():
+        lines.extend(rows)
+        width = max(len(row) for row in rows)
+        for column in range(width):
+            lines.append(''.join(row[column] for row in rows if column < len(row)))
+    return lines
+
+
+def sequence_lines() -> List[str]:
+    """Alfabeto, dígitos y líneas de teclado: los patrones son sus tramos."""
+    return [string.ascii_lowercase, string.digits] + keyboard_lines()
+
+
+def default_patterns(min_length: int = MIN_PATTERN_LENGTH) -> List[str]:
+    patterns = set()
+    for line in sequence_lines():
+        patterns.update(_runs(line, min_length))
+    return sorted(patterns)
+
+
+class _ColumnTable(dict):
+    """Tabla ord -> columna del autómata para str.translate (0 = fuera del alfabeto)."""
+
+    def __init__(self, columns):
+        super().__init__()
+        self._columns = columns
+
+    def __missing__(self, code):
+        column = self._columns.get(fold(chr(code)), 0)
+        self[code] = value = chr(column)
+        return value
+
+
+class SequenceAutomaton:
+    """Autómata Aho-Corasick determinista sobre un alfabeto comprimido.
+
+    `table[state * width + column]` es el estado siguiente y `out[state]` la
+    longitud del patrón más largo que termina en ese estado (0 si ninguno).
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        patterns = sorted({''.join(fold(c) for c in p) for p in patterns if p})
+        alphabet = sorted({c for p in patterns for c in p})
+        self.columns = {c: i + 1 for i, c in enumerate(alphabet)}
+        self.width = width = len(alphabet) + 1
+        self.max_length = max(map(len, patterns), default=0)
+        self.pattern_count = len(patterns)
+
+        # Trie
+        goto = [{}]
+        out = [0]
+        for pattern in patterns:
+            state = 0
+            for c in pattern:
+                column = self.columns[c]
+                nxt = goto[state].get(column)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][column] = nxt
+                    goto.append({})
+                    out.append(0)
+                state = nxt
+            out[state] = max(out[state], len(pattern))
+
+        # Enlaces de fallo en anchura y tabla de transiciones completa
+        table = array('i', [0]) * (len(goto) * width)
+        fail = [0] * len(goto)
+        queue = deque()
+        for column, nxt in goto[0].items():
+            table[column] = nxt
+            queue.append(nxt)
+        while queue:
+            state = queue.popleft()
+            out[state] = max(out[state], out[fail[state]])
+            base = state * width
+            fail_base = fail[state] * width
+            for column in range(width):
+                nxt = goto[state].get(column)
+                if nxt is None:
+                    table[base + column] = table[fail_base + column]
+                else:
+                    fail[nxt] = table[fail_base + column]
+                    table[base + column] = nxt
+                    queue.append(nxt)
+        self.table = table
+        self.out = array('i', out)
+        self.states = len(goto)
+        self._translate = _ColumnTable(self.columns)
+
+    @classmethod
+    def from_tables(cls, alphabet: str, max_length: int, pattern_count: int,
+                    table, out) -> 'SequenceAutomaton':
+        """Autómata ya compilado (p. ej. arrays mapeados desde disco)."""
+        automaton = cls.__new__(cls)
+        automaton.columns = {c: i + 1 for i, c in enumerate(alphabet)}
+        automaton.width = len(alphabet) + 1
+        automaton.max_length = max_length
+        automaton.pattern_count = pattern_count
+        automaton.table = table
+        automaton.out = out
+        automaton.states = len(out)
+        automaton._translate = _ColumnTable(automaton.columns)
+        return automaton
+
+    @property
+    def alphabet(self) -> str:
+        return ''.join(sorted(self.columns, key=self.columns.get))
+
+    def column(self, code: int) -> int:
+        """Columna del autómata para un punto de código."""
+        return ord(self._translate[code])
+
+    def encode(self, text: str) -> Iterable[int]:
+        """Columnas del autómata para cada carácter del texto."""
+        encoded = text.translate(self._translate)
+        if self.width < 256:
+            return encoded.encode('latin-1')
+        return map(ord, encoded)
+
+    def find_spans(self, text: str) -> List[Tuple[int, int]]:
+        """Tramos [inicio, fin) cubiertos por algún patrón, ya fusionados."""
+        table = self.table
+        out = self.out
+        width = self.width
+        spans = []
+        state = 0
+        for pos, column in enumerate(self.encode(text)):
+            state = table[state * width + column]
+            length = out[state]
+            if length:
+                start = pos - length + 1
+                # Una coincidencia más larga puede empezar antes que los tramos previos
+                while spans and start < spans[-1][1]:
+                    start = min(start, spans.pop()[0])
+                spans.append((start, pos + 1))
+        return spans
+
+    def search(self, text: str) -> bool:
+        """¿Contiene algún patrón? Se detiene en la primera coincidencia."""
+        table = self.table
+        out = self.out
+        width = self.width
+        state = 0
+        for column in self.encode(text):
+            state = table[state * width + column]
+            if out[state]:
+                return True
+        return False
+
+    def matches_from(self, columns, start: int, first_end: int):
+        """Coincidencias (fin, inicio) con fin > first_end, leyendo columnas desde `start`.
+
+        Como ningún patrón supera `max_length`, basta con empezar
+        `max_length - 1` posiciones antes de la primera que interesa.
+        """
+        table = self.table
+        out = self.out
+        width = self.width
+        state = 0
+        found = []
+        for pos, column in enumerate(columns, start):
+            state = table[state * width + column]
+            length = out[state]
+            if length and pos + 1 > first_end:
+                found.append((pos + 1, pos + 1 - length))
+        return found
+
+
+def merge_spans(matches: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Fusiona coincidencias (fin, inicio) ordenadas por fin en tramos [inicio, fin)."""
+    spans = []
+    for end, start in matches:
+        while spans and start < spans[-1][1]:
+            start = min(start, spans.pop()[0])
+        spans.append((start, end))
+    return spans
+
+
+# Tokens prohibidos -> autómata precompilado (register_automaton)
+_registered: Dict[Tuple[str, ...], SequenceAutomaton] = {}
+
+
+def register_automaton(banned_tokens: Tuple[str, ...], automaton: SequenceAutomaton):
+    """Usa `automaton` para estos tokens en lugar de compilarlo."""
+    _registered[tuple(banned_tokens)] = automaton
+    _compile_automaton.cache_clear()
+
+
+def build_automaton(banned_tokens: Tuple[str, ...] = ()) -> SequenceAutomaton:
+    """Autómata compartido por todas las políticas con los mismos tokens prohibidos."""
+    automaton = _registered.get(banned_tokens)
+    if automaton is None:
+        automaton = _compile_automaton(banned_tokens)
+    return automaton
+
+
+@lru_cache(maxsize=32)
+def _compile_automaton(banned_tokens: Tuple[str, ...]) -> SequenceAutomaton:
+    return SequenceAutomaton(default_patterns() + list(banned_tokens))
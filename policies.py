@@ -0,0 +1,161 @@
+"""Registro de políticas de validación compiladas y compartidas.
+
+Las políticas se definen una vez (en código o en un archivo JSON/TOML), se
+compilan al arrancar y se comparten entre peticiones como objetos
+CompiledPolicy inmutables. Si se indica un archivo, get() vuelve a cargarlo
+cuando cambia en disco sin bloquear nunca la ruta de la petición.
+
+Formato del archivo (JSON; en TOML es la misma estructura):
+
+    {
+      "policies": {
+        "validate": {"min_length": 8, "max_length": 50, "has_uppercase": 1,
+                     "has_lowercase": 1, "has_digits": 1, "has_symbols": 1,
+                     "no_spaces": true},
+        "generate": {"min_length": 8, "has_uppercase": 2}
+      }
+    }
+
+Las claves son los métodos de PasswordValidator y se aplican en orden.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Mapping, Union
+
+from validator import CompiledPolicy, PasswordValidator
+
+try:
+    import tomllib
+except ImportError:  # pragma: no cover - Python < 3.11
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+logger = logging.getLogger(__name__)
+
+# Métodos de PasswordValidator que se pueden usar desde un archivo
+POLICY_OPTIONS = (
+    'min_length', 'max_length', 'has_uppercase', 'has_lowercase',
+    'has_digits', 'has_symbols', 'no_spaces', 'check_breaches', 'check_dictionary',
+    'banned_tokens', 'character_classes', 'context_similarity',
+)
+
+
+def build_policy(spec: Mapping) -> CompiledPolicy:
+    """Compila una política a partir de su definición {opción: valor}."""
+    validator = PasswordValidator()
+    for option, value in spec.items():
+        if option not in POLICY_OPTIONS:
+            raise ValueError(f'opción de política desconocida: {option!r}')
+        method = getattr(validator, option)
+        if value is True:
+            method()
+        elif value is False or value is None:
+            continue
+        elif isinstance(value, dict):
+            method(**value)
+        else:
+            method(value)
+    return validator.compile()
+
+
+def load_policy_file(path: str) -> Dict[str, CompiledPolicy]:
+    """Lee y compila todas las políticas de un archivo JSON o TOML."""
+    if path.endswith('.toml'):
+        if tomllib is None:
+            raise RuntimeError('se necesita tomllib (Python 3.11+) o tomli para leer TOML')
+        with open(path, 'rb') as f:
+            data = tomllib.load(f)
+    else:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    definitions = data.get('policies', data)
+    return {name: build_policy(spec) for name, spec in definitions.items()}
+
+
+class PolicyRegistry:
+    """Políticas con nombre, compiladas una vez y compartidas entre hilos.
+
+    Las lecturas no toman ningún lock: el diccionario de políticas se
+    reemplaza entero (asignación atómica) cuando el archivo cambia, y sólo
+    el hilo que consigue el lock de recarga sin esperar hace el trabajo.
+    """
+
+    def __init__(self, path: str = None, check_interval: float = 1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._code_policies = {}
+        self._file_policies = {}
+        self._policies = {}
+        self._mtime = None
+        self._next_check = 0.0
+        self._reload_lock = threading.Lock()
+        if path is not None:
+            self._file_policies = load_policy_file(path)
+            self._mtime = os.stat(path).st_mtime_ns
+            self._next_check = time.monotonic() + check_interval
+            self._publish()
+
+    def register(self, name: str, policy: Union[PasswordValidator, CompiledPolicy, Mapping]) -> CompiledPolicy:
+        """Registra una política definida en código (las del archivo tienen prioridad)."""
+        if isinstance(policy, PasswordValidator):
+            policy = policy.compile()
+        elif not isinstance(policy, CompiledPolicy):
+            policy = build_policy(policy)
+        with self._reload_lock:
+            self._code_policies[name] = policy
+            self._publish()
+        return self._policies[name]
+
+    def get(self, name: str) -> CompiledPolicy:
+        if self.path is not None and time.monotonic() >= self._next_check:
+            self._maybe_reload()
+        return self._policies[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._policies
+
+    def names(self):
+        return sorted(self._policies)
+
+    def reload(self) -> bool:
+        """Recarga el archivo si cambió; devuelve True si se publicó una versión nueva."""
+        with self._reload_lock:
+            return self._reload_locked()
+
+    def _maybe_reload(self):
+        # Si otro hilo ya está recargando, se sirve la versión actual
+        if not self._reload_lock.acquire(blocking=False):
+            return
+        try:
+            self._reload_locked()
+        finally:
+            self._reload_lock.release()
+
+    def _reload_locked(self) -> bool:
+        self._next_check = time.monotonic() + self.check_interval
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            logger.warning('no se puede leer %s; se mantienen las políticas actuales', self.path)
+            return False
+        if mtime == self._mtime:
+            return False
+        try:
+            policies = load_policy_file(self.path)
+        except Exception:
+            logger.exception('error recargando %s; se mantienen las políticas actuales', self.path)
+            return False
+        self._file_policies = policies
+        self._mtime = mtime
+        self._publish()
+        return True
+
+    def _publish(self):
+        policies = dict(self._code_policies)
+        policies.update(self._file_policies)
+        self._policies = policies
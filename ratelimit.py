@@ -0,0 +1,207 @@
+"""Limitación de peticiones por cliente con token buckets, dentro del proceso.
+
+TokenBucketLimiter guarda un cubo (fichas, última recarga) por clave en
+mapas repartidos en fragmentos, cada uno con su propio lock: dos claves sólo
+compiten si caen en el mismo fragmento. Un cubo que lleva inactivo lo
+bastante como para haberse rellenado equivale a no tener cubo, así que un
+hilo en segundo plano los elimina y la memoria depende de los clientes
+activos, no de los vistos. Cada mapa está en orden de último uso, de modo
+que los inactivos (y, con el mapa lleno, los más antiguos) están al
+principio y descartarlos no recorre el resto.
+
+SharedMemoryLimiter guarda los cubos en un archivo mapeado en memoria con un
+número fijo de huecos, de modo que todos los workers de gunicorn comparten
+los mismos límites. Cada franja de huecos se protege con un lock de rango
+de fcntl (entre procesos) más un threading.Lock (entre hilos del proceso).
+"""
+import fcntl
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+from typing import Tuple
+
+DEFAULT_SHARDS = 64
+DEFAULT_MAX_KEYS = 1_000_000
+
+
+class TokenBucketLimiter:
+    """Token buckets de `burst` fichas que se recargan a `rate` fichas/segundo."""
+
+    def __init__(self, rate: float, burst: float, shards: int = DEFAULT_SHARDS,
+                 sweep_interval: float = 10.0, max_keys: int = DEFAULT_MAX_KEYS):
+        if rate <= 0 or burst < 1:
+            raise ValueError('rate debe ser positivo y burst al menos 1')
+        self.rate = float(rate)
+        self.burst = float(burst)
+        # Tiempo tras el cual un cubo inactivo vuelve a estar lleno
+        self.idle_ttl = self.burst / self.rate
+        self.sweep_interval = sweep_interval
+        self._shards = [(OrderedDict(), threading.Lock()) for _ in range(shards)]
+        self._max_per_shard = max(1, max_keys // shards)
+        self._sweeper = None
+        self._sweeper_pid = None
+        self._stop = threading.Event()
+
+    def acquire(self, key: str, cost: float = 1.0) -> Tuple[bool, float]:
+        """Consume `cost` fichas; devuelve (permitida, segundos hasta poder reintentar)."""
+        if self._sweeper_pid != os.getpid():
+            self._start_sweeper()
+        buckets, lock = self._shards[hash(key) % len(self._shards)]
+        now = time.monotonic()
+        with lock:
+            bucket = buckets.get(key)
+            if bucket is None:
+                if len(buckets) >= self._max_per_shard:
+                    self._evict(buckets, now)
+                tokens = self.burst
+                bucket = buckets[key] = [tokens, now]
+            else:
+                buckets.move_to_end(key)
+                tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            if tokens >= cost:
+                bucket[0] = tokens - cost
+                bucket[1] = now
+                return True, 0.0
+            bucket[0] = tokens
+            bucket[1] = now
+            return False, (cost - tokens) / self.rate
+
+    def __len__(self) -> int:
+        return sum(len(buckets) for buckets, _ in self._shards)
+
+    def sweep(self, now: float = None) -> int:
+        """Elimina los cubos inactivos (ya llenos); devuelve cuántos."""
+        now = time.monotonic() if now is None else now
+        removed = 0
+        # Fragmento a fragmento: las peticiones sólo esperan a uno
+        for buckets, lock in self._shards:
+            with lock:
+                removed += self._evict(buckets, now)
+        return removed
+
+    def _evict(self, buckets, now: float) -> int:
+        # Orden de último uso: se para en el primer cubo que no está inactivo
+        removed = 0
+        while buckets:
+            key = next(iter(buckets))
+            if now - buckets[key][1] < self.idle_ttl:
+                break
+            del buckets[key]
+            removed += 1
+        # Bajo un ataque con muchas claves nuevas: se descartan las más antiguas
+        while len(buckets) >= self._max_per_shard:
+            buckets.popitem(last=False)
+            removed += 1
+        return removed
+
+    def _start_sweeper(self):
+        # Los hilos no sobreviven a fork(): cada worker arranca el suyo
+        self._sweeper_pid = os.getpid()
+        if self.sweep_interval:
+            self._sweeper = threading.Thread(target=self._sweep_loop,
+                                             name='ratelimit-sweeper', daemon=True)
+            self._sweeper.start()
+
+    def _sweep_loop(self):
+        while not self._stop.wait(self.sweep_interval):
+            self.sweep()
+
+    def close(self):
+        self._stop.set()
+
+
+class SharedMemoryLimiter:
+    """Token buckets en un archivo mapeado compartido entre procesos.
+
+    La tabla tiene `slots` huecos fijos (memoria acotada). Cada clave se
+    busca en `probes` huecos consecutivos; si ninguno es suyo ni está libre
+    se reutiliza el que lleve más tiempo sin uso. El archivo sobrevive al
+    proceso (y a reinicios), así que las horas guardadas son de time.time():
+    time.monotonic() vuelve a empezar cerca de cero tras reiniciar la máquina.
+    """
+
+    _SLOT = struct.Struct('<Qdd')   # huella de la clave, fichas, última recarga
+    _HEADER = struct.Struct('<8sII')
+    _MAGIC = b'PWRATE1\x00'
+
+    def __init__(self, path: str, rate: float, burst: float, slots: int = 65536,
+                 stripes: int = 256, probes: int = 4):
+        if rate <= 0 or burst < 1:
+            raise ValueError('rate debe ser positivo y burst al menos 1')
+        if slots % probes:
+            raise ValueError('slots debe ser múltiplo de probes')
+        self.path = path
+        self.rate = float(rate)
+        self.burst = float(burst)
+        # Un cubo cuya última recarga está más adelantada que esto se descarta
+        self.idle_ttl = self.burst / self.rate
+        self.probes = probes
+        self.stripes = stripes
+        size = self._HEADER.size + slots * self._SLOT.size
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, self._HEADER.size, 0)
+        try:
+            if os.fstat(self._fd).st_size != size:
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, size)
+                os.pwrite(self._fd, self._HEADER.pack(self._MAGIC, slots, stripes), 0)
+            magic, self.slots, self.stripes = self._HEADER.unpack(
+                os.pread(self._fd, self._HEADER.size, 0))
+            if magic != self._MAGIC:
+                raise ValueError(f'{path} no es un archivo de límites')
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, self._HEADER.size, 0)
+        self._mm = mmap.mmap(self._fd, size)
+        self._locks = [threading.Lock() for _ in range(self.stripes)]
+
+    def acquire(self, key: str, cost: float = 1.0) -> Tuple[bool, float]:
+        digest = hashlib.blake2b(key.encode('utf-8', 'surrogatepass'), digest_size=8).digest()
+        fingerprint = int.from_bytes(digest, 'little') | 1   # 0 marca hueco libre
+        first = fingerprint % self.slots
+        stripe = (first // self.probes) % self.stripes
+        slot_size = self._SLOT.size
+        now = time.time()
+        with self._locks[stripe]:
+            # Lock de un byte por franja (los locks de fcntl son sólo consultivos)
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, self._HEADER.size + stripe)
+            try:
+                victim = None
+                for probe in range(self.probes):
+                    index = (first - first % self.probes + probe) % self.slots
+                    offset = self._HEADER.size + index * slot_size
+                    owner, tokens, last = self._SLOT.unpack_from(self._mm, offset)
+                    if owner == fingerprint:
+                        if last - now > self.idle_ttl:
+                            # Guardado con otro reloj: se trata como un cubo nuevo
+                            tokens = self.burst
+                        else:
+                            # Un retroceso pequeño del reloj no recarga ni quita fichas
+                            elapsed = max(0.0, now - last)
+                            tokens = min(self.burst, tokens + elapsed * self.rate)
+                        break
+                    if victim is None or owner == 0 or last < victim[1]:
+                        victim = (offset, 0.0 if owner == 0 else last)
+                else:
+                    offset = victim[0]
+                    tokens = self.burst
+                allowed = tokens >= cost
+                if allowed:
+                    tokens -= cost
+                self._SLOT.pack_into(self._mm, offset, fingerprint, tokens, now)
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, self._HEADER.size + stripe)
+        return (True, 0.0) if allowed else (False, (cost - tokens) / self.rate)
+
+    def close(self):
+        self._mm.close()
+        os.close(self._fd)
+
+
+def retry_after_header(seconds: float) -> str:
+    """Valor de Retry-After: segundos enteros, redondeando hacia arriba."""
+    return str(max(1, math.ceil(seconds)))
@@ -0,0 +1,129 @@
+"""Caché LRU/TTL de resultados de validación.
+
+El frontend valida tras cada pausa al escribir y los usuarios suelen borrar y
+volver a teclear lo mismo, así que las mismas contraseñas llegan una y otra
+vez. La clave de la caché es un HMAC-SHA256 de la contraseña con un secreto
+aleatorio del proceso más la huella de la política: la contraseña en claro
+nunca se guarda. Se guardan resultados compactos (sin mensajes), así que
+una misma entrada sirve para cualquier idioma. Junto al resultado se guarda,
+al pedirla, la estimación por patrones de la respuesta (sólo puntuación,
+intentos y nombres de patrones, sin subcadenas de la contraseña).
+"""
+import hmac
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import strength
+from messages import DEFAULT_LANGUAGE
+from validator import CompactResult, CompiledPolicy, observe_cached
+
+Result = Tuple[bool, List[Dict], int]
+
+# Entrada cuya estimación aún no se ha calculado (None significa que se omitió)
+_PENDING = object()
+
+
+def estimate_summary(password: str, overlong: bool = False) -> Optional[Dict]:
+    """strength.estimate(password).as_dict(), o None si la contraseña supera max_length."""
+    # Ya falla por longitud y el estimador sólo analiza el principio: no aporta nada
+    if overlong:
+        return None
+    return strength.estimate(password).as_dict()
+
+
+class ResultCache:
+    """Caché acotada por tamaño y antigüedad, segura entre hilos."""
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 300.0, secret: bytes = None):
+        if maxsize <= 0:
+            raise ValueError('maxsize debe ser positivo')
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._secret = secret if secret is not None else os.urandom(32)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def key(self, policy: CompiledPolicy, password: str, context=None) -> Tuple[str, bytes]:
+        matcher = policy.context_matcher(context)
+        # Los tokens del contexto (ya normalizados) también van dentro del HMAC.
+        # Se codifica como lista JSON y no concatenando: así ninguna contraseña
+        # con separadores dentro produce el mismo mensaje que otra con contexto
+        tokens = matcher.tokens if matcher is not None else ()
+        message = json.dumps([password, tokens])
+        digest = hmac.digest(self._secret, message.encode('ascii'), 'sha256')
+        return policy.fingerprint, digest
+
+    def validate(self, policy: CompiledPolicy, password: str,
+                 language: str = DEFAULT_LANGUAGE, context=None) -> Result:
+        """Devuelve policy.validate(password, language, context), cacheado."""
+        # Cada llamada renderiza sus propios dicts; la entrada cacheada no se toca
+        return self.compact(policy, password, context).render(language)
+
+    def compact(self, policy: CompiledPolicy, password: str, context=None) -> CompactResult:
+        """Devuelve policy.compact(password, context), cacheado."""
+        return self._lookup(policy, password, context, False)[0]
+
+    def assess(self, policy: CompiledPolicy, password: str,
+               context=None) -> Tuple[CompactResult, Optional[Dict]]:
+        """Como compact(), junto con estimate_summary() cacheada en la misma entrada."""
+        return self._lookup(policy, password, context, True)
+
+    def _lookup(self, policy, password, context, with_estimate):
+        key = self.key(policy, password, context)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if entry is not None:
+            # Los aciertos no pasan por compact(): se avisa a las métricas aparte
+            observe_cached(policy, entry[1])
+            if not with_estimate or entry[2] is not _PENDING:
+                return entry[1], entry[2]
+
+        # Se calcula fuera del lock: dos hilos pueden calcular la misma clave
+        result = policy.compact(password, context) if entry is None else entry[1]
+        estimate = estimate_summary(password, result.overlong) if with_estimate else _PENDING
+        with self._lock:
+            if entry is not None:
+                entry[2] = estimate
+                return result, estimate
+            self._entries[key] = [now + self.ttl, result, estimate]
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return result, estimate
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
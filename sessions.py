@@ -0,0 +1,224 @@
+"""Validación incremental para el medidor en tiempo real.
+
+En lugar de reenviar y revalidar la contraseña completa en cada pulsación,
+el cliente abre una sesión y envía sólo las ediciones (insertar o borrar en
+una posición). IncrementalValidator mantiene los conteos por clase, las
+coincidencias del autómata de secuencias y las ventanas de repeticiones, y
+cada edición sólo reexamina las posiciones que la tocan: el coste es
+O(delta), no O(longitud). La respuesta contiene sólo las reglas cuyo
+resultado cambió.
+"""
+import secrets
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional
+
+from patterns import merge_spans
+from validator import CompiledPolicy, Scan
+
+# Las repeticiones se detectan en ventanas de 3 caracteres
+_WINDOW = 3
+# Longitud máxima de la contraseña de una sesión: cada edición reconstruye la
+# contraseña y la evalúa, así que sin tope las ediciones acumuladas la hacen crecer
+# sin límite (el cuerpo de cada petición sí está acotado) y cada pulsación se encarece
+DEFAULT_MAX_LENGTH = 4096
+
+
+class IncrementalValidator:
+    """Estado de validación de una contraseña que se edita poco a poco."""
+
+    def __init__(self, policy: CompiledPolicy, password: str = '',
+                 max_length: int = DEFAULT_MAX_LENGTH):
+        self.policy = policy
+        self.max_length = max_length
+        self.lock = threading.Lock()
+        self._chars = []
+        # Columna del autómata de cada carácter y coincidencias (fin, inicio) ordenadas por fin
+        self._columns = []
+        self._matches = []
+        self._counts = Counter()
+        self._repetitions = 0
+        self._max_common = max(map(len, policy.common_passwords), default=0)
+        self._results = []
+        self._replace(0, 0, password)
+        self._evaluate()
+
+    @property
+    def password(self) -> str:
+        return ''.join(self._chars)
+
+    def insert(self, pos: int, text: str):
+        self._replace(pos, pos, text)
+
+    def delete(self, pos: int, length: int):
+        self._replace(pos, pos + length, '')
+
+    def apply(self, edits: List[Dict]) -> Dict:
+        """Aplica ediciones {"op": "insert"|"delete", ...} y devuelve sólo los cambios.
+
+        Se validan todas antes de tocar nada: si una es inválida, ValueError y
+        la sesión queda como estaba.
+        """
+        replacements = []
+        size = len(self._chars)
+        for edit in edits:
+            op = edit.get('op')
+            pos = edit.get('pos')
+            if not isinstance(pos, int):
+                raise ValueError('pos debe ser un entero')
+            if op == 'insert':
+                text = edit.get('text', '')
+                if not isinstance(text, str):
+                    raise ValueError('text debe ser texto')
+                replacement = (pos, pos, text)
+            elif op == 'delete':
+                length = edit.get('length', 1)
+                if not isinstance(length, int) or length < 0:
+                    raise ValueError('length debe ser un entero no negativo')
+                replacement = (pos, pos + length, '')
+            else:
+                raise ValueError(f'operación desconocida: {op!r}')
+            size = self._check(*replacement, size)
+            replacements.append(replacement)
+        for replacement in replacements:
+            self._replace(*replacement)
+
+        previous = {r['rule']: r for r in self._results}
+        self.result = self._evaluate()
+        valid, results, score = self.result
+        changes = {
+            'valid': valid,
+            'score': score,
+            'changed': [r for r in results if previous.get(r['rule']) != r],
+        }
+        current = [r['rule'] for r in results]
+        if list(previous) != current:
+            # Cambió qué reglas aparecen: se envía el orden completo
+            remaining = set(current)
+            changes['removed'] = [rule for rule in previous if rule not in remaining]
+            changes['order'] = current
+        return changes
+
+    def _windows(self, lo: int, hi: int) -> int:
+        # Cuenta las ventanas de repetición que empiezan en [lo, hi)
+        chars = self._chars
+        repetitions = 0
+        for start in range(lo, hi):
+            c = chars[start]
+            # Igual que la regex (.)\1{2,}: los saltos de línea no cuentan
+            if c == chars[start + 1] == chars[start + 2] and c != '\n':
+                repetitions += 1
+        return repetitions
+
+    def _check(self, start: int, end: int, text: str, size: int) -> int:
+        # Valida reemplazar [start, end) por text sobre `size` caracteres; devuelve el nuevo tamaño
+        if not 0 <= start <= end <= size:
+            raise ValueError(f'edición fuera de rango: [{start}, {end}) sobre {size} caracteres')
+        size += len(text) - (end - start)
+        if size > self.max_length:
+            raise ValueError(f'la contraseña superaría {self.max_length} caracteres')
+        return size
+
+    def _replace(self, start: int, end: int, text: str):
+        size = len(self._chars)
+        self._check(start, end, text, size)
+
+        # Sólo las ventanas que se solapan con la edición cambian
+        lo = max(0, start - _WINDOW + 1)
+        self._repetitions -= self._windows(lo, min(end, size - _WINDOW + 1))
+
+        counts = self._counts
+        classes = self.policy.classifier.table
+        for c in self._chars[start:end]:
+            counts[classes[ord(c)]] -= 1
+        chars = list(text)
+        for c in chars:
+            counts[classes[ord(c)]] += 1
+        automaton = self.policy.sequences
+        self._chars[start:end] = chars
+        self._columns[start:end] = automaton.encode(text)
+
+        size = len(self._chars)
+        self._repetitions += self._windows(lo, min(start + len(chars), size - _WINDOW + 1))
+        self._rescan(automaton, start, end, len(chars) - (end - start))
+
+    def _rescan(self, automaton, start: int, end: int, delta: int):
+        # La coincidencia más larga que termina en p depende sólo de los
+        # max_length caracteres anteriores: se recalculan los finales dentro
+        # de ese alcance y los posteriores sólo se desplazan
+        reach = automaton.max_length
+        matches = self._matches
+        first = bisect_left(matches, (start + 1,))
+        last = bisect_left(matches, (end + reach,))
+        tail = [(e + delta, s + delta) for e, s in matches[last:]] if delta else matches[last:]
+        scan_from = max(0, start - reach + 1)
+        scan_to = min(end + delta + reach - 1, len(self._columns))
+        found = automaton.matches_from(self._columns[scan_from:scan_to], scan_from, start)
+        matches[first:] = found + tail
+
+    def _evaluate(self):
+        password = self.password
+        length = len(password)
+        # Sólo hace falta la versión en minúsculas si puede ser una contraseña común
+        lowered = password.lower() if length <= self._max_common else None
+        spans = merge_spans(self._matches)
+        scan = Scan(length, lowered, self._counts, spans, self._repetitions > 0)
+        self.result = self.policy.evaluate(password, scan)
+        self._results = self.result[1]
+        return self.result
+
+
+class SessionStore:
+    """Sesiones de validación en memoria, acotadas en número y en inactividad.
+
+    Son del proceso: con varios workers de gunicorn (que comparten el socket)
+    la siguiente petición puede llegar a otro worker y recibir 404, así que
+    la API de sesiones necesita un solo worker o reabrir la sesión ante 404.
+    """
+
+    def __init__(self, max_sessions: int = 10_000, ttl: float = 300.0,
+                 max_length: int = DEFAULT_MAX_LENGTH):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.max_length = max_length
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, policy: CompiledPolicy, password: str = ''):
+        session = IncrementalValidator(policy, password, self.max_length)
+        session_id = secrets.token_urlsafe(16)
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            while len(self._sessions) >= self.max_sessions:
+                self._sessions.popitem(last=False)
+            self._sessions[session_id] = (now, session)
+        return session_id, session
+
+    def get(self, session_id: str) -> Optional[IncrementalValidator]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None or now - entry[0] > self.ttl:
+                self._sessions.pop(session_id, None)
+                return None
+            self._sessions[session_id] = (now, entry[1])
+            self._sessions.move_to_end(session_id)
+            return entry[1]
+
+    def close(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _expire(self, now: float):
+        # Las sesiones están ordenadas por último uso: basta mirar el principio
+        while self._sessions:
+            session_id, (last_used, _) = next(iter(self._sessions.items()))
+            if now - last_used <= self.ttl:
+                break
+            del self._sessions[session_id]
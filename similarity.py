@@ -0,0 +1,177 @@
+"""Parecido de la contraseña con datos del usuario (usuario, email, nombre...).
+
+Cada dato se parte en tokens (la parte local del email, las palabras de un
+nombre...) y cada token se busca dentro de la contraseña admitiendo hasta k
+ediciones (insertar, borrar o sustituir un carácter): la distancia de
+edición entre el token y la subcadena más parecida de la contraseña.
+
+La distancia se calcula con el algoritmo bit-paralelo de Myers (1999): la
+columna de la matriz de programación dinámica se guarda como bits de dos
+enteros y cada carácter de la contraseña la actualiza con una docena de
+operaciones sobre enteros. Antes se aplica un filtro por casillas: si un
+token de m caracteres aparece con k ediciones como mucho, alguno de sus k+1
+trozos aparece tal cual, así que basta un `in` (en C) por trozo y Myers
+sólo recorre las ventanas alrededor de esos trozos.
+
+La contraseña y los tokens se comparan plegando mayúsculas carácter a
+carácter, como las secuencias (patterns.fold).
+"""
+import re
+from functools import lru_cache
+from typing import Iterable, List, Mapping, Tuple, Union
+
+from patterns import fold
+
+DEFAULT_MAX_DISTANCE = 1
+DEFAULT_MIN_TOKEN_LENGTH = 3
+# Un token necesita al menos 4 caracteres por edición admitida: 'ana' sólo
+# cuenta si aparece tal cual y 'maria' admite una edición
+CHARS_PER_EDIT = 4
+
+# Letras y dígitos de cualquier escritura
+_WORD = re.compile(r'[^\W_]+')
+
+Context = Union[Mapping[str, str], Iterable[str], str]
+
+
+@lru_cache(maxsize=4096)
+def _value_tokens(value: str, min_length: int) -> Tuple[str, ...]:
+    # Los mismos datos llegan en cada pulsación: se trocean una sola vez
+    if '@' in value:
+        value = value.rsplit('@', 1)[0]
+    words = _WORD.findall(''.join(map(fold, value)))
+    if len(words) > 1:
+        words.append(''.join(words))
+    return tuple(word for word in words if len(word) >= min_length)
+
+
+def context_tokens(context: Context,
+                   min_length: int = DEFAULT_MIN_TOKEN_LENGTH) -> Tuple[Tuple[str, str], ...]:
+    """Pares (campo, token) plegados y sin repetir.
+
+    `context` es un dict campo -> valor ({'username': ..., 'email': ...}),
+    una lista de valores o un único texto. De un email sólo se usa la parte
+    local. Cada valor aporta sus palabras y, si tiene varias, también todas
+    juntas: 'John.Smith' da 'john', 'smith' y 'johnsmith'.
+    """
+    if isinstance(context, str):
+        items = [('context', context)]
+    elif isinstance(context, Mapping):
+        items = list(context.items())
+    else:
+        items = [('context', value) for value in context]
+    seen = set()
+    tokens = []
+    for field, value in items:
+        if value is None:
+            continue
+        if not isinstance(value, str):
+            raise TypeError(f'el contexto {field!r} debe ser texto')
+        for token in _value_tokens(value, min_length):
+            if token not in seen:
+                seen.add(token)
+                tokens.append((str(field), token))
+    return tuple(tokens)
+
+
+def _masks(pattern: str):
+    # Bit i encendido en masks[c] si pattern[i] == c
+    masks = {}
+    for i, c in enumerate(pattern):
+        masks[c] = masks.get(c, 0) | (1 << i)
+    return masks
+
+
+def _search(masks, length: int, text: str, limit: int) -> int:
+    """Myers: menor distancia del patrón a una subcadena de `text`.
+
+    Se detiene en cuanto encuentra una distancia <= limit."""
+    full = (1 << length) - 1
+    high = 1 << (length - 1)
+    pv = full
+    mv = 0
+    score = best = length
+    get = masks.get
+    for c in text:
+        eq = get(c, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & full)
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        # Búsqueda: la fila 0 vale 0 en todas las columnas (sin |1 al desplazar)
+        ph = (ph << 1) & full
+        mh = (mh << 1) & full
+        pv = mh | (~(xv | ph) & full)
+        mv = ph & xv
+        if score < best:
+            best = score
+            if best <= limit:
+                break
+    return best
+
+
+def substring_distance(pattern: str, text: str) -> int:
+    """Distancia de edición entre `pattern` y la subcadena de `text` más parecida."""
+    if not pattern:
+        return 0
+    return _search(_masks(pattern), len(pattern), text, -1)
+
+
+class ContextMatcher:
+    """Tokens de contexto precompilados para buscarlos en contraseñas."""
+
+    def __init__(self, tokens: Tuple[Tuple[str, str], ...],
+                 max_distance: int = DEFAULT_MAX_DISTANCE):
+        self.tokens = tokens
+        self.max_distance = max_distance
+        self._patterns = []
+        for field, token in tokens:
+            allowed = min(max_distance, len(token) // CHARS_PER_EDIT)
+            # k+1 trozos (desplazamiento, texto): alguno aparece tal cual
+            size = len(token) // (allowed + 1)
+            pieces = [(i * size, token[i * size:(i + 1) * size if i < allowed else None])
+                      for i in range(allowed + 1)]
+            self._patterns.append((field, token, allowed, pieces, _masks(token)))
+
+    def _matches(self, token: str, allowed: int, pieces, masks, text: str) -> bool:
+        if allowed == 0:
+            return token in text
+        length = len(token)
+        for offset, piece in pieces:
+            position = text.find(piece)
+            while position != -1:
+                # La coincidencia aproximada cabe en esta ventana alrededor del trozo
+                start = max(0, position - offset - allowed)
+                window = text[start:position - offset + length + allowed]
+                if _search(masks, length, window, allowed) <= allowed:
+                    return True
+                position = text.find(piece, position + 1)
+        return False
+
+    def match(self, password: str) -> Tuple[str, ...]:
+        """Campos con algún token dentro de la contraseña (con hasta k ediciones)."""
+        text = ''.join(map(fold, password))
+        fields = []
+        for field, token, allowed, pieces, masks in self._patterns:
+            if field not in fields and self._matches(token, allowed, pieces, masks, text):
+                fields.append(field)
+        return tuple(fields)
+
+
+@lru_cache(maxsize=1024)
+def build_matcher(tokens: Tuple[Tuple[str, str], ...],
+                  max_distance: int = DEFAULT_MAX_DISTANCE) -> ContextMatcher:
+    """Matcher compartido: las peticiones de un mismo usuario reutilizan el suyo."""
+    return ContextMatcher(tokens, max_distance)
+
+
+def similar_fields(password: str, context: Context,
+                   max_distance: int = DEFAULT_MAX_DISTANCE,
+                   min_token_length: int = DEFAULT_MIN_TOKEN_LENGTH) -> List[str]:
+    """Campos del contexto a los que se parece la contraseña."""
+    tokens = context_tokens(context, min_token_length)
+    return list(build_matcher(tokens, max_distance).match(password))
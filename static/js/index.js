@@ -0,0 +1,389 @@
+const passwordInput = document.getElementById('password');
+const strengthBar = document.getElementById('strengthBar');
+const strengthLabel = document.getElementById('strengthLabel');
+const resultsDiv = document.getElementById('results');
+const lengthSlider = document.getElementById('length');
+const lengthValue = document.getElementById('lengthValue');
+
+let debounceTimer;
+
+// Textos y definición de la política (GET /policy, cacheado por el navegador con ETag)
+let policy = null;
+let evaluate = null;
+
+// Comprobaciones del servidor (comunes/filtraciones y estimador) por contraseña
+const LOOKUP_CACHE_SIZE = 500;
+const LOOKUP_BATCH_DELAY = 50;
+const LOOKUP_MAX_BATCH = 64;
+let lookupCache = new Map();
+let pendingLookups = new Map();
+let lookupTimer = null;
+
+loadPolicy(false).catch(error => console.error('Error:', error));
+
+passwordInput.addEventListener('input', function() {
+    // Las reglas estructurales se evalúan en cada pulsación, sin red;
+    // la consulta al servidor espera a que se deje de escribir
+    showLocal(passwordInput.value);
+    clearTimeout(debounceTimer);
+    debounceTimer = setTimeout(() => validatePassword(), 300);
+});
+
+lengthSlider.addEventListener('input', function() {
+    lengthValue.textContent = this.value;
+});
+
+function togglePassword() {
+    const input = document.getElementById('password');
+    const type = input.type === 'password' ? 'text' : 'password';
+    input.type = type;
+}
+
+async function postJSON(url, body) {
+    return fetch(url, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify(body)
+    });
+}
+
+async function loadPolicy(revalidate) {
+    const response = await fetch('/policy', { cache: revalidate ? 'no-cache' : 'default' });
+    policy = await response.json();
+    evaluate = buildEvaluator(policy.definition);
+    lookupCache = new Map();
+}
+
+// Plegado de mayúsculas carácter a carácter, como patterns.fold()
+function fold(c) {
+    const lower = c.toLowerCase();
+    return Array.from(lower).length === 1 ? lower : c;
+}
+
+// Reproduce CompiledPolicy.compact() a partir de CompiledPolicy.export()
+function buildEvaluator(definition) {
+    const classes = definition.classes;
+    const punctuation = new Set(Array.from(classes.punctuation));
+    const extraDigits = new Set(Array.from(classes.extra_digits || ''));
+    const upper = /^\p{Uppercase}$/u;
+    const lower = /^\p{Lowercase}$/u;
+    const decimal = /^\p{Nd}$/u;
+    const unicodeSymbol = /^[\p{P}\p{S}]$/u;
+
+    function classify(c) {
+        if (c === ' ') return 'space';
+        if (upper.test(c)) return 'upper';
+        if (lower.test(c)) return 'lower';
+        if (classes.digits === 'ascii' ? c >= '0' && c <= '9'
+                                       : decimal.test(c) || extraDigits.has(c)) {
+            return 'digit';
+        }
+        if (classes.symbols === 'unicode' ? unicodeSymbol.test(c) : punctuation.has(c)) {
+            return 'symbol';
+        }
+        return 'other';
+    }
+
+    // Tramos de las líneas (en ambos sentidos) más los tokens prohibidos
+    const sequences = definition.sequences;
+    const patterns = new Set(sequences.banned);
+    sequences.lines.forEach(line => {
+        const chars = Array.from(line);
+        for (let start = 0; start < chars.length; start++) {
+            for (let end = start + sequences.min_length; end <= chars.length; end++) {
+                const run = chars.slice(start, end);
+                patterns.add(run.join(''));
+                patterns.add(run.reverse().join(''));
+            }
+        }
+    });
+    const lengths = new Set(Array.from(patterns, p => Array.from(p).length));
+    const maxLength = Math.max(...lengths);
+    const minLength = Math.min(...lengths);
+
+    // Patrón más largo que termina en cada posición, fusionando solapes
+    function sequenceSpans(folded) {
+        const spans = [];
+        for (let end = 1; end <= folded.length; end++) {
+            for (let length = Math.min(maxLength, end); length >= minLength; length--) {
+                if (lengths.has(length) &&
+                    patterns.has(folded.slice(end - length, end).join(''))) {
+                    let start = end - length;
+                    // Una coincidencia más larga puede empezar antes que los tramos previos
+                    while (spans.length && start < spans[spans.length - 1][1]) {
+                        start = Math.min(start, spans.pop()[0]);
+                    }
+                    spans.push([start, end]);
+                    break;
+                }
+            }
+        }
+        return spans;
+    }
+
+    const repetition = new RegExp('([^\\n])\\1{' + (definition.repetition - 1) + '}', 'u');
+
+    return function (password, lookup) {
+        const chars = Array.from(password);
+        const counts = { length: chars.length, upper: 0, lower: 0, digit: 0,
+                         symbol: 0, space: 0, other: 0 };
+        chars.forEach(c => counts[classify(c)]++);
+        let mask = 0;
+        let score = 0;
+        const found = definition.rules.map((rule, i) => {
+            const n = counts[rule.count];
+            if (n >= rule.min && (rule.max === null || n <= rule.max)) {
+                mask |= 1 << i;
+                score += 10;
+            }
+            return n;
+        });
+        const bit = definition.rules.length;
+        const maxScore = definition.max_score;
+        // Más larga que max_length: el servidor sólo evalúa las reglas
+        if (definition.max_length !== null && chars.length > definition.max_length) {
+            return {
+                mask: mask | (0b1111 << bit),
+                counts: found,
+                score: maxScore > 0 ? Math.trunc(score / maxScore * 100) : 0,
+                spans: [],
+                breaches: 0,
+                dictionary: false
+            };
+        }
+        // Sin respuesta del servidor todavía, la regla de comunes se da por superada
+        const common = lookup ? lookup.common : 0;
+        const dictionary = Boolean(lookup && lookup.dictionary);
+        if (common || dictionary) {
+            score = Math.max(0, score - 20);
+        } else {
+            mask |= 1 << bit;
+        }
+        const spans = sequenceSpans(chars.map(fold));
+        if (spans.length) {
+            score = Math.max(0, score - 10);
+        } else {
+            mask |= 1 << (bit + 1);
+        }
+        if (repetition.test(password)) {
+            score = Math.max(0, score - 10);
+        } else {
+            mask |= 1 << (bit + 2);
+        }
+        // La página no envía datos del usuario: la regla de contexto siempre se supera
+        mask |= 1 << (bit + 3);
+        return {
+            mask: mask,
+            counts: found,
+            score: maxScore > 0 ? Math.trunc(score / maxScore * 100) : 0,
+            spans: spans,
+            breaches: definition.common === 'breach_index' ? common : 0,
+            dictionary: dictionary
+        };
+    };
+}
+
+// Misma lógica que CompactResult.render() en validator.py
+function renderResults(data) {
+    const results = [];
+    const extras = policy.definition.rules.length;
+    policy.rules.forEach((rule, i) => {
+        const passed = ((data.mask >> i) & 1) === 1;
+        if (i >= extras) {
+            // Las reglas adicionales sólo aparecen cuando fallan
+            if (!passed) {
+                let message = rule.failed;
+                if (rule.breached && data.breaches) {
+                    message = rule.breached.replace('{}', data.breaches);
+                } else if (rule.dictionary && data.dictionary) {
+                    message = rule.dictionary;
+                } else if (rule.id === 'context') {
+                    message = rule.failed.replace('{}', (data.similar || []).join(', '));
+                }
+                results.push({ rule: rule.label, passed: false, message: message });
+            }
+            return;
+        }
+        const message = rule.prefix !== undefined
+            ? rule.prefix + data.counts[i]
+            : (passed ? rule.passed : rule.failed);
+        results.push({ rule: rule.label, passed: passed, message: message });
+    });
+    return results;
+}
+
+// Mismos umbrales que get_strength_level() en app.py
+function strengthLevel(score, estimateScore) {
+    let level = score < 40 ? 0 : score < 60 ? 1 : score < 80 ? 2 : score < 95 ? 3 : 4;
+    if (estimateScore !== undefined) {
+        level = Math.min(level, estimateScore);
+    }
+    return level;
+}
+
+// Las consultas de un mismo intervalo se envían juntas en una petición
+function lookup(password) {
+    if (lookupCache.has(password)) {
+        return Promise.resolve(lookupCache.get(password));
+    }
+    if (!pendingLookups.has(password)) {
+        let resolve;
+        let reject;
+        const promise = new Promise((res, rej) => { resolve = res; reject = rej; });
+        pendingLookups.set(password, { promise: promise, resolve: resolve, reject: reject });
+    }
+    if (lookupTimer === null) {
+        lookupTimer = setTimeout(flushLookups, LOOKUP_BATCH_DELAY);
+    }
+    return pendingLookups.get(password).promise;
+}
+
+async function flushLookups() {
+    lookupTimer = null;
+    const batch = Array.from(pendingLookups).slice(0, LOOKUP_MAX_BATCH);
+    batch.forEach(([password]) => pendingLookups.delete(password));
+    if (pendingLookups.size) {
+        lookupTimer = setTimeout(flushLookups, LOOKUP_BATCH_DELAY);
+    }
+    try {
+        const response = await postJSON('/validate/lookup',
+                                         { passwords: batch.map(([password]) => password) });
+        if (!response.ok) {
+            throw new Error('HTTP ' + response.status);
+        }
+        const data = await response.json();
+        if (data.version !== policy.version) {
+            // La política cambió en el servidor: se revalida la copia cacheada
+            await loadPolicy(true);
+        }
+        batch.forEach(([password, pending], i) => {
+            const result = data.results[i];
+            lookupCache.delete(password);
+            lookupCache.set(password, result);
+            if (lookupCache.size > LOOKUP_CACHE_SIZE) {
+                lookupCache.delete(lookupCache.keys().next().value);
+            }
+            pending.resolve(result);
+        });
+    } catch (error) {
+        batch.forEach(([, pending]) => pending.reject(error));
+    }
+}
+
+function show(password, result) {
+    const data = evaluate(password, result);
+    updateUI({
+        score: data.score,
+        strength: policy.strength_labels[strengthLevel(data.score,
+                                                       result && result.estimate)],
+        results: renderResults(data)
+    });
+}
+
+function showEmpty() {
+    strengthBar.style.width = '0%';
+    strengthLabel.textContent = 'Ingresa una contraseña';
+    resultsDiv.innerHTML = '';
+}
+
+function showLocal(password) {
+    if (!password) {
+        showEmpty();
+    } else if (evaluate !== null) {
+        show(password, lookupCache.get(password));
+    }
+}
+
+async function validatePassword() {
+    const password = passwordInput.value;
+
+    if (!password) {
+        showEmpty();
+        return;
+    }
+
+    try {
+        if (policy === null) {
+            await loadPolicy(false);
+            showLocal(password);
+        }
+        const result = await lookup(password);
+        // Se descartan respuestas de textos que ya no están en el campo
+        if (passwordInput.value === password) {
+            show(password, result);
+        }
+    } catch (error) {
+        console.error('Error:', error);
+    }
+}
+
+function updateUI(data) {
+    const score = data.score;
+    strengthBar.style.width = score + '%';
+
+    if (score < 40) {
+        strengthBar.style.background = '#dc3545';
+    } else if (score < 60) {
+        strengthBar.style.background = '#ffc107';
+    } else if (score < 80) {
+        strengthBar.style.background = '#17a2b8';
+    } else {
+        strengthBar.style.background = '#28a745';
+    }
+
+    strengthLabel.textContent = data.strength + ' (' + score + '%)';
+    strengthLabel.style.color = strengthBar.style.background;
+
+    resultsDiv.innerHTML = '';
+    data.results.forEach(result => {
+        const item = document.createElement('div');
+        item.className = 'result-item ' + (result.passed ? 'passed' : 'failed');
+        item.innerHTML = `
+            <span class="result-icon">${result.passed ? '✅' : '❌'}</span>
+            <div class="result-text">
+                <div>${result.rule}</div>
+                <div class="result-message">${result.message}</div>
+            </div>
+        `;
+        resultsDiv.appendChild(item);
+    });
+}
+
+async function generatePassword() {
+    const length = lengthSlider.value;
+
+    try {
+        const response = await fetch('/generate', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({ length: parseInt(length) })
+        });
+
+        const data = await response.json();
+        const generatedInput = document.getElementById('generatedPassword');
+        generatedInput.value = data.password;
+        document.getElementById('generatedPasswordDiv').style.display = 'flex';
+
+        passwordInput.value = data.password;
+        validatePassword();
+    } catch (error) {
+        console.error('Error:', error);
+    }
+}
+
+function copyPassword() {
+    const input = document.getElementById('generatedPassword');
+    input.select();
+    document.execCommand('copy');
+
+    const btn = event.target;
+    const originalText = btn.textContent;
+    btn.textContent = '✓ Copiado!';
+    setTimeout(() => {
+        btn.textContent = originalText;
+    }, 2000);
+}
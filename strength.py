@@ -0,0 +1,527 @@
+"""Estimación de fortaleza por patrones (al estilo zxcvbn).
+
+La puntuación de validate() suma 10 puntos por regla cumplida, así que
+'Aa1!aaaaaa' puntúa casi igual que una cadena aleatoria. Este estimador
+enumera coincidencias con diccionarios ordenados por frecuencia, secuencias,
+repeticiones, fechas y recorridos de teclado, y busca con programación
+dinámica la descomposición de la contraseña que menos intentos necesita.
+
+El coste está acotado: sólo se analizan los primeros `max_length`
+caracteres (el resto cuenta como fuerza bruta) y, si se agota `time_budget`,
+se dejan de buscar patrones y la programación dinámica pasa a un modo
+aproximado de coste cuadrático.
+"""
+import math
+import re
+import time
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+from validator import PasswordValidator
+
+BRUTEFORCE_CARDINALITY = 10
+MIN_GUESSES_BEFORE_GROWING_SEQUENCE = 10000
+MIN_SUBMATCH_GUESSES_SINGLE_CHAR = 10
+MIN_SUBMATCH_GUESSES_MULTI_CHAR = 50
+MIN_YEAR_SPACE = 20
+REFERENCE_YEAR = time.localtime().tm_year
+DATE_MIN_YEAR = 1000
+DATE_MAX_YEAR = 2050
+MAX_SEQUENCE_DELTA = 5
+
+# Umbrales de intentos para la puntuación 0-4
+SCORE_THRESHOLDS = (1e3 + 5, 1e6 + 5, 1e8 + 5, 1e10 + 5)
+# Caracteres de fuerza bruta que se suman tras el prefijo analizado; más no
+# cambia la puntuación y desbordaría el float
+MAX_BRUTEFORCE_REST = 100
+
+# Diccionarios ordenados por frecuencia (el orden es el rango)
+COMMON_PASSWORDS = tuple(PasswordValidator().common_passwords) + (
+    '1234', '12345', '123456789', '1234567890', '000000', '111111', '1111',
+    'football', 'jordan', 'superman', 'harley', 'hunter', 'ranger', 'buster',
+    'soccer', 'hockey', 'killer', 'george', 'charlie', 'andrew', 'michelle',
+    'love', 'jessica', 'pepper', 'daniel', 'access', 'joshua', 'maggie',
+    'starwars', 'silver', 'william', 'dallas', 'yankees', 'hello', 'amanda',
+    'orange', 'biteme', 'freedom', 'computer', 'thomas', 'secret', 'summer',
+    'internet', 'princess', 'welcome', 'admin', 'login', 'qwertyuiop',
+    'contraseña', 'contrasena', 'hola', 'amor', 'teamo', 'clave',
+)
+COMMON_WORDS = (
+    'the', 'of', 'and', 'to', 'in', 'you', 'that', 'it', 'he', 'was', 'for',
+    'on', 'are', 'with', 'as', 'his', 'they', 'be', 'at', 'one', 'have',
+    'this', 'from', 'or', 'had', 'by', 'word', 'but', 'what', 'some', 'we',
+    'can', 'out', 'other', 'were', 'all', 'there', 'when', 'up', 'use',
+    'your', 'how', 'said', 'an', 'each', 'she', 'which', 'do', 'their',
+    'time', 'if', 'will', 'way', 'about', 'many', 'then', 'them', 'write',
+    'would', 'like', 'so', 'these', 'her', 'long', 'make', 'thing', 'see',
+    'him', 'two', 'has', 'look', 'more', 'day', 'could', 'go', 'come',
+    'did', 'number', 'sound', 'no', 'most', 'people', 'my', 'over', 'know',
+    'water', 'than', 'call', 'first', 'who', 'may', 'down', 'side', 'been',
+    'now', 'find', 'pass', 'dog', 'cat', 'sun', 'moon', 'star',
+    'blue', 'red', 'green', 'black', 'white', 'king', 'queen', 'house',
+    'casa', 'perro', 'gato', 'sol', 'luna', 'amigo', 'mundo', 'vida',
+)
+
+# Teclados (disposición inclinada para QWERTY, alineada para el numérico)
+QWERTY = r'''
+`~ 1! 2@ 3# 4$ 5% 6^ 7& 8* 9( 0) -_ =+
+    qQ wW eE rR tT yY uU iI oO pP [{ ]} \|
+     aA sS dD fF gG hH jJ kK lL ;: '"
+      zZ xX cC vV bB nN mM ,< .> /?
+'''
+KEYPAD = r'''
+  / * -
+7 8 9 +
+4 5 6
+1 2 3
+  0 .
+'''
+
+DATE_SPLITS = {
+    4: ((1, 2), (2, 3)),
+    5: ((1, 3), (2, 3)),
+    6: ((1, 2), (2, 4), (4, 5)),
+    7: ((1, 3), (2, 3), (4, 5), (4, 6)),
+    8: ((2, 4), (4, 6)),
+}
+_DATE_WITH_SEPARATOR = re.compile(r'^(\d{1,4})([\s/\\_.-])(\d{1,2})\2(\d{1,4})$')
+_REPEAT_GREEDY = re.compile(r'(.+)\1+')
+_REPEAT_LAZY = re.compile(r'(.+?)\1+')
+_REPEAT_LAZY_ANCHORED = re.compile(r'^(.+?)\1+$')
+
+
+def _build_adjacency_graph(layout: str, slanted: bool) -> Dict[str, List[Optional[str]]]:
+    positions = {}
+    for y, line in enumerate(layout.strip('\n').split('\n')):
+        for match in re.finditer(r'\S+', line):
+            x = (match.start() - y) // 3 if slanted else match.start() // 2
+            positions[(x, y)] = match.group()
+    if slanted:
+        offsets = ((-1, 0), (0, -1), (1, -1), (1, 0), (0, 1), (-1, 1))
+    else:
+        offsets = ((-1, 0), (-1, -1), (0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1))
+    graph = {}
+    for (x, y), token in positions.items():
+        neighbours = [positions.get((x + dx, y + dy)) for dx, dy in offsets]
+        for char in token:
+            graph[char] = neighbours
+    return graph
+
+
+@lru_cache(maxsize=None)
+def _keyboard_graphs():
+    graphs = {}
+    for name, layout, slanted in (('qwerty', QWERTY, True), ('keypad', KEYPAD, False)):
+        graph = _build_adjacency_graph(layout, slanted)
+        degree = sum(len([n for n in neighbours if n]) for neighbours in graph.values()) / len(graph)
+        # Caracteres que requieren Shift: segundo símbolo de cada tecla
+        shifted = frozenset(key[1] for key in re.findall(r'\S+', layout) if len(key) > 1)
+        graphs[name] = (graph, shifted, len(graph), degree)
+    return graphs
+
+
+def ranked_dictionary(words: Iterable[str]) -> Dict[str, int]:
+    """{palabra: rango}; el primer elemento es el más frecuente (rango 1)."""
+    ranked = {}
+    for rank, word in enumerate(words, 1):
+        ranked.setdefault(word.lower(), rank)
+    return ranked
+
+
+def load_ranked_dictionary(path: str) -> Dict[str, int]:
+    """Lee un diccionario ordenado por frecuencia, una palabra por línea."""
+    with open(path, encoding='utf-8') as f:
+        return ranked_dictionary(line.strip() for line in f if line.strip())
+
+
+@lru_cache(maxsize=None)
+def default_dictionaries() -> Dict[str, Dict[str, int]]:
+    # Se construyen una sola vez por proceso
+    return {
+        'passwords': ranked_dictionary(COMMON_PASSWORDS),
+        'words': ranked_dictionary(COMMON_WORDS),
+    }
+
+
+def _n_choose_k(n: int, k: int) -> int:
+    return math.comb(n, k) if 0 <= k <= n else 0
+
+
+def _uppercase_variations(token: str) -> int:
+    if token.islower() or not any(c.isupper() for c in token):
+        return 1
+    if token.isupper() or (token[0].isupper() and token[1:].islower()) \
+            or (token[-1].isupper() and token[:-1].islower()):
+        return 2
+    upper = sum(1 for c in token if c.isupper())
+    lower = sum(1 for c in token if c.islower())
+    return sum(_n_choose_k(upper + lower, i) for i in range(1, min(upper, lower) + 1))
+
+
+class Estimate:
+    """Resultado del estimador."""
+
+    __slots__ = ('guesses', 'guesses_log10', 'score', 'sequence', 'truncated')
+
+    def __init__(self, guesses, sequence, truncated):
+        self.guesses = guesses
+        self.guesses_log10 = math.log10(guesses) if guesses > 0 else 0.0
+        self.score = sum(1 for threshold in SCORE_THRESHOLDS if guesses >= threshold)
+        self.sequence = sequence
+        self.truncated = truncated
+
+    def as_dict(self) -> Dict:
+        return {
+            'guesses_log10': round(self.guesses_log10, 2),
+            'score': self.score,
+            'patterns': [m['pattern'] for m in self.sequence],
+            'truncated': self.truncated,
+        }
+
+
+class StrengthEstimator:
+    """Estimador de intentos necesarios con presupuesto de longitud y tiempo."""
+
+    def __init__(self, dictionaries: Dict[str, Dict[str, int]] = None,
+                 max_length: int = 64, time_budget: float = 0.02):
+        self.dictionaries = dictionaries if dictionaries is not None else default_dictionaries()
+        self.max_length = max_length
+        self.time_budget = time_budget
+        self._max_word = max((len(w) for d in self.dictionaries.values() for w in d), default=0)
+
+    def estimate(self, password: str) -> Estimate:
+        deadline = time.perf_counter() + self.time_budget
+        analysed = password[:self.max_length]
+        guesses, sequence, timed_out = self._most_guessable(analysed, deadline)
+        truncated = timed_out or len(password) > len(analysed)
+        rest = len(password) - len(analysed)
+        if rest:
+            # Lo que queda fuera del presupuesto de longitud cuenta como fuerza bruta
+            guesses *= float(BRUTEFORCE_CARDINALITY) ** min(rest, MAX_BRUTEFORCE_REST)
+            sequence.append(self._bruteforce(password, len(analysed), len(password) - 1))
+        return Estimate(guesses, sequence, truncated)
+
+    # -- Búsqueda de coincidencias -------------------------------------------------
+
+    def _matches(self, password: str, deadline: float) -> List[Dict]:
+        matches = []
+        # Primero los patrones que más reducen la estimación; las fechas, al final
+        for matcher in (self._repeat_matches, self._sequence_matches,
+                        self._spatial_matches, self._dictionary_matches,
+                        self._reverse_dictionary_matches, self._date_matches):
+            if time.perf_counter() > deadline:
+                break
+            matches.extend(matcher(password, deadline))
+        return matches
+
+    def _dictionary_matches(self, password: str, deadline: float, reversed_=False):
+        matches = []
+        lowered = password.lower()
+        n = len(password)
+        for name, ranked in self.dictionaries.items():
+            for i in range(n):
+                for j in range(i, min(n, i + self._max_word)):
+                    rank = ranked.get(lowered[i:j + 1])
+                    if rank is not None:
+                        matches.append({'pattern': 'dictionary', 'i': i, 'j': j,
+                                        'token': password[i:j + 1], 'rank': rank,
+                                        'dictionary': name, 'reversed': reversed_})
+        return matches
+
+    def _reverse_dictionary_matches(self, password: str, deadline: float):
+        n = len(password)
+        matches = self._dictionary_matches(password[::-1], deadline, reversed_=True)
+        for match in matches:
+            match['i'], match['j'] = n - 1 - match['j'], n - 1 - match['i']
+            match['token'] = match['token'][::-1]
+        return matches
+
+    def _spatial_matches(self, password: str, deadline: float):
+        matches = []
+        for name, (graph, shifted_chars, starts, degree) in _keyboard_graphs().items():
+            i = 0
+            n = len(password)
+            while i < n - 1:
+                j = i + 1
+                last_direction = None
+                turns = 0
+                shifted = 1 if password[i] in shifted_chars else 0
+                while j < n:
+                    neighbours = graph.get(password[j - 1], ())
+                    found = False
+                    for direction, neighbour in enumerate(neighbours):
+                        if neighbour and password[j] in neighbour:
+                            found = True
+                            if neighbour.index(password[j]) == 1:
+                                shifted += 1
+                            if last_direction != direction:
+                                turns += 1
+                                last_direction = direction
+                            break
+                    if found:
+                        j += 1
+                        continue
+                    break
+                if j - i > 2:
+                    matches.append({'pattern': 'spatial', 'i': i, 'j': j - 1,
+                                    'token': password[i:j], 'graph': name, 'turns': turns,
+                                    'shifted_count': shifted, 'starts': starts, 'degree': degree})
+                i = j
+        return matches
+
+    def _sequence_matches(self, password: str, deadline: float):
+        matches = []
+        if len(password) < 2:
+            return matches
+
+        def update(i, j, delta):
+            if (j - i > 1 or abs(delta) == 1) and 0 < abs(delta) <= MAX_SEQUENCE_DELTA:
+                token = password[i:j + 1]
+                matches.append({'pattern': 'sequence', 'i': i, 'j': j, 'token': token,
+                                'ascending': delta > 0})
+
+        i = 0
+        last_delta = None
+        for k in range(1, len(password)):
+            delta = ord(password[k]) - ord(password[k - 1])
+            if last_delta is None:
+                last_delta = delta
+            if delta == last_delta:
+                continue
+            update(i, k - 1, last_delta)
+            i = k - 1
+            last_delta = delta
+        update(i, len(password) - 1, last_delta)
+        return matches
+
+    def _date_matches(self, password: str, deadline: float):
+        matches = []
+        n = len(password)
+        for i in range(n - 3):
+            for j in range(i + 3, min(n, i + 8)):
+                token = password[i:j + 1]
+                if not token.isdigit() or not token.isascii():
+                    continue
+                best = None
+                for k, l in DATE_SPLITS[len(token)]:
+                    dmy = _map_ints_to_dmy((int(token[:k]), int(token[k:l]), int(token[l:])))
+                    if dmy and (best is None or
+                                abs(dmy[2] - REFERENCE_YEAR) < abs(best[2] - REFERENCE_YEAR)):
+                        best = dmy
+                if best:
+                    matches.append({'pattern': 'date', 'i': i, 'j': j, 'token': token,
+                                    'year': best[2], 'separator': ''})
+        for i in range(n - 5):
+            for j in range(i + 5, min(n, i + 10)):
+                token = password[i:j + 1]
+                found = _DATE_WITH_SEPARATOR.match(token)
+                if not found:
+                    continue
+                dmy = _map_ints_to_dmy((int(found.group(1)), int(found.group(3)), int(found.group(4))))
+                if dmy:
+                    matches.append({'pattern': 'date', 'i': i, 'j': j, 'token': token,
+                                    'year': dmy[2], 'separator': found.group(2)})
+        return matches
+
+    def _repeat_matches(self, password: str, deadline: float):
+        matches = []
+        last_index = 0
+        while last_index < len(password):
+            greedy = _REPEAT_GREEDY.search(password, last_index)
+            if not greedy:
+                break
+            lazy = _REPEAT_LAZY.search(password, last_index)
+            if len(greedy.group(0)) > len(lazy.group(0)):
+                found = greedy
+                base = _REPEAT_LAZY_ANCHORED.match(found.group(0)).group(1)
+            else:
+                found = lazy
+                base = found.group(1)
+            i, j = found.start(), found.end() - 1
+            if time.perf_counter() > deadline:
+                base_guesses = float(BRUTEFORCE_CARDINALITY) ** len(base)
+            else:
+                base_guesses = self._most_guessable(base, deadline)[0]
+            matches.append({'pattern': 'repeat', 'i': i, 'j': j, 'token': found.group(0),
+                            'base_guesses': base_guesses,
+                            'repeat_count': len(found.group(0)) // len(base)})
+            last_index = j + 1
+        return matches
+
+    # -- Estimación de intentos ----------------------------------------------------
+
+    def _guesses(self, match: Dict, password: str) -> float:
+        if 'guesses' in match:
+            return match['guesses']
+        token = match['token']
+        min_guesses = 1
+        if len(token) < len(password):
+            min_guesses = MIN_SUBMATCH_GUESSES_SINGLE_CHAR if len(token) == 1 \
+                else MIN_SUBMATCH_GUESSES_MULTI_CHAR
+        pattern = match['pattern']
+        if pattern == 'bruteforce':
+            guesses = float(BRUTEFORCE_CARDINALITY) ** len(token)
+            min_guesses += 1
+        elif pattern == 'dictionary':
+            guesses = match['rank'] * _uppercase_variations(token) * (2 if match['reversed'] else 1)
+        elif pattern == 'spatial':
+            guesses = _spatial_guesses(match)
+        elif pattern == 'sequence':
+            first = token[0]
+            if first in 'aAzZ019':
+                base = 4
+            elif first.isdigit():
+                base = 10
+            else:
+                base = 26
+            guesses = base * len(token) * (1 if match['ascending'] else 2)
+        elif pattern == 'date':
+            guesses = max(abs(match['year'] - REFERENCE_YEAR), MIN_YEAR_SPACE) * 365
+            if match['separator']:
+                guesses *= 4
+        else:
+            guesses = match['base_guesses'] * match['repeat_count']
+        match['guesses'] = max(guesses, min_guesses)
+        return match['guesses']
+
+    @staticmethod
+    def _bruteforce(password: str, i: int, j: int) -> Dict:
+        return {'pattern': 'bruteforce', 'i': i, 'j': j, 'token': password[i:j + 1]}
+
+    def _most_guessable(self, password: str, deadline: float):
+        """Descomposición de mínimo coste (DP de zxcvbn); devuelve (intentos, secuencia, agotado)."""
+        n = len(password)
+        if n == 0:
+            return 1, [], False
+        matches_by_j = [[] for _ in range(n)]
+        for match in self._matches(password, deadline):
+            matches_by_j[match['j']].append(match)
+        for matches in matches_by_j:
+            matches.sort(key=lambda m: m['i'])
+
+        # Para cada fin k y número de tramos l: mejor tramo final, producto y total
+        best_m = [{} for _ in range(n)]
+        best_pi = [{} for _ in range(n)]
+        best_g = [{} for _ in range(n)]
+
+        def update(match, l):
+            k = match['j']
+            pi = self._guesses(match, password)
+            if l > 1:
+                pi *= best_pi[match['i'] - 1][l - 1]
+            g = math.factorial(l) * pi + MIN_GUESSES_BEFORE_GROWING_SEQUENCE ** (l - 1)
+            for competing_l, competing_g in best_g[k].items():
+                if competing_l <= l and competing_g <= g:
+                    return
+            best_g[k][l] = g
+            best_m[k][l] = match
+            best_pi[k][l] = pi
+
+        # Al agotarse el tiempo se pasa a modo rápido: de cada posición previa sólo
+        # se extiende su mejor estado, lo que deja el resto en O(n^2)
+        timed_out = False
+        fast_best = {}
+
+        def states(pos):
+            if not timed_out:
+                return list(best_m[pos].items())
+            if pos not in fast_best:
+                l = min(best_g[pos], key=best_g[pos].get)
+                fast_best[pos] = [(l, best_m[pos][l])]
+            return fast_best[pos]
+
+        for k in range(n):
+            if not timed_out and time.perf_counter() > deadline:
+                timed_out = True
+            for match in matches_by_j[k]:
+                if match['i'] > 0:
+                    for l, _ in states(match['i'] - 1):
+                        update(match, l + 1)
+                else:
+                    update(match, 1)
+            update(self._bruteforce(password, 0, k), 1)
+            for i in range(1, k + 1):
+                bruteforce = None
+                for l, previous in states(i - 1):
+                    if previous['pattern'] != 'bruteforce':
+                        if bruteforce is None:
+                            bruteforce = self._bruteforce(password, i, k)
+                        update(bruteforce, l + 1)
+
+        # Reconstruir la mejor secuencia
+        l, guesses = min(best_g[n - 1].items(), key=lambda item: item[1])
+        sequence = []
+        k = n - 1
+        while k >= 0:
+            match = best_m[k][l]
+            sequence.insert(0, match)
+            k = match['i'] - 1
+            l -= 1
+        return guesses, sequence, timed_out
+
+
+def _spatial_guesses(match: Dict) -> float:
+    starts, degree = match['starts'], match['degree']
+    length, turns = len(match['token']), match['turns']
+    guesses = 0
+    for i in range(2, length + 1):
+        for j in range(1, min(turns, i - 1) + 1):
+            guesses += _n_choose_k(i - 1, j - 1) * starts * degree ** j
+    shifted = match['shifted_count']
+    if shifted:
+        unshifted = length - shifted
+        if unshifted == 0:
+            guesses *= 2
+        else:
+            guesses *= sum(_n_choose_k(shifted + unshifted, i)
+                           for i in range(1, min(shifted, unshifted) + 1))
+    return guesses
+
+
+def _map_ints_to_dm(first: int, second: int):
+    for day, month in ((first, second), (second, first)):
+        if 1 <= day <= 31 and 1 <= month <= 12:
+            return day, month
+    return None
+
+
+def _two_to_four_digit_year(year: int) -> int:
+    if year > 99:
+        return year
+    return year + 1900 if year > 50 else year + 2000
+
+
+def _map_ints_to_dmy(ints):
+    # Interpreta tres enteros como (día, mes, año) en cualquier orden razonable
+    if ints[1] > 31 or ints[1] <= 0:
+        return None
+    over_12 = over_31 = under_1 = 0
+    for value in ints:
+        if 99 < value < DATE_MIN_YEAR or value > DATE_MAX_YEAR:
+            return None
+        over_31 += value > 31
+        over_12 += value > 12
+        under_1 += value <= 0
+    if over_31 >= 2 or over_12 == 3 or under_1 >= 2:
+        return None
+    splits = ((ints[2], ints[0], ints[1]), (ints[0], ints[1], ints[2]))
+    for year, a, b in splits:
+        if DATE_MIN_YEAR <= year <= DATE_MAX_YEAR:
+            dm = _map_ints_to_dm(a, b)
+            return (dm[0], dm[1], year) if dm else None
+    for year, a, b in splits:
+        dm = _map_ints_to_dm(a, b)
+        if dm:
+            return dm[0], dm[1], _two_to_four_digit_year(year)
+    return None
+
+
+_default_estimator = None
+
+
+def estimate(password: str) -> Estimate:
+    """Estima con el estimador por defecto (diccionarios cargados una vez)."""
+    global _default_estimator
+    if _default_estimator is None:
+        _default_estimator = StrengthEstimator()
+    return _default_estimator.estimate(password)
@@ -2,11 +2,10 @@ import pytest
 import json
 import sys
 import os
-from app import app
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from app import app
+from app import app, assets
 
 
 @pytest.fixture
@@ -130,3 +129,565 @@ class TestAppExecution:
         import app as app_module
         assert hasattr(app_module, 'app')
 
+
+
+class TestBatchValidation:
+    """Tests para el endpoint /validate/batch"""
+
+    def test_batch_streams_one_line_per_password(self, client):
+        """Test: una línea NDJSON de respuesta por contraseña"""
+        body = '\n'.join(json.dumps({'password': p})
+                         for p in ['MyP@ssw0rd123', 'weak', ''])
+        response = client.post('/validate/batch', data=body,
+                               content_type='application/x-ndjson')
+
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        lines = [json.loads(l) for l in response.data.decode().splitlines()]
+        assert len(lines) == 3
+        assert lines[1]['valid'] == False
+        assert all('strength' in line for line in lines)
+
+    def test_batch_matches_single_endpoint(self, client):
+        """Test: el resultado por lote coincide con /validate"""
+        single = client.post('/validate',
+                             data=json.dumps({'password': 'Abc123!x'}),
+                             content_type='application/json').get_json()
+        batch = client.post('/validate/batch',
+                            data=json.dumps({'password': 'Abc123!x', 'id': 7}),
+                            content_type='application/x-ndjson')
+        line = json.loads(batch.data)
+        assert line.pop('id') == 7
+        assert line == single
+
+    def test_batch_reports_malformed_lines(self, client):
+        """Test: las líneas inválidas producen un error sin cortar el stream"""
+        body = 'no es json\n\n' + json.dumps({'password': 'weak'}) + '\n'
+        response = client.post('/validate/batch', data=body,
+                               content_type='application/x-ndjson')
+        lines = [json.loads(l) for l in response.data.decode().splitlines()]
+        assert 'error' in lines[0]
+        assert lines[1]['valid'] == False
+
+
+class TestResultCacheIntegration:
+    """Tests para la caché de resultados en /validate"""
+
+    def test_repeated_validation_hits_cache(self, client):
+        """Test: validar la misma contraseña dos veces usa la caché"""
+        import app as app_module
+        app_module.result_cache.clear()
+        hits = app_module.result_cache.hits
+        for _ in range(2):
+            response = client.post('/validate',
+                                   data=json.dumps({'password': 'Cach3d!pass'}),
+                                   content_type='application/json')
+            assert response.status_code == 200
+        assert app_module.result_cache.hits == hits + 1
+
+    def test_cache_can_be_disabled(self, client):
+        """Test: con la caché desactivada no se registran aciertos"""
+        import app as app_module
+        app.config['RESULT_CACHE_ENABLED'] = False
+        try:
+            hits = app_module.result_cache.hits
+            for _ in range(2):
+                client.post('/validate',
+                            data=json.dumps({'password': 'Cach3d!pass'}),
+                            content_type='application/json')
+            assert app_module.result_cache.hits == hits
+        finally:
+            app.config['RESULT_CACHE_ENABLED'] = True
+
+
+class TestValidationSessions:
+    """Tests para las sesiones de validación incremental"""
+
+    def test_session_flow(self, client):
+        """Test: abrir sesión, editar y cerrar"""
+        response = client.post('/validate/session',
+                               data=json.dumps({'password': 'MyP@ss1'}),
+                               content_type='application/json')
+        data = response.get_json()
+        assert response.status_code == 200
+        assert 'session' in data and 'results' in data
+
+        response = client.post(f"/validate/session/{data['session']}",
+                               data=json.dumps({'edits': [{'op': 'insert', 'pos': 7, 'text': 'x'}]}),
+                               content_type='application/json')
+        changes = response.get_json()
+        assert response.status_code == 200
+        assert 'changed' in changes and 'strength' in changes
+
+        response = client.delete(f"/validate/session/{data['session']}")
+        assert response.status_code == 204
+
+    def test_unknown_session(self, client):
+        """Test: una sesión desconocida devuelve 404"""
+        response = client.post('/validate/session/no-existe',
+                               data=json.dumps({'edits': []}),
+                               content_type='application/json')
+        assert response.status_code == 404
+
+    def test_invalid_edit(self, client):
+        """Test: una edición fuera de rango devuelve 400"""
+        session_id = client.post('/validate/session',
+                                 data=json.dumps({'password': 'abc'}),
+                                 content_type='application/json').get_json()['session']
+        response = client.post(f'/validate/session/{session_id}',
+                               data=json.dumps({'edits': [{'op': 'delete', 'pos': 9, 'length': 1}]}),
+                               content_type='application/json')
+        assert response.status_code == 400
+
+    def test_length_cap(self, client, monkeypatch):
+        """Test: las ediciones que superan la longitud máxima devuelven 400"""
+        from sessions import SessionStore
+        monkeypatch.setattr('app.validation_sessions', SessionStore(max_length=16))
+        response = client.post('/validate/session', json={'password': 'x' * 17})
+        assert response.status_code == 400
+        session_id = client.post('/validate/session',
+                                 json={'password': 'MyP@ss1'}).get_json()['session']
+        insert = {'edits': [{'op': 'insert', 'pos': 0, 'text': 'a' * 10}]}
+        assert client.post(f'/validate/session/{session_id}', json=insert).status_code == 400
+        insert['edits'][0]['text'] = 'a' * 9
+        assert client.post(f'/validate/session/{session_id}', json=insert).status_code == 200
+
+    def test_rate_limited(self, client, monkeypatch):
+        """Test: las rutas de sesión comparten el límite de /validate"""
+        from ratelimit import TokenBucketLimiter
+        monkeypatch.setattr('app.rate_limiter',
+                            TokenBucketLimiter(rate=0.01, burst=2, sweep_interval=0))
+        session_id = client.post('/validate/session',
+                                 json={'password': 'MyP@ss1'}).get_json()['session']
+        edit = {'edits': [{'op': 'insert', 'pos': 7, 'text': 'x'}]}
+        assert client.post(f'/validate/session/{session_id}', json=edit).status_code == 200
+        response = client.post(f'/validate/session/{session_id}', json=edit)
+        assert response.status_code == 429
+        assert client.post('/validate/session', json={}).status_code == 429
+        assert client.delete(f'/validate/session/{session_id}').status_code == 429
+
+
+class TestStrengthEstimate:
+    """Tests para la estimación por patrones en /validate"""
+
+    def test_estimate_in_response(self, client):
+        """Test: la respuesta incluye la estimación"""
+        data = client.post('/validate',
+                           data=json.dumps({'password': 'MyP@ssw0rd123'}),
+                           content_type='application/json').get_json()
+        assert 'guesses_log10' in data['estimate']
+        assert 0 <= data['estimate']['score'] <= 4
+
+    def test_estimate_caps_strength_label(self, client):
+        """Test: una contraseña con patrones no llega a 'Muy Fuerte'"""
+        data = client.post('/validate',
+                           data=json.dumps({'password': 'Aa1!aaaaaa'}),
+                           content_type='application/json').get_json()
+        assert data['strength'] != 'Muy Fuerte'
+
+    def test_label_without_estimate(self):
+        """Test: sin estimación la etiqueta depende sólo de la puntuación"""
+        from app import get_strength_label
+        assert get_strength_label(100) == 'Muy Fuerte'
+        assert get_strength_label(100, 1) == 'Débil'
+
+
+class TestBulkGeneration:
+    """Tests para /generate con count"""
+
+    def test_count_streams_passwords(self, client):
+        """Test: una línea NDJSON por contraseña generada"""
+        response = client.post('/generate',
+                               data=json.dumps({'count': 2500, 'length': 14}),
+                               content_type='application/json')
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        passwords = [json.loads(l)['password'] for l in response.data.decode().splitlines()]
+        assert len(passwords) == 2500
+        assert all(len(p) == 14 for p in passwords)
+        assert len(set(passwords)) == 2500
+
+    def test_unsatisfiable_length(self, client):
+        """Test: una longitud que la política no admite devuelve 400"""
+        for body in [{'length': 4}, {'length': 4, 'count': 10}, {'length': 'doce'}]:
+            response = client.post('/generate', data=json.dumps(body),
+                                   content_type='application/json')
+            assert response.status_code == 400
+            assert 'error' in response.get_json()
+
+    def test_length_cap(self, client):
+        """Test: length mayor que GENERATE_MAX_LENGTH devuelve 400 sin generar"""
+        max_length = app.config['GENERATE_MAX_LENGTH']
+        for body in [{'length': 10 ** 9}, {'length': max_length + 1},
+                     {'length': max_length + 1, 'count': 2}, [16]]:
+            response = client.post('/generate', json=body)
+            assert response.status_code == 400, body
+            assert 'error' in response.get_json()
+        response = client.post('/generate', json={'length': max_length})
+        assert len(response.get_json()['password']) == max_length
+
+    def test_invalid_count(self, client):
+        """Test: count fuera de rango o no entero devuelve 400"""
+        for count in [0, -1, 'diez', True, 10 ** 9]:
+            response = client.post('/generate',
+                                   data=json.dumps({'count': count}),
+                                   content_type='application/json')
+            assert response.status_code == 400
+
+
+class TestMetricsEndpoint:
+    """Tests para /metrics"""
+
+    def test_metrics_exposed(self, client):
+        """Test: /metrics devuelve texto Prometheus con validaciones y latencias"""
+        client.post('/validate', data=json.dumps({'password': 'MyP@ssw0rd9'}),
+                    content_type='application/json')
+        response = client.get('/metrics')
+        assert response.status_code == 200
+        assert response.content_type.startswith('text/plain')
+        text = response.data.decode()
+        assert 'password_validator_validations_total' in text
+        assert 'password_validator_result_cache_hits_total' in text
+        assert 'http_request_duration_seconds_bucket{endpoint="validate"' in text
+
+    def test_metrics_disabled(self, client):
+        """Test: con las métricas desactivadas /metrics no existe"""
+        app.config['METRICS_ENABLED'] = False
+        try:
+            assert client.get('/metrics').status_code == 404
+        finally:
+            app.config['METRICS_ENABLED'] = True
+
+
+class TestRateLimiting:
+    """Tests para el límite de peticiones por cliente"""
+
+    def test_limit_returns_429(self, client, monkeypatch):
+        """Test: superado el límite se devuelve 429 con Retry-After"""
+        from ratelimit import TokenBucketLimiter
+        monkeypatch.setattr('app.rate_limiter',
+                            TokenBucketLimiter(rate=0.01, burst=2, sweep_interval=0))
+        body = json.dumps({'password': 'MyP@ssw0rd9'})
+        statuses = [client.post('/validate', data=body, content_type='application/json')
+                    for _ in range(3)]
+        assert [r.status_code for r in statuses] == [200, 200, 429]
+        assert int(statuses[2].headers['Retry-After']) >= 1
+        # /generate comparte el cubo del cliente
+        assert client.post('/generate', data=json.dumps({}),
+                           content_type='application/json').status_code == 429
+
+    def test_limit_disabled(self, client, monkeypatch):
+        """Test: sin limitador no hay rechazo"""
+        monkeypatch.setattr('app.rate_limiter', None)
+        for _ in range(5):
+            response = client.post('/generate', data=json.dumps({}),
+                                   content_type='application/json')
+            assert response.status_code == 200
+
+
+class TestValidationLanguage:
+    """Tests para el idioma de los mensajes de /validate"""
+
+    def test_english_messages(self, client):
+        """Test que lang='en' devuelve los mismos resultados en inglés"""
+        spanish = client.post('/validate', json={'password': 'weak'}).get_json()
+        english = client.post('/validate', json={'password': 'weak', 'lang': 'en'}).get_json()
+        assert english['results'][0]['rule'] == 'At least 8 characters'
+        assert [r['passed'] for r in english['results']] == \
+            [r['passed'] for r in spanish['results']]
+        assert english['score'] == spanish['score']
+
+    def test_unknown_language(self, client):
+        """Test que un idioma desconocido devuelve 400"""
+        response = client.post('/validate', json={'password': 'weak', 'lang': 'fr'})
+        assert response.status_code == 400
+
+
+class TestCompactValidation:
+    """Tests para las respuestas compactas y el endpoint /policy"""
+
+    def test_compact_response(self, client):
+        """Test máscara, conteos y versión en lugar de textos"""
+        full = client.post('/validate', json={'password': 'MyP@ssw0rd123'})
+        compact = client.post('/validate', json={'password': 'MyP@ssw0rd123', 'compact': True})
+        data = compact.get_json()
+        assert set(data) >= {'version', 'valid', 'mask', 'counts', 'score', 'strength'}
+        assert data['score'] == full.get_json()['score']
+        assert data['counts'][0] == len('MyP@ssw0rd123')
+        assert len(compact.data) * 5 < len(full.data)
+
+    def test_policy_describes_mask(self, client):
+        """Test que /policy describe cada bit de la máscara"""
+        data = client.post('/validate', json={'password': 'abc', 'compact': True}).get_json()
+        policy = client.get('/policy').get_json()
+        assert policy['version'] == data['version']
+        assert [r['id'] for r in policy['rules']][-4:] == ['common', 'sequence', 'repetition',
+                                                          'context']
+        assert policy['rules'][0] == {'id': 'min_length', 'label': 'Mínimo 8 caracteres',
+                                      'prefix': 'Longitud actual: '}
+        assert not data['mask'] & 1
+        assert policy['strength_labels'][data['strength']] == 'Muy Débil'
+
+    def test_policy_etag(self, client):
+        """Test ETag, Cache-Control y 304 si no ha cambiado"""
+        response = client.get('/policy')
+        assert response.headers['ETag']
+        assert 'max-age' in response.headers['Cache-Control']
+        cached = client.get('/policy', headers={'If-None-Match': response.headers['ETag']})
+        assert cached.status_code == 304
+        english = client.get('/policy?lang=en')
+        assert english.headers['ETag'] != response.headers['ETag']
+        assert client.get('/policy?lang=fr').status_code == 400
+
+
+class TestClientSideEvaluation:
+    """Tests para la definición exportada y las consultas por lotes"""
+
+    def test_policy_includes_definition(self, client):
+        """Test que /policy incluye la definición de las reglas estructurales"""
+        policy = client.get('/policy').get_json()
+        definition = policy['definition']
+        assert definition['version'] == policy['version']
+        assert [r['id'] for r in definition['rules']] == \
+            [r['id'] for r in policy['rules']][:-4]
+
+    def test_lookup_batch(self, client):
+        """Test que /validate/lookup responde a varias contraseñas en orden"""
+        response = client.post('/validate/lookup',
+                               json={'passwords': ['password', 'Tr0ub4dor&3x!']})
+        assert response.status_code == 200
+        data = response.get_json()
+        assert [r['common'] for r in data['results']] == [1, 0]
+        assert data['results'][0]['estimate'] == 0
+        assert data['version'] == client.get('/policy').get_json()['version']
+
+    def test_lookup_uses_result_cache(self, client, monkeypatch):
+        """Test que /validate/lookup reutiliza la caché de /validate y omite las largas"""
+        import app as app_module
+        import strength
+        app_module.result_cache.clear()
+        client.post('/validate', json={'password': 'Lookup#2024x'})
+        hits = app_module.result_cache.hits
+        monkeypatch.setattr(strength, 'estimate', lambda p: pytest.fail('estimado'))
+        data = client.post('/validate/lookup',
+                           json={'passwords': ['Lookup#2024x', 'Aa1!qwerty' * 10]}).get_json()
+        assert app_module.result_cache.hits == hits + 1
+        assert data['results'][0]['estimate'] >= 0
+        assert data['results'][1] == {'common': 0}
+
+    def test_lookup_rejects_invalid_batches(self, client):
+        """Test que se rechazan listas no válidas o demasiado grandes"""
+        assert client.post('/validate/lookup', json={'passwords': 'abc'}).status_code == 400
+        assert client.post('/validate/lookup', json={'passwords': [1]}).status_code == 400
+        too_many = ['x'] * (app.config['LOOKUP_MAX_BATCH'] + 1)
+        assert client.post('/validate/lookup', json={'passwords': too_many}).status_code == 400
+
+
+class TestStaticDelivery:
+    """Tests para la página y los recursos cacheables"""
+
+    def test_index_is_cached_and_revalidated(self, client):
+        """Test que la página lleva ETag y responde 304 si no cambió"""
+        response = client.get('/', headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'no-cache' in response.headers['Cache-Control']
+        cached = client.get('/', headers={'Accept-Encoding': 'gzip',
+                                          'If-None-Match': response.headers['ETag']})
+        assert cached.status_code == 304
+
+    def test_assets_are_immutable(self, client):
+        """Test que los recursos enlazados tienen huella y caché de larga duración"""
+        page = client.get('/').data.decode()
+        for name in ('css/index.css', 'js/index.js'):
+            url = assets.url(name)
+            assert url in page
+            response = client.get(url)
+            assert response.status_code == 200
+            assert 'immutable' in response.headers['Cache-Control']
+            assert 'max-age=31536000' in response.headers['Cache-Control']
+
+    def test_unknown_asset(self, client):
+        """Test que un nombre sin huella devuelve 404"""
+        assert client.get('/assets/js/index.js').status_code == 404
+
+
+class TestValidationContext:
+    """Tests para los datos del usuario en /validate"""
+
+    def test_context_rejects_similar_password(self, client):
+        """Test que una contraseña parecida al usuario no es válida"""
+        body = {'password': 'Jsmith#2024x', 'context': {'username': 'jsmith'}}
+        data = client.post('/validate', json=body).get_json()
+        assert not data['valid']
+        assert data['results'][-1]['message'] == 'Se parece a tus datos: username'
+        assert client.post('/validate', json={'password': 'Jsmith#2024x'}).get_json()['valid']
+
+    def test_compact_context(self, client):
+        """Test que la respuesta compacta incluye los campos parecidos"""
+        body = {'password': 'Jsmith#2024x', 'context': ['J. Smith'], 'compact': True}
+        data = client.post('/validate', json=body).get_json()
+        assert data['similar'] == ['context'] and not data['valid']
+
+    def test_invalid_context(self, client):
+        """Test que un contexto que no es texto devuelve 400"""
+        for context in (42, {'username': 42}, [['a']]):
+            response = client.post('/validate', json={'password': 'x', 'context': context})
+            assert response.status_code == 400
+
+
+class TestDictionaryCheck:
+    """Tests para el diccionario de palabras en la API"""
+
+    @pytest.fixture
+    def dictionary_policy(self, monkeypatch):
+        from policies import PolicyRegistry
+        from validator import PasswordValidator
+        registry = PolicyRegistry()
+        registry.register('validate', PasswordValidator().min_length(8)
+                          .check_dictionary(['dragon', 'sunshine']))
+        monkeypatch.setattr('app.policies', registry)
+        return registry.get('validate')
+
+    def test_validate_and_lookup(self, client, dictionary_policy):
+        """Test que /validate y /validate/lookup detectan palabras con leet"""
+        data = client.post('/validate', json={'password': 'MyDr@g0n99!', 'lang': 'en'}).get_json()
+        assert data['results'][-1]['message'] == 'Contains a common word or password'
+        response = client.post('/validate/lookup', json={'passwords': ['MyDr@g0n99!', 'Kp9#vLqz2W']})
+        results = response.get_json()['results']
+        assert results[0]['dictionary'] is True and 'dictionary' not in results[1]
+
+    def test_policy_describes_dictionary_message(self, client, dictionary_policy):
+        """Test que /policy incluye el mensaje del diccionario en `common`"""
+        rules = client.get('/policy?lang=en').get_json()['rules']
+        common = next(rule for rule in rules if rule['id'] == 'common')
+        assert common['dictionary'] == 'Contains a common word or password'
+
+
+class TestPassphraseGeneration:
+    """Tests para /generate con mode=passphrase"""
+
+    @pytest.fixture
+    def wordlist(self, monkeypatch):
+        from passphrase import Wordlist
+        words = Wordlist.from_words(f'palabra{i}' for i in range(7776))
+        monkeypatch.setattr('app.passphrase_wordlist', words)
+        return words
+
+    def test_single_passphrase(self, client, wordlist):
+        """Test: frase con las opciones pedidas y su entropía"""
+        response = client.post('/generate', json={
+            'mode': 'passphrase', 'words': 5, 'separator': ' ', 'capitalize': 'title'})
+        assert response.status_code == 200
+        data = response.get_json()
+        words = data['password'].split(' ')
+        assert len(words) == 5 and all(w.startswith('Palabra') for w in words)
+        assert data['entropy'] == 64.6
+
+    def test_bulk_passphrases(self, client, wordlist):
+        """Test: con count se devuelven en NDJSON con la entropía en una cabecera"""
+        response = client.post('/generate', json={'mode': 'passphrase', 'count': 300, 'digits': 1})
+        assert response.mimetype == 'application/x-ndjson'
+        assert float(response.headers['X-Passphrase-Entropy']) > 77.5
+        phrases = [json.loads(l)['password'] for l in response.data.decode().splitlines()]
+        assert len(phrases) == 300 and all(len(p.split('-')) == 6 for p in phrases)
+
+    def test_invalid_options(self, client, wordlist):
+        """Test: opciones inválidas devuelven 400"""
+        for body in [{'words': 0}, {'capitalize': 'camel'}, {'digits': 9}, {'count': 0}]:
+            response = client.post('/generate', json={'mode': 'passphrase', **body})
+            assert response.status_code == 400
+            assert 'error' in response.get_json()
+
+    def test_without_wordlist(self, client, monkeypatch):
+        """Test: sin lista configurada el modo no está disponible"""
+        monkeypatch.setattr('app.passphrase_wordlist', None)
+        response = client.post('/generate', json={'mode': 'passphrase'})
+        assert response.status_code == 503
+
+
+class TestInputBounds:
+    """Tests para los límites de tamaño de las peticiones"""
+
+    def test_oversized_body_rejected(self, client):
+        """Test: un cuerpo mayor que MAX_CONTENT_LENGTH devuelve 413 sin validar"""
+        body = json.dumps({'password': 'a' * app.config['MAX_CONTENT_LENGTH']})
+        response = client.post('/validate', data=body, content_type='application/json')
+        assert response.status_code == 413
+        assert 'error' in response.get_json()
+
+    def test_malformed_bodies(self, client):
+        """Test: cuerpos que no son un objeto o contraseñas que no son texto devuelven 400"""
+        for body in [[], ['abc'], 'abc', {'password': 123}, {'password': None},
+                     {'password': ['a']}, {'password': 'abc', 'lang': ['es']}]:
+            response = client.post('/validate', json=body)
+            assert response.status_code == 400, body
+            assert 'error' in response.get_json()
+
+    def test_malformed_session_bodies(self, client):
+        """Test: las rutas de sesión rechazan igual los cuerpos mal formados"""
+        for body in [['abc'], {'password': 123}, {'password': None}]:
+            response = client.post('/validate/session', json=body)
+            assert response.status_code == 400, body
+            assert 'error' in response.get_json()
+        session_id = client.post('/validate/session',
+                                 json={'password': 'abc'}).get_json()['session']
+        response = client.post(f'/validate/session/{session_id}', json=[{'op': 'insert'}])
+        assert response.status_code == 400
+
+    def test_overlong_password(self, client):
+        """Test: una contraseña mayor que max_length sólo informa de los conteos"""
+        password = 'Aa1!qwerty' * 5000
+        data = client.post('/validate', json={'password': password}).get_json()
+        assert not data['valid']
+        assert [r['passed'] for r in data['results']].count(False) == 1
+        compact = client.post('/validate', json={'password': password, 'compact': True})
+        assert compact.get_json()['overlong'] is True
+
+    def test_overlong_skips_estimate(self, client, monkeypatch):
+        """Test: una contraseña mayor que max_length no pasa por el estimador"""
+        import strength
+        from app import get_strength_label, get_strength_level
+        monkeypatch.setattr(strength, 'estimate', lambda p: pytest.fail('estimado'))
+        password = 'Aa1!qwerty' * 100
+        data = client.post('/validate', json={'password': password}).get_json()
+        assert 'estimate' not in data
+        assert data['strength'] == get_strength_label(data['score'])
+        compact = client.post('/validate', json={'password': password, 'compact': True})
+        assert compact.get_json()['strength'] == get_strength_level(data['score'])
+
+    def test_batch_limit(self, client, monkeypatch):
+        """Test: /validate/batch admite más que MAX_CONTENT_LENGTH hasta su propio límite"""
+        body = ''.join(json.dumps({'password': f'Kp9#vLqz{i}'}) + '\n' for i in range(5000))
+        assert len(body) > app.config['MAX_CONTENT_LENGTH']
+        response = client.post('/validate/batch', data=body,
+                               content_type='application/x-ndjson')
+        assert len(response.data.splitlines()) == 5000
+        monkeypatch.setitem(app.config, 'BATCH_MAX_CONTENT_LENGTH', 1024)
+        response = client.post('/validate/batch', data=body,
+                               content_type='application/x-ndjson')
+        assert response.status_code == 413
+
+    def test_batch_item_cap(self, client, monkeypatch):
+        """Test: /validate/batch corta tras BATCH_MAX_ITEMS contraseñas"""
+        monkeypatch.setitem(app.config, 'BATCH_MAX_ITEMS', 10)
+        body = ''.join(json.dumps({'password': f'Kp9#vLqz{i}'}) + '\n' for i in range(20))
+        response = client.post('/validate/batch', data=body,
+                               content_type='application/x-ndjson')
+        lines = [json.loads(line) for line in response.data.splitlines()]
+        assert len(lines) == 11
+        assert all('valid' in line for line in lines[:10])
+        assert 'error' in lines[10]
+
+    def test_batch_charged_per_chunk(self, client, monkeypatch):
+        """Test: /validate/batch cobra una ficha del límite por cada tramo"""
+        from ratelimit import TokenBucketLimiter
+        monkeypatch.setattr('app.rate_limiter',
+                            TokenBucketLimiter(rate=0.01, burst=3, sweep_interval=0))
+        monkeypatch.setitem(app.config, 'BATCH_RATE_CHUNK', 5)
+        body = ''.join(json.dumps({'password': f'Kp9#vLqz{i}'}) + '\n' for i in range(20))
+        response = client.post('/validate/batch', data=body,
+                               content_type='application/x-ndjson')
+        lines = [json.loads(line) for line in response.data.splitlines()]
+        # rate_limited cobra 1; los tramos 5 y 10 cobran las otras 2 y el 15 se rechaza
+        assert len(lines) == 15
+        assert lines[-1]['retry_after'] >= 1
@@ -0,0 +1,106 @@
+import json
+import pickle
+
+import pytest
+
+import artifacts
+import charclass
+import patterns
+from artifacts import ValidatorArtifacts, build_artifacts, main
+from validator import PasswordValidator
+
+WORDS = ['password', 'dragon', 'sunshine']
+
+
+@pytest.fixture(scope='module')
+def artifacts_path(tmp_path_factory):
+    # La tabla de propiedades recorre todos los puntos de código: se genera una vez
+    path = tmp_path_factory.mktemp('artifacts') / 'validator.art'
+    build_artifacts(str(path), [(), ('ACME', 'contoso')], WORDS)
+    return path
+
+
+@pytest.fixture
+def clean_state(monkeypatch):
+    # install() cambia estado global de patterns y charclass
+    monkeypatch.setattr(patterns, '_registered', {})
+    monkeypatch.setattr(charclass, '_flags', None)
+    monkeypatch.setattr(charclass, '_installed_extras', None)
+    yield
+    patterns._compile_automaton.cache_clear()
+    charclass._numeric_extras.cache_clear()
+
+
+class TestValidatorArtifacts:
+    """Tests para los artefactos precompilados del validador"""
+
+    def test_automata_roundtrip(self, artifacts_path):
+        """Test que los autómatas leídos son iguales a los compilados"""
+        loaded = ValidatorArtifacts(artifacts_path).automata()
+        assert set(loaded) == {(), ('acme', 'contoso')}
+        for tokens, automaton in loaded.items():
+            compiled = patterns._compile_automaton(tokens)
+            assert list(automaton.table) == list(compiled.table)
+            assert list(automaton.out) == list(compiled.out)
+            assert automaton.columns == compiled.columns
+            for text in ['Qwerty123', 'xAcme-2024', 'İİabc', '']:
+                assert automaton.find_spans(text) == compiled.find_spans(text)
+
+    def test_char_flags(self, artifacts_path):
+        """Test que la tabla de propiedades y los dígitos extra son los calculados"""
+        loaded = ValidatorArtifacts(artifacts_path)
+        flags = loaded.char_flags()
+        for c in 'aZ5²①٣€…  ':
+            assert flags[ord(c)] == charclass.char_flags(c)
+        assert loaded.numeric_extras() == charclass._numeric_extras()
+
+    def test_dictionary_section(self, artifacts_path):
+        """Test que el diccionario incluido se consulta y se puede enviar a otro proceso"""
+        dictionary = ValidatorArtifacts(artifacts_path).dictionary()
+        assert dictionary.find_spans('MyDr@gon!') == [(2, 8)]
+        clone = pickle.loads(pickle.dumps(dictionary))
+        assert clone.search('$unsh1ne') and not clone.search('Kp9#vLqz2W')
+
+    def test_install(self, artifacts_path, clean_state):
+        """Test que install() hace que las políticas usen las tablas del archivo"""
+        before = PasswordValidator().min_length(8).banned_tokens(['acme', 'Contoso'])
+        expected = before.validate('Acme-qwerty²')
+        loaded = artifacts.install(artifacts_path)
+        mapped = loaded.automata()[('acme', 'contoso')]
+        policy = PasswordValidator().min_length(8).banned_tokens(['acme', 'Contoso']).compile()
+        assert policy.sequences.find_spans('xacmex') == mapped.find_spans('xacmex')
+        assert patterns._registered[('acme', 'contoso')] is policy.sequences
+        assert charclass._flags is not None
+        assert policy.validate('Acme-qwerty²') == expected
+
+    def test_rejects_invalid_file(self, tmp_path):
+        """Test que un archivo que no es de artefactos se rechaza"""
+        path = tmp_path / 'bad.art'
+        path.write_bytes(b'x' * 64)
+        with pytest.raises(ValueError):
+            ValidatorArtifacts(path)
+
+    def test_rejects_other_platform(self, tmp_path, monkeypatch):
+        """Test que un archivo generado con otra versión de Unicode se rechaza"""
+        path = tmp_path / 'other.art'
+        monkeypatch.setattr(charclass, 'flags_table', lambda: b'')
+        monkeypatch.setattr(artifacts, '_platform', lambda: {
+            'unicode': '1.0.0', 'byteorder': 'little', 'maxunicode': 0x10FFFF})
+        build_artifacts(str(path))
+        monkeypatch.undo()
+        with pytest.raises(ValueError, match='otra plataforma'):
+            ValidatorArtifacts(path)
+
+    def test_cli_build_and_info(self, tmp_path, capsys, monkeypatch):
+        """Test de la herramienta de línea de comandos"""
+        monkeypatch.setattr(charclass, 'flags_table', lambda: b'\x00' * 16)
+        source = tmp_path / 'words.txt'
+        source.write_text('dragon\n')
+        output = tmp_path / 'cli.art'
+        assert main(['build', str(output), '--banned', 'acme', '--dictionary', str(source)]) == 0
+        capsys.readouterr()
+        assert main(['info', str(output)]) == 0
+        info = json.loads(capsys.readouterr().out)
+        assert info['sections']['charclass.flags'] == 16
+        assert [a['tokens'] for a in info['manifest']['automata']] == [[], ['acme']]
+        assert 'dictionary' in info['sections']
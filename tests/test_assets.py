@@ -0,0 +1,73 @@
+import gzip
+
+import pytest
+from werkzeug.datastructures import Accept
+from werkzeug.test import EnvironBuilder
+from werkzeug.wrappers import Request
+
+from assets import Asset, AssetManifest
+
+
+def make_request(**headers):
+    return Request(EnvironBuilder(headers=headers).get_environ())
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    (tmp_path / 'css').mkdir()
+    (tmp_path / 'css' / 'site.css').write_text('body { color: red; }\n' * 40)
+    (tmp_path / 'logo.txt').write_text('hola')
+    return AssetManifest(str(tmp_path))
+
+
+class TestAsset:
+    """Tests para los recursos precomprimidos"""
+
+    def test_variants(self):
+        """Test que las variantes comprimidas se descomprimen al original"""
+        body = b'abcdefgh' * 100
+        asset = Asset(body, 'text/plain')
+        assert gzip.decompress(asset.variants['gzip']) == body
+        assert len(asset.variants['gzip']) < len(body)
+
+    def test_small_bodies_are_not_compressed(self):
+        """Test que los cuerpos pequeños sólo tienen la variante sin comprimir"""
+        assert list(Asset(b'hola', 'text/plain').variants) == ['identity']
+
+    def test_negotiation(self):
+        """Test que se elige la variante según Accept-Encoding"""
+        asset = Asset(b'abcdefgh' * 100, 'text/plain')
+        assert asset.negotiate(Accept([('gzip', 1)])) == 'gzip'
+        assert asset.negotiate(Accept([('gzip', 0)])) == 'identity'
+        assert asset.negotiate(Accept()) == 'identity'
+
+    def test_conditional_response(self):
+        """Test ETag distinto por codificación y 304 con If-None-Match"""
+        asset = Asset(b'abcdefgh' * 100, 'text/plain')
+        plain = asset.response(make_request())
+        compressed = asset.response(make_request(**{'Accept-Encoding': 'gzip'}))
+        assert plain.headers['ETag'] != compressed.headers['ETag']
+        assert compressed.headers['Content-Encoding'] == 'gzip'
+        cached = asset.response(make_request(**{'Accept-Encoding': 'gzip',
+                                                'If-None-Match': compressed.headers['ETag']}))
+        assert cached.status_code == 304
+
+
+class TestAssetManifest:
+    """Tests para los nombres con huella de contenido"""
+
+    def test_hashed_names(self, manifest):
+        """Test que la URL incluye la huella y cambia con el contenido"""
+        url = manifest.url('css/site.css')
+        assert url.startswith('/assets/css/site.') and url.endswith('.css')
+        assert manifest.get(url[len('/assets/'):]).content_type == 'text/css; charset=utf-8'
+        assert manifest.get('css/site.css') is None
+
+    def test_content_change(self, tmp_path, manifest):
+        """Test que otro contenido produce otra URL"""
+        (tmp_path / 'logo.txt').write_text('adiós')
+        assert AssetManifest(str(tmp_path)).url('logo.txt') != manifest.url('logo.txt')
+
+    def test_missing_directory(self, tmp_path):
+        """Test que un directorio inexistente da un manifiesto vacío"""
+        assert AssetManifest(str(tmp_path / 'nada')).assets == {}
@@ -0,0 +1,81 @@
+import json
+from collections import Counter
+
+import pytest
+
+from audit import iter_chunks, main, run_audit
+from validator import PasswordValidator
+
+PASSWORDS = ['MyP@ssw0rd123', 'weak', 'password', 'aaa111BBB!', 'Sin Espacios1!',
+             'Ünïcødé-Pässwörd9', 'abc123', 'x' * 60]
+
+
+@pytest.fixture
+def policy():
+    return PasswordValidator().min_length(8).max_length(50).has_uppercase()\
+        .has_lowercase().has_digits().has_symbols().no_spaces().compile()
+
+
+@pytest.fixture
+def password_file(tmp_path):
+    path = tmp_path / 'passwords.txt'
+    path.write_text('\n'.join(PASSWORDS * 25) + '\n', encoding='utf-8')
+    return path
+
+
+def expected_stats(policy, passwords):
+    failures = Counter()
+    valid = 0
+    for password in passwords:
+        is_valid, results, score = policy.validate(password)
+        valid += is_valid
+        failures.update(r['rule'] for r in results if not r['passed'])
+    return valid, dict(failures)
+
+
+class TestAudit:
+    """Tests para la auditoría masiva"""
+
+    def test_chunks_end_on_newlines(self, password_file):
+        """Test que los bloques cubren el archivo y terminan en salto de línea"""
+        data = password_file.read_bytes()
+        chunks = list(iter_chunks(str(password_file), chunk_size=64))
+        assert chunks[0][0] == 0 and chunks[-1][1] == len(data)
+        for (start, end), (next_start, _) in zip(chunks, chunks[1:]):
+            assert end == next_start
+            assert data[end - 1:end] == b'\n'
+
+    @pytest.mark.parametrize('workers', [1, 2])
+    def test_stats_match_direct_validation(self, policy, password_file, workers):
+        """Test que los agregados coinciden con validar una a una"""
+        report = run_audit(str(password_file), policy, workers=workers, chunk_size=100)
+        valid, failures = expected_stats(policy, PASSWORDS * 25)
+        assert report['total'] == len(PASSWORDS) * 25
+        assert report['valid'] == valid
+        assert report['failures'] == failures
+        assert sum(report['score_histogram'].values()) == report['total']
+
+    def test_python_path_matches_vectorized(self, policy, password_file, monkeypatch):
+        """Test que sin NumPy el informe es el mismo"""
+        import audit
+        vectorized = run_audit(str(password_file), policy, workers=1)
+        monkeypatch.setattr(audit, 'np', None)
+        python = run_audit(str(password_file), policy, workers=1)
+        for key in ('total', 'valid', 'failures', 'score_histogram'):
+            assert python[key] == vectorized[key]
+
+    def test_empty_file(self, policy, tmp_path):
+        """Test auditoría de un archivo vacío"""
+        path = tmp_path / 'empty.txt'
+        path.write_bytes(b'')
+        assert run_audit(str(path), policy, workers=1)['total'] == 0
+
+    def test_cli_with_policy_file(self, password_file, tmp_path):
+        """Test de la línea de comandos con archivo de políticas"""
+        policy_file = tmp_path / 'policies.json'
+        policy_file.write_text(json.dumps({'policies': {'strict': {'min_length': 12}}}))
+        output = tmp_path / 'stats.json'
+        assert main([str(password_file), '--policy-file', str(policy_file),
+                     '--policy', 'strict', '--workers', '1', '-q', '-o', str(output)]) == 0
+        report = json.loads(output.read_text(encoding='utf-8'))
+        assert report['failures']['Mínimo 12 caracteres'] == 4 * 25
@@ -0,0 +1,97 @@
+import random
+
+import pytest
+
+import batch
+from batch import score_batch
+from validator import PasswordValidator
+
+
+@pytest.fixture
+def policy():
+    return PasswordValidator().min_length(8).max_length(20).has_uppercase()\
+        .has_lowercase().has_digits(2).has_symbols().no_spaces()\
+        .banned_tokens(['acme']).compile()
+
+
+def sample_passwords():
+    rnd = random.Random(7)
+    alphabet = 'abcxyzqweASD123!@ \n€İ٣²aaacme'
+    passwords = [''.join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 25)))
+                 for _ in range(2000)]
+    return passwords + ['', 'password', 'PassWord', 'a\n\n\nb', '\x00\x00\x00', '\ud800xyz']
+
+
+def assert_matches_validate(policy, passwords, result):
+    assert len(result) == len(passwords)
+    for i, password in enumerate(passwords):
+        valid, results, score = policy.validate(password)
+        assert bool(result.valid[i]) == valid, repr(password)
+        assert int(result.scores[i]) == score, repr(password)
+        assert result.outcomes(i) == [(r['rule'], r['passed']) for r in results], repr(password)
+
+
+class TestScoreBatch:
+    """Tests para la puntuación por lotes"""
+
+    def test_vectorized_matches_validate(self, policy):
+        """Test que la versión NumPy da lo mismo que validate()"""
+        pytest.importorskip('numpy')
+        passwords = sample_passwords()
+        assert_matches_validate(policy, passwords, score_batch(policy, passwords, chunk_size=500))
+
+    def test_python_fallback_matches_validate(self, policy, monkeypatch):
+        """Test que sin NumPy se usa validate_many con el mismo resultado"""
+        monkeypatch.setattr(batch, 'np', None)
+        passwords = sample_passwords()[:300]
+        assert_matches_validate(policy, passwords, score_batch(policy, passwords))
+
+    def test_failure_counts(self, policy):
+        """Test recuento de fallos por regla"""
+        result = score_batch(policy, ['short', 'password', 'Valid#Pass99'])
+        counts = result.failure_counts()
+        assert counts['Mínimo 8 caracteres'] == 1
+        assert counts['No usar contraseñas comunes'] == 1
+        assert 'Sin espacios' not in counts
+
+    def test_rules_by_id_and_language(self, policy):
+        """Test que las reglas se identifican por id y las etiquetas siguen el idioma"""
+        result = score_batch(policy, ['short', 'password', 'Valid#Pass99'])
+        assert result.rules == policy.rule_ids[:len(policy.rule_checks)]
+        assert result.failure_counts('en')['At least 8 characters'] == 1
+        _, results, _ = policy.validate('password', 'en')
+        assert result.outcomes(1, 'en') == [(r['rule'], r['passed']) for r in results]
+
+    def test_long_rows_outside_matrix(self, policy, monkeypatch):
+        """Test que las filas largas no ensanchan la matriz y dan lo mismo que validate()"""
+        pytest.importorskip('numpy')
+        widths = []
+        encode = batch.encode
+
+        def recording_encode(passwords):
+            matrix, lengths = encode(passwords)
+            widths.append(matrix.shape[1])
+            return matrix, lengths
+
+        monkeypatch.setattr(batch, 'encode', recording_encode)
+        passwords = sample_passwords()[:200] + ['Ab1!' * 5000, 'aaaB12!' * 3, 'Xy9#' * 6]
+        assert_matches_validate(policy, passwords, score_batch(policy, passwords))
+        unbounded = PasswordValidator().min_length(8).has_digits().compile()
+        passwords = ['Kp9#vLqz2W', 'qwerty1' * 100, 'x' * 20000]
+        assert_matches_validate(unbounded, passwords, score_batch(unbounded, passwords))
+        assert max(widths) <= batch.MAX_ENCODED_WIDTH
+
+    def test_dictionary_matches_validate(self):
+        """Test que el diccionario también se aplica en la versión NumPy"""
+        pytest.importorskip('numpy')
+        policy = PasswordValidator().min_length(8).has_digits()\
+            .check_dictionary(['dragon', 'sunshine']).compile()
+        passwords = ['MyDragon99!', 'Kp9#vLqz2W', '$unsh1ne2024', 'password', 'dr@g0n'] \
+            + sample_passwords()[:300]
+        result = score_batch(policy, passwords)
+        assert not result.valid[0] and result.common[0]
+        assert_matches_validate(policy, passwords, result)
+
+    def test_empty_batch(self, policy):
+        """Test lote vacío"""
+        assert len(score_batch(policy, [])) == 0
@@ -0,0 +1,106 @@
+import json
+
+from benchmark import (ADVERSARIAL, compare, main, measure, measure_startup, measure_worst_case,
+                       run_benchmarks)
+
+
+def report(**results):
+    return {'meta': {}, 'results': results}
+
+
+def result(p50, p99, ops):
+    return {'iterations': 10, 'p50_us': p50, 'p99_us': p99, 'ops_per_second': ops}
+
+
+class TestMeasure:
+    """Tests para la medición de latencias"""
+
+    def test_measure_keys(self):
+        """Test que se registran p50, p99 y throughput"""
+        calls = []
+        stats = measure(calls.append, 50, warmup=5)
+        assert len(calls) == 55
+        assert stats['iterations'] == 50
+        assert 0 <= stats['p50_us'] <= stats['p99_us']
+        assert stats['ops_per_second'] > 0
+
+    def test_route_cases_past_rate_limit(self, monkeypatch):
+        """Test que las rutas no chocan con el límite por IP aunque se supere la ráfaga"""
+        import app
+        limiter = app.create_rate_limiter()
+        monkeypatch.setattr(app, 'rate_limiter', limiter)
+        iterations = int(app.app.config['RATE_LIMIT_BURST']) + 50
+        results = run_benchmarks(iterations=iterations,
+                                 filter='route/validate-compact/alnum/len16')['results']
+        assert results['route/validate-compact/alnum/len16']['iterations'] == iterations
+        # El limitador sólo se quita mientras se miden las rutas
+        assert app.rate_limiter is limiter
+
+    def test_route_cases_skip_result_cache(self):
+        """Test que las rutas miden el validador y no aciertos de la caché de resultados"""
+        import app
+        hits = app.result_cache.hits
+        run_benchmarks(iterations=200, filter='route/validate/alnum/len16')
+        assert app.result_cache.hits == hits
+        assert app.app.config['RESULT_CACHE_ENABLED'] is True
+
+    def test_filter(self):
+        """Test que --filter limita los casos ejecutados"""
+        results = run_benchmarks(iterations=3, filter='validate/minimal/lower/len8')['results']
+        assert list(results) == ['validate/minimal/lower/len8']
+
+
+class TestCompare:
+    """Tests para la detección de regresiones"""
+
+    def test_no_regression_within_threshold(self):
+        """Test que las variaciones dentro del umbral no fallan"""
+        baseline = report(a=result(10, 20, 1000))
+        assert compare(baseline, report(a=result(12, 25, 900)), 0.25, 0.5) == []
+
+    def test_regressions_detected(self):
+        """Test que p50, p99 y throughput se comparan por separado"""
+        baseline = report(a=result(10, 20, 1000))
+        regressions = compare(baseline, report(a=result(20, 40, 400)), 0.25, 0.5)
+        assert len(regressions) == 3
+
+    def test_new_cases_are_ignored(self):
+        """Test que los casos sin línea base no cuentan como regresión"""
+        assert compare(report(), report(b=result(10, 20, 1000))) == []
+
+    def test_cli_gate(self, tmp_path):
+        """Test que --compare devuelve 1 ante una regresión"""
+        baseline = tmp_path / 'baseline.json'
+        args = ['--iterations', '3', '--filter', 'generate/len8', '-q']
+        assert main(args + ['--save', str(baseline)]) == 0
+        data = json.loads(baseline.read_text())
+        data['results']['generate/len8'] = result(0.001, 0.001, 10 ** 12)
+        baseline.write_text(json.dumps(data))
+        assert main(args + ['--compare', str(baseline)]) == 1
+
+
+class TestStartup:
+    """Tests para la medición del arranque"""
+
+    def test_measure_startup(self):
+        """Test que se mide la importación y la primera petición en un proceso nuevo"""
+        results = measure_startup(runs=1, modes=('cold', 'preload'))
+        assert set(results['cold']) == {'import_ms', 'validate_ms', 'policy_ms', 'index_ms'}
+        assert results['preload']['preload_ms'] > 0
+        assert all(value > 0 for value in results['cold'].values())
+
+
+class TestWorstCase:
+    """Tests para las entradas patológicas"""
+
+    def test_checks_are_linear(self):
+        """Test que el tiempo de validate() crece linealmente con la longitud"""
+        results = measure_worst_case(lengths=(500, 4000), runs=3)
+        assert set(results) == set(ADVERSARIAL)
+        for name, timings in results.items():
+            # Lineal ≈ 8; cuadrático sería ≈ 64
+            assert timings['growth'] < 20, (name, timings)
+
+    def test_adversarial_lengths(self):
+        """Test que cada generador produce la longitud pedida"""
+        assert all(len(make(300)) == 300 for make in ADVERSARIAL.values())
@@ -0,0 +1,110 @@
+import hashlib
+import pickle
+
+import pytest
+
+from breach_index import BreachIndex, build_index, main, parse_hash_lines
+from validator import PasswordValidator
+
+
+def sha1_line(password, count):
+    return f'{hashlib.sha1(password.encode()).hexdigest().upper()}:{count}'
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    """Índice pequeño construido en varios bloques para ejercitar el merge"""
+    lines = [sha1_line(f'password{i}', i + 1) for i in range(200)]
+    lines.append(sha1_line('P@ssw0rd', 5))
+    lines.append(sha1_line('P@ssw0rd', 7))
+    path = tmp_path / 'breaches.idx'
+    build_index(parse_hash_lines(lines), str(path), chunk_records=37)
+    return path
+
+
+class TestBreachIndex:
+    """Tests para el índice offline de filtraciones"""
+
+    def test_lookup_counts(self, index_path):
+        """Test búsqueda de contraseñas presentes y ausentes"""
+        with BreachIndex(index_path) as index:
+            assert len(index) == 201
+            assert index.count('password0') == 1
+            assert index.count('password199') == 200
+            assert index.count('no-filtrada') == 0
+            assert 'password42' in index
+
+    def test_duplicates_are_summed(self, index_path):
+        """Test que los hashes repetidos suman sus apariciones"""
+        with BreachIndex(index_path) as index:
+            assert index.count('P@ssw0rd') == 12
+
+    def test_plaintext_build(self, tmp_path):
+        """Test construcción desde contraseñas en claro"""
+        path = tmp_path / 'plain.idx'
+        build_index(parse_hash_lines(['hunter2', 'hunter2', 'dragon'], plaintext=True), str(path))
+        with BreachIndex(path) as index:
+            assert index.count('hunter2') == 2
+            assert index.count('dragon') == 1
+
+    def test_rejects_invalid_file(self, tmp_path):
+        """Test que un archivo que no es índice se rechaza"""
+        path = tmp_path / 'bad.idx'
+        path.write_bytes(b'x' * 1024)
+        with pytest.raises(ValueError):
+            BreachIndex(path)
+
+    def test_rejects_invalid_hash_line(self):
+        """Test que una línea con hash inválido se rechaza"""
+        with pytest.raises(ValueError):
+            list(parse_hash_lines(['no-es-un-hash:3']))
+
+    def test_pickle_reopens_index(self, index_path):
+        """Test que el índice se puede enviar a otros procesos"""
+        with BreachIndex(index_path) as index:
+            clone = pickle.loads(pickle.dumps(index))
+        assert clone.count('password3') == 4
+        clone.close()
+
+    def test_cli_build_and_lookup(self, tmp_path, capsys):
+        """Test de la herramienta de línea de comandos"""
+        source = tmp_path / 'hashes.txt'
+        source.write_text(sha1_line('letmein', 42) + '\n')
+        output = tmp_path / 'cli.idx'
+        assert main(['build', str(source), str(output)]) == 0
+        assert main(['lookup', str(output), 'letmein']) == 0
+        assert capsys.readouterr().out.splitlines()[-1] == '42'
+
+
+class TestValidatorBreachCheck:
+    """Tests para la integración del índice en validate()"""
+
+    def test_breached_password_reports_count(self, index_path):
+        """Test que una contraseña filtrada falla e informa las apariciones"""
+        validator = PasswordValidator().min_length(8).check_breaches(str(index_path))
+        valid, results, score = validator.validate('P@ssw0rd')
+        assert not valid
+        breach = [r for r in results if 'comunes' in r['rule']]
+        assert '12' in breach[0]['message']
+        assert validator.compile().compact('P@ssw0rd').common == 12
+
+    def test_lone_surrogate(self, index_path, monkeypatch):
+        """Test que un surrogate suelto (válido en JSON) no rompe la consulta ni /validate"""
+        from app import app
+        from policies import PolicyRegistry
+        with BreachIndex(index_path) as index:
+            assert index.count('\ud800') == 0
+        registry = PolicyRegistry()
+        registry.register('validate', PasswordValidator().min_length(8)
+                          .check_breaches(str(index_path)))
+        monkeypatch.setattr('app.policies', registry)
+        response = app.test_client().post('/validate', data='{"password": "abc\\ud800defgh"}',
+                                          content_type='application/json')
+        assert response.status_code == 200
+        assert response.get_json()['valid'] is False
+
+    def test_index_replaces_common_list(self, index_path):
+        """Test que con índice no se consulta la lista de comunes"""
+        validator = PasswordValidator().check_breaches(BreachIndex(index_path))
+        valid, results, score = validator.validate('trustno1')
+        assert not any('comunes' in r['rule'] for r in results)
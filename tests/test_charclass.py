@@ -0,0 +1,83 @@
+import pytest
+
+import charclass
+from charclass import DIGIT, OTHER, SYMBOL, CharClassifier, char_flags, classifier, install_flags
+
+
+class TestCharClassifier:
+    """Tests para la clasificación de caracteres por tablas"""
+
+    def test_ascii_fast_path_matches_table(self):
+        """Test que el camino rápido ASCII coincide con la tabla general"""
+        default = classifier()
+        for code in range(128):
+            c = chr(code)
+            fast = default.counts(c, 'Uldso ')
+            slow = {cls: int(default.classify(c) == cls) for cls in 'Uldso '}
+            assert fast == slow, repr(c)
+
+    def test_non_ascii_counts(self):
+        """Test conteos con caracteres fuera de ASCII"""
+        counts = classifier().counts('Ñandú 7!', 'Ul d s')
+        assert counts == {'U': 1, 'l': 4, ' ': 1, 'd': 1, 's': 1}
+
+    def test_digit_semantics(self):
+        """Test qué cuenta como dígito en cada semántica"""
+        assert classifier('numeric').classify('²') == DIGIT
+        assert classifier('decimal').classify('²') != DIGIT
+        assert classifier('decimal').classify('٣') == DIGIT
+        assert classifier('ascii').classify('٣') == OTHER
+
+    def test_symbol_semantics(self):
+        """Test qué cuenta como símbolo en cada semántica"""
+        for c in '€¿…→©':
+            assert classifier(symbols='ascii').classify(c) == OTHER
+            assert classifier(symbols='unicode').classify(c) == SYMBOL
+
+    def test_invalid_semantics(self):
+        """Test que se rechazan semánticas desconocidas"""
+        with pytest.raises(ValueError):
+            CharClassifier(digits='roman')
+        with pytest.raises(ValueError):
+            CharClassifier(symbols='emoji')
+
+    def test_shared_classifier(self):
+        """Test que cada semántica tiene un único clasificador"""
+        assert classifier('decimal', 'unicode') is classifier('decimal', 'unicode')
+
+    def test_export(self):
+        """Test que la semántica exportada reproduce la clasificación de dígitos"""
+        exported = classifier('numeric', 'ascii').export()
+        assert '²' in exported['extra_digits'] and '٣' not in exported['extra_digits']
+        assert 'extra_digits' not in classifier('decimal', 'ascii').export()
+        assert exported['punctuation'] == '!"#$%&\'()*+,-./:;<=>?@[\\]^_`{|}~'
+
+
+class TestFlagsTable:
+    """Tests para la tabla de propiedades precalculada"""
+
+    def test_flags_reproduce_classification(self):
+        """Test que las clases derivadas de las propiedades coinciden con unicodedata"""
+        sample = [chr(code) for code in range(0, 0x3000, 7)] + list('²①٣€… \u00a0')
+        for digits in charclass.DIGIT_SEMANTICS:
+            for symbols in charclass.SYMBOL_SEMANTICS:
+                expected = CharClassifier(digits, symbols)
+                for c in sample:
+                    derived = charclass._class_from_flags(char_flags(c), digits, symbols)
+                    assert derived == expected.classify(c), (c, digits, symbols)
+
+    def test_installed_table_is_used(self, monkeypatch):
+        """Test que los clasificadores nuevos consultan la tabla instalada"""
+        monkeypatch.setattr(charclass, '_flags', None)
+        monkeypatch.setattr(charclass, '_installed_extras', None)
+        table = bytearray(charclass.sys.maxunicode + 1)
+        table[ord('é')] = charclass.FLAG_UPPER
+        install_flags(table, '²')
+        assert CharClassifier().classify('é') == charclass.UPPER
+        assert charclass._numeric_extras() == '²'
+        charclass._numeric_extras.cache_clear()
+
+    def test_rejects_wrong_size(self):
+        """Test que una tabla incompleta se rechaza"""
+        with pytest.raises(ValueError):
+            install_flags(b'\x00' * 10, '')
@@ -0,0 +1,153 @@
+import pickle
+import random
+
+import pytest
+
+from dictionary import WordDictionary, build_dictionary, build_trie, main
+from validator import PasswordValidator
+
+WORDS = ['password', 'pass', 'dragon', 'monkey', 'sunshine', 'lion', 'iloveyou', 'ñandú',
+         'abc', 'Dragon']
+
+
+@pytest.fixture
+def dictionary_path(tmp_path):
+    path = tmp_path / 'words.dict'
+    build_dictionary(WORDS, str(path))
+    return path
+
+
+def brute_force_spans(words, password, min_length=4):
+    # Todas las variantes leet de cada subcadena, sin trie
+    leet = {'@': 'a', '0': 'o', '1': 'li', '$': 's'}
+    words = {w.lower() for w in words if len(w) >= min_length}
+    found = []
+    lowered = [c.lower() for c in password]
+    for start in range(len(password)):
+        best = -1
+        prefixes = {''}
+        for end in range(start, len(password)):
+            c = lowered[end]
+            prefixes = {p + v for p in prefixes for v in (c,) + tuple(leet.get(c, ''))}
+            if any(p in words for p in prefixes):
+                best = end + 1
+        if best - start >= min_length:
+            found.append((start, best))
+    spans = []
+    for start, end in found:
+        if spans and start < spans[-1][1]:
+            spans[-1] = (spans[-1][0], max(spans[-1][1], end))
+        else:
+            spans.append((start, end))
+    return spans
+
+
+class TestWordDictionary:
+    """Tests para el diccionario en trie compacto"""
+
+    def test_exact_words(self, dictionary_path):
+        """Test palabras presentes, prefijos y palabras cortas descartadas"""
+        with WordDictionary(dictionary_path) as dictionary:
+            assert 'password' in dictionary and 'PASS' in dictionary
+            assert 'passw' not in dictionary
+            assert 'abc' not in dictionary
+            assert 'ñandú' in dictionary
+
+    def test_leet_substrings(self, dictionary_path):
+        """Test subcadenas con sustituciones leet"""
+        with WordDictionary(dictionary_path) as dictionary:
+            assert dictionary.find_spans('P@ssw0rd2024!') == [(0, 8)]
+            assert dictionary.find_spans('MyDragon99') == [(2, 8)]
+            assert dictionary.find_spans('1ion-l10n') == [(0, 4), (5, 9)]
+            assert dictionary.find_spans('xxÑANDÚyy') == [(2, 7)]
+            assert dictionary.search('$un$h1ne')
+            assert not dictionary.search('Kp9#vLqz2W')
+
+    def test_matches_brute_force(self):
+        """Test que el recorrido del trie coincide con probar todas las variantes"""
+        rnd = random.Random(5)
+        words = [''.join(rnd.choice('abilos') for _ in range(rnd.randint(4, 7)))
+                 for _ in range(300)]
+        dictionary = WordDictionary.from_words(words)
+        for _ in range(300):
+            password = ''.join(rnd.choice('abilos@01$X') for _ in range(rnd.randint(0, 20)))
+            assert dictionary.find_spans(password) == brute_force_spans(words, password)
+            assert dictionary.search(password) == bool(brute_force_spans(words, password))
+
+    def test_leet_branching_is_bounded(self, monkeypatch):
+        """Test que las ramas leet por inicio están acotadas en el peor caso"""
+        import itertools
+        import time
+        import dictionary as module
+        # 2^12 prefijos con l/i que nunca cierran palabra: '1' abre las dos ramas
+        words = [''.join(p) + 'x' for p in itertools.product('li', repeat=12)]
+        dictionary = WordDictionary.from_words(words)
+        started = time.perf_counter()
+        assert not dictionary.search('1' * 256)
+        assert time.perf_counter() - started < 1
+        # Dentro del tope se siguen encontrando; sin ramas leet no
+        assert dictionary.search('l1ll1lili1llx')
+        monkeypatch.setattr(module, 'MAX_LEET_EXPANSIONS', 0)
+        assert not dictionary.search('l1ll1lili1llx')
+        assert dictionary.search('l' * 12 + 'x')
+
+    def test_in_memory_matches_file(self, dictionary_path):
+        """Test que el diccionario en memoria y el mapeado son iguales"""
+        in_memory = WordDictionary(build_trie(WORDS))
+        with WordDictionary(dictionary_path) as mapped:
+            assert in_memory.nodes == mapped.nodes
+            assert in_memory.find_spans('ilov3you-dr@gon') == mapped.find_spans('ilov3you-dr@gon')
+
+    def test_empty_dictionary(self):
+        """Test diccionario sin palabras"""
+        dictionary = WordDictionary.from_words([])
+        assert dictionary.nodes == 1
+        assert not dictionary.search('password')
+
+    def test_rejects_invalid_file(self, tmp_path):
+        """Test que un archivo que no es diccionario se rechaza"""
+        path = tmp_path / 'bad.dict'
+        path.write_bytes(b'x' * 64)
+        with pytest.raises(ValueError):
+            WordDictionary(path)
+
+    def test_pickle(self, dictionary_path):
+        """Test que el diccionario se puede enviar a otros procesos"""
+        with WordDictionary(dictionary_path) as dictionary:
+            clone = pickle.loads(pickle.dumps(dictionary))
+        assert clone.search('dr4gon') is False and clone.search('drag0n')
+        clone.close()
+        in_memory = pickle.loads(pickle.dumps(WordDictionary.from_words(WORDS)))
+        assert in_memory.search('m0nkey')
+
+    def test_cli_build_and_lookup(self, tmp_path, capsys):
+        """Test de la herramienta de línea de comandos"""
+        source = tmp_path / 'words.txt'
+        source.write_text('dragon\nsunshine\n')
+        output = tmp_path / 'cli.dict'
+        assert main(['build', str(source), str(output)]) == 0
+        assert main(['lookup', str(output), 'MyDr@gon!']) == 0
+        assert capsys.readouterr().out.splitlines()[-1] == '2-8\tDr@gon'
+
+
+class TestValidatorDictionaryCheck:
+    """Tests para la integración del diccionario en validate()"""
+
+    def test_substring_fails_common_rule(self, dictionary_path):
+        """Test que una palabra del diccionario dentro de la contraseña falla"""
+        validator = PasswordValidator().min_length(8).check_dictionary(str(dictionary_path))
+        is_valid, results, _ = validator.validate('P@ssw0rd2024!', 'en')
+        assert not is_valid
+        assert results[-1] == {'rule': 'Do not use common passwords', 'passed': False,
+                               'message': 'Contains a common word or password'}
+        assert not validator.is_valid('MyDragon99')
+        assert validator.is_valid('Kp9#vLqz2W')
+        assert validator.compile().compact('MyDragon99').as_dict()['dictionary'] is True
+
+    def test_word_list_and_fingerprint(self):
+        """Test diccionario desde una lista y huella de la política"""
+        plain = PasswordValidator().min_length(8)
+        checked = PasswordValidator().min_length(8).check_dictionary(['sunshine'])
+        assert plain.is_valid('$un$h1ne!')
+        assert not checked.is_valid('$un$h1ne!')
+        assert plain.compile().fingerprint != checked.compile().fingerprint
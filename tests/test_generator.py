@@ -0,0 +1,112 @@
+from collections import Counter
+
+import pytest
+
+from generator import (ALPHABET, BulkGenerator, UniformSource, bulk_generator, length_bounds,
+                       requirements)
+from validator import PasswordValidator
+
+
+class TestUniformSource:
+    """Tests para la fuente de caracteres uniformes"""
+
+    def test_only_alphabet_characters(self):
+        """Test que sólo se producen caracteres del alfabeto"""
+        source = UniformSource('abc')
+        data = source.draw(3000)
+        assert len(data) == 3000
+        assert set(data) <= set(b'abc')
+
+    def test_roughly_uniform(self):
+        """Test que ningún carácter está claramente favorecido"""
+        # 94 no divide a 256: sin rechazo los primeros 68 símbolos saldrían más
+        counts = Counter(UniformSource(ALPHABET).draw(94 * 2000))
+        assert len(counts) == 94
+        assert max(counts.values()) < 2000 * 1.3
+        assert min(counts.values()) > 2000 * 0.7
+
+    def test_invalid_alphabet(self):
+        """Test que se rechazan alfabetos vacíos"""
+        with pytest.raises(ValueError):
+            UniformSource('')
+
+
+class TestBulkGenerator:
+    """Tests para el generador masivo"""
+
+    def test_requirements(self):
+        """Test mínimos por clase a partir de las reglas"""
+        rules = [('min_length', 8), ('digits', 2), ('digits', 3), ('symbols', 1)]
+        assert requirements(rules) == (('digits', 3), ('symbols', 1))
+
+    def test_passwords_meet_requirements(self):
+        """Test que todas las contraseñas cumplen los mínimos"""
+        validator = PasswordValidator().min_length(10).has_uppercase(2)\
+            .has_lowercase(2).has_digits(2).has_symbols(2)
+        passwords = list(validator.generate_many(500, 10))
+        assert len(passwords) == 500
+        for password in passwords:
+            assert len(password) == 10
+            assert validator.is_valid(password)
+
+    def test_tight_requirements_use_construction(self):
+        """Test que los mínimos casi imposibles por rechazo también se cumplen"""
+        generator = BulkGenerator((('digits', 6),))
+        passwords = list(generator.generate_many(50, 6))
+        assert all(p.isdigit() and len(p) == 6 for p in passwords)
+
+    def test_is_lazy(self):
+        """Test que generate_many produce por lotes bajo demanda"""
+        passwords = bulk_generator().generate_many(10 ** 9, 12)
+        assert len(next(passwords)) == 12
+
+    def test_shared_generator(self):
+        """Test que las políticas con los mismos mínimos comparten generador"""
+        assert bulk_generator((('digits', 1),)) is bulk_generator((('digits', 1),))
+
+
+class TestPolicyConstraints:
+    """Tests para la generación que cumple toda la política por construcción"""
+
+    def test_sequences_tokens_and_repetitions(self):
+        """Test que no salen secuencias, tokens prohibidos ni triples repeticiones"""
+        validator = PasswordValidator().min_length(8).max_length(12).has_lowercase(6)\
+            .has_digits(2).banned_tokens(['acme', 'qz', 'x'])
+        policy = validator.compile()
+        for password in policy.generate_many(2000, 8):
+            assert policy.is_valid(password), password
+            assert 'x' not in password.lower()
+
+    def test_repair_keeps_classes(self):
+        """Test que la reparación sustituye dentro de la misma clase"""
+        generator = BulkGenerator((('digits', 6),))
+        assert generator._repair('123456') != '123456'
+        assert generator._repair('123456').isdigit()
+        assert generator._repair('aaab').count('a') < 3
+        assert generator._repair('Kp9#vLqz') == 'Kp9#vLqz'
+
+    def test_unsatisfiable_length(self):
+        """Test que las longitudes imposibles fallan antes de generar"""
+        validator = PasswordValidator().min_length(10).max_length(16).has_digits(4)
+        for length in (0, 8, 20):
+            with pytest.raises(ValueError):
+                validator.generate_many(5, length)
+        assert len(validator.generate_password(10)) == 10
+        assert length_bounds(validator.rules) == (10, 16)
+
+    def test_unsatisfiable_tokens(self):
+        """Test que los tokens prohibidos que bloquean una clase exigida fallan"""
+        validator = PasswordValidator().has_digits(1).banned_tokens(list('0123456789'))
+        with pytest.raises(ValueError):
+            validator.generate_password(8)
+        # Sin exigir la clase bloqueada se rellena con las demás
+        other = PasswordValidator().has_lowercase(1).banned_tokens(list('0123456789'))
+        assert not any(c.isdigit() for c in other.generate_password(12))
+
+    def test_common_list_filter(self):
+        """Test que el filtro posterior descarta las comunes y se rinde si no queda ninguna"""
+        generator = BulkGenerator((('digits', 4),))
+        with pytest.raises(ValueError):
+            next(generator.generate_many(1, 4, accept=lambda password: False))
+        passwords = list(generator.generate_many(100, 4, accept=lambda p: p[0] != '7'))
+        assert len(passwords) == 100 and not any(p[0] == '7' for p in passwords)
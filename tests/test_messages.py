@@ -0,0 +1,58 @@
+import pytest
+
+from messages import CATALOGS, LANGUAGES, compile_catalog
+from validator import PasswordValidator
+
+
+class TestCatalogs:
+    """Tests para los catálogos de mensajes"""
+
+    def test_languages_share_keys(self):
+        """Test que todos los idiomas definen los mismos mensajes"""
+        spanish = CATALOGS['es']
+        for language in LANGUAGES:
+            assert CATALOGS[language].keys() == spanish.keys()
+            assert CATALOGS[language]['rules'].keys() == spanish['rules'].keys()
+
+    def test_labels_are_resolved_once(self):
+        """Test que las etiquetas se resuelven con sus valores y se comparten"""
+        rules = (('min_length', 8), ('has_nothing', 1), ('digits', 2))
+        catalog = compile_catalog(rules, 'en')
+        assert [entry[0] for entry in catalog.rules] == ['At least 8 characters',
+                                                         'At least 2 digit(s)']
+        assert catalog.labels[-4:] == ('Do not use common passwords', 'No obvious sequences',
+                                       'No repeated characters', 'Not similar to your details')
+        assert compile_catalog(rules, 'en') is catalog
+
+    def test_unknown_language(self):
+        """Test que un idioma desconocido se rechaza"""
+        with pytest.raises(ValueError):
+            compile_catalog((), 'fr')
+
+
+class TestCompactRendering:
+    """Tests para el renderizado de resultados compactos"""
+
+    def test_same_result_in_both_languages(self):
+        """Test que un mismo resultado compacto se renderiza en es y en"""
+        policy = PasswordValidator().min_length(8).has_digits().no_spaces().compile()
+        result = policy.compact('abc def')
+        valid, spanish, score = result.render('es')
+        _, english, english_score = result.render('en')
+        assert not valid and score == english_score
+        assert [r['passed'] for r in spanish] == [r['passed'] for r in english]
+        assert english[0] == {'rule': 'At least 8 characters', 'passed': False,
+                              'message': 'Current length: 7'}
+        assert english[2]['message'] == 'Spaces found'
+        assert english[-1]['rule'] == 'No obvious sequences'
+        assert english[-1]['spans'] == spanish[-1]['spans'] == [[0, 3], [4, 7]]
+
+    def test_describe_matches_render(self):
+        """Test que describe() y as_dict() bastan para reconstruir render()"""
+        policy = PasswordValidator().min_length(8).no_spaces().compile()
+        description = policy.describe('en')
+        data = policy.compact('abc d').as_dict()
+        assert description['version'] == data['version'] == policy.fingerprint
+        assert [r['id'] for r in description['rules']] == list(policy.rule_ids)
+        assert data['mask'] == 0b110100 and data['counts'] == [5, 1]
+        assert data['spans'] == [[0, 3]] and 'breaches' not in data
@@ -0,0 +1,142 @@
+import threading
+
+import pytest
+
+import validator
+from metrics import Metrics
+from validator import CHECKS, PasswordValidator
+
+
+@pytest.fixture
+def policy():
+    return PasswordValidator().min_length(8).has_digits().compile()
+
+
+@pytest.fixture
+def registry():
+    previous = validator._observer, validator._cached_observer
+    registry = Metrics()
+    registry.install()
+    yield registry
+    validator.set_observer(*previous)
+
+
+class TestValidationMetrics:
+    """Tests para la instrumentación de validate()"""
+
+    def test_results_unchanged(self, policy, registry):
+        """Test que el observador devuelve lo mismo que validate() sin métricas"""
+        observed = policy.validate('abc')
+        registry.uninstall()
+        assert observed == policy.validate('abc')
+
+    def test_rule_counters(self, policy, registry):
+        """Test conteo de reglas superadas y falladas"""
+        for password in ['abc', 'abcdefgh', 'x7k9q2w5z']:
+            policy.validate(password)
+        counts = registry.rule_results()
+        assert counts[('Mínimo 8 caracteres', True)] == 2
+        assert counts[('Mínimo 8 caracteres', False)] == 1
+        assert counts[('Sin secuencias obvias', False)] == 2
+        assert registry.snapshot().validations == 3
+
+    def test_check_timings(self, policy, registry):
+        """Test que se acumula tiempo en cada fase"""
+        policy.validate('MyP@ssw0rd')
+        seconds = registry.snapshot().check_seconds
+        assert len(seconds) == len(CHECKS)
+        assert all(s >= 0 for s in seconds) and sum(seconds) > 0
+
+    def test_uninstall(self, policy, registry):
+        """Test que sin observador no se registra nada"""
+        registry.uninstall()
+        assert validator._observer is None
+        policy.validate('abc')
+        assert registry.snapshot().validations == 0
+
+    def test_threads_are_merged(self, policy, registry):
+        """Test que los fragmentos de hilos (también terminados) se suman"""
+        threads = [threading.Thread(target=lambda: [policy.validate('abc') for _ in range(10)])
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        policy.validate('abc')
+        assert registry.snapshot().validations == 41
+        # Los hilos terminados se pliegan en un único fragmento
+        assert len(registry._shards) == 1
+
+
+class TestPolicyReload:
+    """Tests para los contadores frente a recargas de políticas"""
+
+    def test_keyed_by_fingerprint(self, registry):
+        """Test que una política recompilada igual suma en los mismos contadores"""
+        first = PasswordValidator().min_length(8).compile()
+        first.validate('abc')
+        # Misma definición recompilada (como tras recargar el archivo de políticas)
+        PasswordValidator().min_length(8).compile().validate('abcd')
+        assert registry.rule_results()[('Mínimo 8 caracteres', False)] == 2
+        outcomes = registry.snapshot().outcomes
+        # Las claves son huellas: las métricas no retienen las políticas
+        assert [fingerprint for fingerprint, _ in outcomes] == [first.fingerprint]
+
+
+class TestCachedResults:
+    """Tests para los resultados servidos desde la caché de resultados"""
+
+    def test_cache_hits_are_counted(self, policy, registry):
+        """Test que un acierto de caché cuenta como validación cacheada"""
+        from result_cache import ResultCache
+        cache = ResultCache()
+        for _ in range(3):
+            cache.compact(policy, 'abc')
+        snapshot = registry.snapshot()
+        assert (snapshot.validations, snapshot.cached) == (1, 2)
+        assert registry.rule_results()[('Mínimo 8 caracteres', False)] == 3
+        text = registry.render()
+        assert 'password_validator_validations_total{cached="false"} 1' in text
+        assert 'password_validator_validations_total{cached="true"} 2' in text
+
+    def test_uninstall(self, policy, registry):
+        """Test que sin observador los aciertos tampoco se registran"""
+        from result_cache import ResultCache
+        cache = ResultCache()
+        cache.compact(policy, 'abc')
+        registry.uninstall()
+        cache.compact(policy, 'abc')
+        assert registry.snapshot().cached == 0
+
+
+class TestRender:
+    """Tests para la exposición en formato Prometheus"""
+
+    def test_cache_stats(self):
+        """Test que las estadísticas de la caché de resultados se exportan"""
+        text = Metrics().render({'size': 3, 'maxsize': 10, 'hits': 5, 'misses': 3,
+                                 'evictions': 1, 'expirations': 2})
+        assert '# TYPE password_validator_result_cache_size gauge' in text
+        assert 'password_validator_result_cache_size 3' in text
+        assert 'password_validator_result_cache_hits_total 5' in text
+        assert 'password_validator_result_cache_expirations_total 2' in text
+        assert 'result_cache' not in Metrics().render()
+
+    def test_histogram(self):
+        """Test buckets acumulados, suma y total"""
+        registry = Metrics(buckets=(0.01, 0.1))
+        registry.observe_request('validate', 'POST', 200, 0.005)
+        registry.observe_request('validate', 'POST', 200, 0.05)
+        registry.observe_request('validate', 'POST', 200, 5)
+        text = registry.render()
+        labels = 'endpoint="validate",method="POST",status="200"'
+        assert f'http_request_duration_seconds_bucket{{{labels},le="0.01"}} 1' in text
+        assert f'http_request_duration_seconds_bucket{{{labels},le="0.1"}} 2' in text
+        assert f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 3' in text
+        assert f'http_request_duration_seconds_count{{{labels}}} 3' in text
+
+    def test_label_escaping(self):
+        """Test que las comillas de las etiquetas se escapan"""
+        registry = Metrics()
+        registry.observe_request('a"b', 'GET', 200, 0.001)
+        assert 'endpoint="a\\"b"' in registry.render()
@@ -0,0 +1,129 @@
+import math
+import pickle
+from collections import Counter
+
+import pytest
+
+from passphrase import (PassphraseGenerator, UniformIndexes, Wordlist, build_wordlist, main,
+                        pack_wordlist)
+
+EFF_SAMPLE = ['11111\tabacus', '11112\tabdomen', '11113\tabdominal', '11114\tabide']
+
+
+@pytest.fixture(scope='module')
+def wordlist():
+    return Wordlist.from_words(f'word{i:04d}' for i in range(7776))
+
+
+class TestWordlist:
+    """Tests para la lista de palabras con índice de posiciones fijas"""
+
+    def test_eff_format_and_duplicates(self):
+        """Test que se quita el prefijo de dados y las repetidas"""
+        words = Wordlist.from_words(EFF_SAMPLE + ['Abide', '', '  '])
+        assert len(words) == 4
+        assert [words[i] for i in range(4)] == ['abacus', 'abdomen', 'abdominal', 'abide']
+        assert words.cased
+
+    def test_index_out_of_range(self, wordlist):
+        """Test que los índices fuera de rango fallan"""
+        assert wordlist[7775] == 'word7775'
+        for index in (-1, 7776):
+            with pytest.raises(IndexError):
+                wordlist[index]
+
+    def test_mapped_file(self, tmp_path):
+        """Test que la lista se mapea desde disco y se envía a otro proceso por ruta"""
+        path = tmp_path / 'words.idx'
+        assert build_wordlist(EFF_SAMPLE + ['ñandú'], str(path)) == 5
+        with Wordlist(path) as words:
+            assert words[4] == 'ñandú'
+            clone = pickle.loads(pickle.dumps(words))
+            assert clone.path == str(path) and clone[0] == 'abacus'
+            clone.close()
+
+    def test_rejects_invalid_file(self, tmp_path):
+        """Test que los archivos truncados o ajenos se rechazan"""
+        data = pack_wordlist(EFF_SAMPLE)
+        for bad in [b'x' * 64, data[:12], data[:-1]]:
+            with pytest.raises(ValueError):
+                Wordlist(bad)
+
+    def test_uncased_words(self):
+        """Test que una lista con palabras sin mayúsculas no suma el bit aleatorio"""
+        words = Wordlist.from_words(['alfa', '42', 'beta'])
+        assert not words.cased
+        generator = PassphraseGenerator(words, words=4, capitalize='random')
+        assert generator.entropy == pytest.approx(4 * math.log2(3))
+
+
+class TestPassphraseGenerator:
+    """Tests para el generador de frases"""
+
+    def test_options(self, wordlist):
+        """Test de separador, número de palabras y mayúsculas"""
+        phrase = PassphraseGenerator(wordlist, words=4, separator='.', capitalize='upper').generate()
+        assert len(phrase.split('.')) == 4 and phrase.isupper()
+        phrase = PassphraseGenerator(wordlist, words=3, separator='', capitalize='title').generate()
+        assert len(phrase) == 24 and phrase.count('W') == 3
+        mixed = PassphraseGenerator(wordlist, words=64, capitalize='random').generate().split('-')
+        assert {w[0] for w in mixed} == {'w', 'W'}
+
+    def test_digits(self, wordlist):
+        """Test que cada frase lleva justo `digits` palabras con un dígito al final"""
+        generator = PassphraseGenerator(wordlist, words=5, digits=2)
+        for phrase in generator.generate_many(500):
+            words = phrase.split('-')
+            assert sum(len(w) == 9 and w[-1].isdigit() for w in words) == 2
+        everywhere = PassphraseGenerator(wordlist, words=3, digits=3).generate()
+        assert all(len(w) == 9 for w in everywhere.split('-'))
+
+    def test_entropy(self, wordlist):
+        """Test de la entropía reportada"""
+        assert PassphraseGenerator(wordlist).entropy == pytest.approx(77.55, abs=0.01)
+        generator = PassphraseGenerator(wordlist, words=6, capitalize='random', digits=1)
+        expected = 6 * math.log2(7776) + 6 + math.log2(10) + math.log2(6)
+        assert generator.entropy == pytest.approx(expected)
+
+    def test_invalid_options(self, wordlist):
+        """Test que las opciones inválidas fallan al construir el generador"""
+        for options in [{'words': 0}, {'words': '6'}, {'separator': 'x' * 9},
+                        {'capitalize': 'camel'}, {'digits': 7}, {'digits': -1}]:
+            with pytest.raises(ValueError):
+                PassphraseGenerator(wordlist, **options)
+        with pytest.raises(ValueError):
+            PassphraseGenerator(Wordlist.from_words(['solo']))
+
+    def test_bulk_unique(self, wordlist):
+        """Test que generate_many cruza lotes y no repite frases"""
+        phrases = list(PassphraseGenerator(wordlist, words=4).generate_many(2500))
+        assert len(phrases) == len(set(phrases)) == 2500
+
+
+class TestUniformIndexes:
+    """Tests para los índices uniformes"""
+
+    def test_roughly_uniform(self):
+        """Test que ningún índice está claramente favorecido"""
+        counts = Counter(UniformIndexes(10).draw(20000))
+        assert set(counts) == set(range(10))
+        assert max(counts.values()) < 2000 * 1.2
+        assert min(counts.values()) > 2000 * 0.8
+
+    def test_invalid_range(self):
+        """Test que se rechazan rangos vacíos"""
+        with pytest.raises(ValueError):
+            UniformIndexes(0)
+
+
+def test_cli_build_and_generate(tmp_path, capsys):
+    """Test de la herramienta de línea de comandos"""
+    source = tmp_path / 'eff.txt'
+    source.write_text('\n'.join(EFF_SAMPLE) + '\n', encoding='utf-8')
+    output = tmp_path / 'eff.idx'
+    assert main(['build', str(source), str(output)]) == 0
+    capsys.readouterr()
+    assert main(['generate', str(output), '--words', '3', '--count', '4']) == 0
+    captured = capsys.readouterr()
+    assert len(captured.out.splitlines()) == 4
+    assert 'bits' in captured.err
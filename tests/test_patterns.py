@@ -0,0 +1,95 @@
+import pytest
+
+from patterns import (SequenceAutomaton, build_automaton, default_patterns, merge_spans,
+                      register_automaton)
+
+
+@pytest.fixture
+def automaton():
+    return build_automaton()
+
+
+class TestDefaultPatterns:
+    """Tests para el conjunto de patrones por defecto"""
+
+    def test_runs_in_both_directions(self):
+        """Test que se incluyen secuencias ascendentes y descendentes"""
+        patterns = set(default_patterns())
+        for pattern in ('abc', 'cba', 'xyz', 'mnopq', '123', '987', '0987'):
+            assert pattern in patterns
+
+    def test_keyboard_walks(self):
+        """Test que se incluyen filas y columnas de los tres teclados"""
+        patterns = set(default_patterns())
+        for pattern in ('qwerty', 'ytrewq', 'azerty', 'qwertz', 'asdf', 'yxcv', '1qaz', 'zaq1'):
+            assert pattern in patterns
+
+    def test_minimum_length(self):
+        """Test que no hay patrones de menos de 3 caracteres"""
+        assert min(map(len, default_patterns())) == 3
+
+
+class TestSequenceAutomaton:
+    """Tests para el autómata Aho-Corasick"""
+
+    def test_spans(self, automaton):
+        """Test que se informa de los tramos coincidentes"""
+        assert automaton.find_spans('xQwErTy!') == [(1, 7)]
+        assert automaton.find_spans('Tr0ub4dor') == []
+
+    def test_overlapping_matches_are_merged(self, automaton):
+        """Test que las coincidencias solapadas forman un único tramo"""
+        assert automaton.find_spans('abcd') == [(0, 4)]
+        assert automaton.find_spans('abc_123') == [(0, 3), (4, 7)]
+
+    def test_matches_naive_search(self):
+        """Test que coincide con una búsqueda ingenua de cada patrón"""
+        patterns = ['he', 'she', 'his', 'hers']
+        automaton = SequenceAutomaton(patterns)
+        text = 'ushershishe'
+        covered = set()
+        for pattern in patterns:
+            start = text.find(pattern)
+            while start != -1:
+                covered.update(range(start, start + len(pattern)))
+                start = text.find(pattern, start + 1)
+        found = {i for start, end in automaton.find_spans(text) for i in range(start, end)}
+        assert found == covered
+
+    def test_search_matches_find_spans(self, automaton):
+        """Test que search() indica si hay algún tramo"""
+        for text in ['xQwErTy!', 'Tr0ub4dor', '', 'İİabc', 'ab']:
+            assert automaton.search(text) == bool(automaton.find_spans(text))
+
+    def test_positions_follow_original_text(self, automaton):
+        """Test que las posiciones no se desplazan con caracteres como 'İ'"""
+        assert automaton.find_spans('İİabc') == [(2, 5)]
+
+    def test_banned_tokens(self):
+        """Test que los tokens prohibidos se detectan sin distinguir mayúsculas"""
+        automaton = build_automaton(('acme',))
+        assert automaton.find_spans('I<3ACME!') == [(3, 7)]
+        assert build_automaton(('acme',)) is automaton
+
+    def test_merge_spans(self):
+        """Test fusión de coincidencias (fin, inicio)"""
+        assert merge_spans([(3, 0), (4, 1), (9, 6)]) == [(0, 4), (6, 9)]
+        # Una coincidencia más larga empieza antes que los tramos anteriores
+        assert merge_spans([(3, 1), (7, 4), (9, 0)]) == [(0, 9)]
+
+    def test_longer_match_starts_earlier(self):
+        """Test que el tramo fusionado empieza en el inicio más temprano"""
+        assert build_automaton(('zqwez',)).find_spans('zqwez') == [(0, 5)]
+        automaton = build_automaton(('zqwexasdz',))
+        assert automaton.find_spans('qwexasd') == [(0, 3), (4, 7)]
+        assert automaton.find_spans('zqwexasdz!') == [(0, 9)]
+
+    def test_register_precompiled(self, monkeypatch):
+        """Test que un autómata registrado sustituye a la compilación"""
+        monkeypatch.setattr('patterns._registered', {})
+        compiled = SequenceAutomaton(default_patterns() + ['contoso'])
+        copy = SequenceAutomaton.from_tables(compiled.alphabet, compiled.max_length,
+                                             compiled.pattern_count, compiled.table, compiled.out)
+        register_automaton(('contoso',), copy)
+        assert build_automaton(('contoso',)) is copy
+        assert copy.find_spans('xContoso123') == compiled.find_spans('xContoso123') == [(1, 8), (8, 11)]
@@ -0,0 +1,98 @@
+import json
+import os
+
+import pytest
+
+from policies import PolicyRegistry, build_policy, load_policy_file
+from validator import CompiledPolicy, PasswordValidator
+
+
+def write_policies(path, definitions, mtime=None):
+    path.write_text(json.dumps({'policies': definitions}))
+    if mtime is not None:
+        os.utime(path, ns=(mtime, mtime))
+
+
+class TestBuildPolicy:
+    """Tests para la construcción de políticas desde definiciones"""
+
+    def test_build_matches_builder(self):
+        """Test que la definición equivale a encadenar los métodos"""
+        policy = build_policy({'min_length': 8, 'has_digits': 2, 'no_spaces': True})
+        validator = PasswordValidator().min_length(8).has_digits(2).no_spaces()
+        assert isinstance(policy, CompiledPolicy)
+        assert policy.rules == tuple(validator.rules)
+
+    def test_false_options_are_skipped(self):
+        """Test que las opciones desactivadas no añaden reglas"""
+        policy = build_policy({'min_length': 8, 'no_spaces': False})
+        assert policy.rules == (('min_length', 8),)
+
+    def test_banned_tokens_option(self):
+        """Test que los tokens prohibidos se leen de la definición"""
+        policy = build_policy({'min_length': 8, 'banned_tokens': ['Acme']})
+        assert policy.banned_tokens == ('acme',)
+        assert not policy.validate('xAcmex9!')[0]
+
+    def test_character_classes_option(self):
+        """Test que la semántica de caracteres se pasa como argumentos"""
+        policy = build_policy({'has_symbols': 1, 'character_classes': {'symbols': 'unicode'}})
+        assert policy.classifier.symbols == 'unicode'
+        assert policy.validate('abc…')[1][0]['passed']
+
+    def test_unknown_option(self):
+        """Test que una opción desconocida se rechaza"""
+        with pytest.raises(ValueError):
+            build_policy({'validate': 3})
+
+    def test_load_toml(self, tmp_path):
+        """Test lectura de políticas en TOML"""
+        pytest.importorskip('tomllib')
+        path = tmp_path / 'policies.toml'
+        path.write_text('[policies.strict]\nmin_length = 12\nhas_symbols = 2\n')
+        policies = load_policy_file(str(path))
+        assert policies['strict'].rules == (('min_length', 12), ('symbols', 2))
+
+
+class TestPolicyRegistry:
+    """Tests para el registro de políticas"""
+
+    def test_register_from_code(self):
+        """Test registrar políticas definidas en código"""
+        registry = PolicyRegistry()
+        registry.register('basic', PasswordValidator().min_length(8))
+        registry.register('spec', {'has_digits': 1})
+        assert registry.get('basic').rules == (('min_length', 8),)
+        assert registry.names() == ['basic', 'spec']
+
+    def test_get_returns_shared_object(self):
+        """Test que la misma política compilada se comparte entre llamadas"""
+        registry = PolicyRegistry()
+        registry.register('basic', PasswordValidator().min_length(8))
+        assert registry.get('basic') is registry.get('basic')
+
+    def test_file_overrides_code(self, tmp_path):
+        """Test que el archivo tiene prioridad sobre el código"""
+        path = tmp_path / 'policies.json'
+        write_policies(path, {'basic': {'min_length': 12}})
+        registry = PolicyRegistry(str(path))
+        registry.register('basic', PasswordValidator().min_length(8))
+        assert registry.get('basic').rules == (('min_length', 12),)
+
+    def test_hot_reload(self, tmp_path):
+        """Test recarga del archivo cuando cambia en disco"""
+        path = tmp_path / 'policies.json'
+        write_policies(path, {'basic': {'min_length': 8}}, mtime=1_000_000_000)
+        registry = PolicyRegistry(str(path), check_interval=0)
+        write_policies(path, {'basic': {'min_length': 10}}, mtime=2_000_000_000)
+        assert registry.get('basic').rules == (('min_length', 10),)
+
+    def test_invalid_reload_keeps_previous(self, tmp_path):
+        """Test que un archivo roto no reemplaza las políticas vigentes"""
+        path = tmp_path / 'policies.json'
+        write_policies(path, {'basic': {'min_length': 8}}, mtime=1_000_000_000)
+        registry = PolicyRegistry(str(path), check_interval=0)
+        path.write_text('{roto')
+        os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+        assert registry.reload() is False
+        assert registry.get('basic').rules == (('min_length', 8),)
@@ -0,0 +1,17 @@
+import app
+from messages import LANGUAGES
+from preload import preload
+
+
+class TestPreload:
+    """Tests para la precarga antes del fork"""
+
+    def test_warms_caches(self):
+        """Test que se precalculan /policy e index y se devuelven las fases"""
+        app.policy_document.cache_clear()
+        app.index_page.cache_clear()
+        timings = preload(freeze=False)
+        assert set(timings) == {'import', 'policies', 'generator', 'strength',
+                                'policy_document', 'index'}
+        assert app.policy_document.cache_info().currsize == len(LANGUAGES)
+        assert app.index_page.cache_info().currsize == 1
@@ -0,0 +1,131 @@
+import multiprocessing
+
+import pytest
+
+from ratelimit import SharedMemoryLimiter, TokenBucketLimiter, retry_after_header
+
+
+class TestTokenBucketLimiter:
+    """Tests para el limitador en memoria"""
+
+    def test_burst_then_reject(self):
+        """Test que se permiten `burst` peticiones seguidas y luego se rechaza"""
+        limiter = TokenBucketLimiter(rate=1, burst=3, sweep_interval=0)
+        assert [limiter.acquire('a')[0] for _ in range(4)] == [True, True, True, False]
+        allowed, retry_after = limiter.acquire('a')
+        assert not allowed and 0 < retry_after <= 1
+
+    def test_keys_are_independent(self):
+        """Test que cada cliente tiene su propio cubo"""
+        limiter = TokenBucketLimiter(rate=1, burst=1, sweep_interval=0)
+        assert limiter.acquire('a')[0]
+        assert limiter.acquire('b')[0]
+        assert not limiter.acquire('a')[0]
+
+    def test_sweep_removes_idle_buckets(self):
+        """Test que los cubos ya rellenados se eliminan"""
+        limiter = TokenBucketLimiter(rate=10, burst=5, sweep_interval=0)
+        for i in range(100):
+            limiter.acquire(f'10.0.0.{i}')
+        assert len(limiter) == 100
+        assert limiter.sweep() == 0
+        assert limiter.sweep(now=float('inf')) == 100
+        assert len(limiter) == 0
+
+    def test_max_keys_bounds_memory(self):
+        """Test que el número de cubos está acotado aunque no estén inactivos"""
+        limiter = TokenBucketLimiter(rate=1, burst=10, shards=4, max_keys=40, sweep_interval=0)
+        for i in range(1000):
+            limiter.acquire(str(i))
+        assert len(limiter) <= 40
+
+    def test_evicts_least_recently_used(self):
+        """Test que con el mapa lleno se descarta el cubo usado hace más tiempo"""
+        limiter = TokenBucketLimiter(rate=0.001, burst=2, shards=1, max_keys=3,
+                                     sweep_interval=0)
+        for key in 'abc':
+            limiter.acquire(key)
+        limiter.acquire('a')
+        limiter.acquire('d')
+        # 'b' se ha descartado: vuelve con el cubo lleno; 'a' conserva su consumo
+        assert limiter.acquire('b') == (True, 0.0)
+        assert not limiter.acquire('a')[0]
+
+    def test_flood_of_new_keys(self):
+        """Test que cada clave nueva con el mapa lleno cuesta lo mismo que con pocas"""
+        import time
+        limiter = TokenBucketLimiter(rate=1, burst=10, shards=1, max_keys=50_000,
+                                     sweep_interval=0)
+        for i in range(50_000):
+            limiter.acquire(str(i))
+        started = time.perf_counter()
+        for i in range(50_000, 60_000):
+            limiter.acquire(str(i))
+        assert time.perf_counter() - started < 1
+        assert len(limiter) <= 50_000
+
+    def test_invalid_parameters(self):
+        """Test que se rechazan parámetros sin sentido"""
+        with pytest.raises(ValueError):
+            TokenBucketLimiter(rate=0, burst=10)
+
+
+def _consume(path, count, queue):
+    limiter = SharedMemoryLimiter(path, rate=0.001, burst=10, slots=64, stripes=4)
+    queue.put(sum(limiter.acquire('client')[0] for _ in range(count)))
+
+
+class TestSharedMemoryLimiter:
+    """Tests para el limitador compartido entre procesos"""
+
+    def test_burst_then_reject(self, tmp_path):
+        """Test mismo comportamiento que el limitador en memoria"""
+        limiter = SharedMemoryLimiter(str(tmp_path / 'limits'), rate=1, burst=2, slots=64)
+        assert [limiter.acquire('a')[0] for _ in range(3)] == [True, True, False]
+        assert limiter.acquire('b')[0]
+        limiter.close()
+
+    def test_shared_between_processes(self, tmp_path):
+        """Test que varios procesos consumen del mismo cubo"""
+        path = str(tmp_path / 'limits')
+        queue = multiprocessing.Queue()
+        processes = [multiprocessing.Process(target=_consume, args=(path, 8, queue))
+                     for _ in range(3)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        assert sum(queue.get() for _ in processes) == 10
+
+    def test_clock_going_backwards(self, tmp_path, monkeypatch):
+        """Test que un reloj que retrocede no bloquea los cubos guardados"""
+        import ratelimit
+        clock = [1e9]
+        monkeypatch.setattr(ratelimit.time, 'time', lambda: clock[0])
+        limiter = SharedMemoryLimiter(str(tmp_path / 'limits'), rate=1, burst=2, slots=64)
+        assert [limiter.acquire('a')[0] for _ in range(3)] == [True, True, False]
+        # Retroceso pequeño: sigue vacío y no queda negativo
+        clock[0] -= 0.5
+        assert not limiter.acquire('a')[0]
+        clock[0] += 1.6
+        assert limiter.acquire('a')[0]
+        # Estado de otro reloj muy por delante (p. ej. monotonic antes de reiniciar)
+        clock[0] = 1000.0
+        assert limiter.acquire('a')[0] and limiter.acquire('a')[0]
+        limiter.close()
+
+    def test_rejects_foreign_file(self, tmp_path):
+        """Test que no se reutiliza un archivo con otro formato"""
+        path = tmp_path / 'limits'
+        path.write_bytes(b'x' * (16 + 64 * 24))
+        with pytest.raises(ValueError):
+            SharedMemoryLimiter(str(path), rate=1, burst=1, slots=64)
+
+
+class TestRetryAfter:
+    """Tests para la cabecera Retry-After"""
+
+    def test_rounds_up(self):
+        """Test que se redondea hacia arriba y nunca es 0"""
+        assert retry_after_header(0.2) == '1'
+        assert retry_after_header(2.1) == '3'
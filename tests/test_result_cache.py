@@ -0,0 +1,121 @@
+import pytest
+
+from result_cache import ResultCache
+from validator import PasswordValidator
+
+
+@pytest.fixture
+def policy():
+    return PasswordValidator().min_length(8).has_digits().compile()
+
+
+class TestResultCache:
+    """Tests para la caché de resultados de validación"""
+
+    def test_hit_returns_same_result(self, policy):
+        """Test que un acierto devuelve el mismo resultado que validate()"""
+        cache = ResultCache()
+        first = cache.validate(policy, 'Password1')
+        second = cache.validate(policy, 'Password1')
+        assert first == second == policy.validate('Password1')
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_results_are_copies(self, policy):
+        """Test que modificar un resultado no altera la caché"""
+        cache = ResultCache()
+        cache.validate(policy, 'Password1')[1][0]['passed'] = 'modificado'
+        assert cache.validate(policy, 'Password1')[1][0]['passed'] is True
+
+    def test_plaintext_not_in_keys(self, policy):
+        """Test que la contraseña en claro no aparece en las claves"""
+        cache = ResultCache()
+        cache.validate(policy, 'Password1')
+        for fingerprint, digest in cache._entries:
+            assert b'Password1' not in digest
+            assert 'Password1' not in fingerprint
+
+    def test_key_depends_on_policy(self, policy):
+        """Test que distintas políticas no comparten entradas"""
+        cache = ResultCache()
+        other = PasswordValidator().min_length(20).compile()
+        cache.validate(policy, 'Password1')
+        valid, results, score = cache.validate(other, 'Password1')
+        assert not valid
+        assert cache.misses == 2
+
+    def test_lru_eviction(self, policy):
+        """Test que se descarta la entrada menos usada al llenarse"""
+        cache = ResultCache(maxsize=2)
+        cache.validate(policy, 'uno')
+        cache.validate(policy, 'dos')
+        cache.validate(policy, 'uno')
+        cache.validate(policy, 'tres')
+        assert cache.evictions == 1
+        assert len(cache) == 2
+        cache.validate(policy, 'uno')
+        assert cache.hits == 2
+
+    def test_ttl_expiration(self, policy):
+        """Test que las entradas caducadas se recalculan"""
+        cache = ResultCache(ttl=0)
+        cache.validate(policy, 'Password1')
+        cache.validate(policy, 'Password1')
+        assert cache.hits == 0
+        assert cache.stats()['expirations'] == 1
+
+    def test_entry_shared_between_languages(self, policy):
+        """Test que la misma entrada sirve para respuestas en es y en"""
+        cache = ResultCache()
+        cache.validate(policy, 'Password1')
+        valid, results, score = cache.validate(policy, 'Password1', 'en')
+        assert (valid, score) == policy.validate('Password1')[::2]
+        assert results == policy.validate('Password1', 'en')[1]
+        assert cache.hits == 1
+
+    def test_key_depends_on_context(self, policy):
+        """Test que el contexto forma parte de la clave, sin guardarlo en claro"""
+        cache = ResultCache()
+        assert cache.validate(policy, 'Jsmith#2024x')[0]
+        assert not cache.validate(policy, 'Jsmith#2024x', context={'username': 'jsmith'})[0]
+        cache.validate(policy, 'Jsmith#2024x', context={'username': 'JSmith'})
+        assert cache.hits == 1 and len(cache) == 2
+        assert 'jsmith' not in repr(list(cache._entries))
+
+    def test_key_is_unambiguous(self, policy):
+        """Test que una contraseña con separadores no coincide con otra con contexto"""
+        cache = ResultCache()
+        assert cache.validate(policy, 'Jsmith#2024x\0username\1jsmith')[0]
+        assert not cache.validate(policy, 'Jsmith#2024x', context={'username': 'jsmith'})[0]
+        assert cache.misses == 2
+        # Surrogates sueltos (JSON los admite) también tienen clave propia
+        assert cache.key(policy, '\ud800') != cache.key(policy, '\ud801')
+
+    def test_invalid_size(self):
+        """Test que el tamaño debe ser positivo"""
+        with pytest.raises(ValueError):
+            ResultCache(maxsize=0)
+
+    def test_estimate_cached_with_result(self, policy, monkeypatch):
+        """Test que la estimación se calcula una vez y se guarda con el resultado"""
+        import strength
+        calls = []
+        estimate = strength.estimate
+        monkeypatch.setattr(strength, 'estimate', lambda p: calls.append(p) or estimate(p))
+        cache = ResultCache()
+        # compact() no la necesita; assess() la añade a la entrada existente
+        cache.compact(policy, 'Password1')
+        assert calls == []
+        first = cache.assess(policy, 'Password1')
+        second = cache.assess(policy, 'Password1')
+        assert first == second
+        assert first[1] == estimate('Password1').as_dict()
+        assert len(calls) == 1
+        assert (cache.hits, cache.misses) == (2, 1)
+
+    def test_no_estimate_when_overlong(self, monkeypatch):
+        """Test que no se estima una contraseña mayor que max_length"""
+        import strength
+        monkeypatch.setattr(strength, 'estimate', lambda p: pytest.fail('estimado'))
+        policy = PasswordValidator().min_length(8).max_length(16).compile()
+        result, estimate = ResultCache().assess(policy, 'a' * 100)
+        assert result.overlong and estimate is None
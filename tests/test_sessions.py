@@ -0,0 +1,133 @@
+import random
+
+import pytest
+
+from sessions import IncrementalValidator, SessionStore
+from validator import PasswordValidator
+
+
+@pytest.fixture
+def policy():
+    return PasswordValidator().min_length(8).max_length(20).has_uppercase()\
+        .has_lowercase().has_digits().has_symbols().no_spaces().compile()
+
+
+class TestIncrementalValidator:
+    """Tests para la validación incremental"""
+
+    def test_initial_state_matches_validate(self, policy):
+        """Test que el estado inicial coincide con validate()"""
+        session = IncrementalValidator(policy, 'MyP@ss1')
+        assert session.result == policy.validate('MyP@ss1')
+
+    def test_random_edits_match_full_validation(self, policy):
+        """Test que cualquier secuencia de ediciones da el mismo resultado"""
+        rnd = random.Random(42)
+        alphabet = 'abcxyz123qweAB !\nİ'
+        session = IncrementalValidator(policy)
+        password = ''
+        for _ in range(500):
+            pos = rnd.randint(0, len(password))
+            if password and rnd.random() < 0.4:
+                length = rnd.randint(0, len(password) - pos)
+                session.apply([{'op': 'delete', 'pos': pos, 'length': length}])
+                password = password[:pos] + password[pos + length:]
+            else:
+                text = ''.join(rnd.choice(alphabet) for _ in range(rnd.randint(1, 3)))
+                session.apply([{'op': 'insert', 'pos': pos, 'text': text}])
+                password = password[:pos] + text + password[pos:]
+            assert session.password == password
+            assert session.result == policy.validate(password)
+
+    def test_only_changed_rules_are_returned(self, policy):
+        """Test que sólo se devuelven las reglas que cambiaron"""
+        session = IncrementalValidator(policy, 'Abcdefg')
+        changes = session.apply([{'op': 'insert', 'pos': 7, 'text': 'h'}])
+        rules = [r['rule'] for r in changes['changed']]
+        assert 'Mínimo 8 caracteres' in rules
+        assert 'Al menos 1 mayúscula(s)' not in rules
+
+    def test_order_sent_when_rules_appear(self, policy):
+        """Test que se envía el orden cuando aparece o desaparece una regla"""
+        session = IncrementalValidator(policy, 'c7k')
+        changes = session.apply([{'op': 'insert', 'pos': 0, 'text': 'ab'}])
+        assert changes['order'][-1] == 'Sin secuencias obvias'
+        changes = session.apply([{'op': 'delete', 'pos': 0, 'length': 1}])
+        assert changes['removed'] == ['Sin secuencias obvias']
+
+    def test_invalid_edits(self, policy):
+        """Test que las ediciones inválidas se rechazan"""
+        session = IncrementalValidator(policy, 'abc')
+        with pytest.raises(ValueError):
+            session.apply([{'op': 'delete', 'pos': 2, 'length': 5}])
+        with pytest.raises(ValueError):
+            session.apply([{'op': 'replace', 'pos': 0}])
+        with pytest.raises(ValueError):
+            session.apply([{'op': 'insert', 'pos': 'x', 'text': 'a'}])
+
+    def test_invalid_edit_leaves_session_unchanged(self, policy):
+        """Test que una edición inválida en la lista no aplica las anteriores"""
+        session = IncrementalValidator(policy, 'MyP@ss1')
+        before = session.result
+        for edits in [[{'op': 'insert', 'pos': 7, 'text': 'xyz'},
+                       {'op': 'delete', 'pos': 20, 'length': 1}],
+                      [{'op': 'delete', 'pos': 0, 'length': 7},
+                       {'op': 'insert', 'pos': 1, 'text': 'a'}],
+                      [{'op': 'insert', 'pos': 0, 'text': 'a'}, {'op': 'replace', 'pos': 0}]]:
+            with pytest.raises(ValueError):
+                session.apply(edits)
+            assert session.password == 'MyP@ss1'
+            assert session.result == before == policy.validate('MyP@ss1')
+        # Las posiciones de cada edición cuentan sobre el resultado de las anteriores
+        session.apply([{'op': 'insert', 'pos': 7, 'text': 'xyz'},
+                       {'op': 'delete', 'pos': 9, 'length': 1}])
+        assert session.password == 'MyP@ss1xy'
+
+    def test_length_cap(self, policy):
+        """Test que no se acepta una edición que supera la longitud máxima"""
+        session = IncrementalValidator(policy, 'abc', max_length=5)
+        session.apply([{'op': 'insert', 'pos': 3, 'text': 'de'}])
+        with pytest.raises(ValueError):
+            session.apply([{'op': 'insert', 'pos': 0, 'text': 'x'}])
+        assert session.password == 'abcde'
+        # Reemplazar dentro del tope sí se permite
+        session.apply([{'op': 'delete', 'pos': 0, 'length': 2},
+                       {'op': 'insert', 'pos': 0, 'text': 'XY'}])
+        assert session.password == 'XYcde'
+        with pytest.raises(ValueError):
+            IncrementalValidator(policy, 'abcdef', max_length=5)
+
+
+class TestSessionStore:
+    """Tests para el almacén de sesiones"""
+
+    def test_create_get_close(self, policy):
+        """Test ciclo de vida de una sesión"""
+        store = SessionStore()
+        session_id, session = store.create(policy, 'abc')
+        assert store.get(session_id) is session
+        assert store.close(session_id)
+        assert store.get(session_id) is None
+
+    def test_bounded_size(self, policy):
+        """Test que se descartan las sesiones más antiguas al llenarse"""
+        store = SessionStore(max_sessions=2)
+        first, _ = store.create(policy)
+        store.create(policy)
+        store.create(policy)
+        assert len(store) == 2
+        assert store.get(first) is None
+
+    def test_idle_sessions_expire(self, policy):
+        """Test que las sesiones inactivas caducan"""
+        store = SessionStore(ttl=-1)
+        session_id, _ = store.create(policy)
+        assert store.get(session_id) is None
+
+    def test_max_length(self, policy):
+        """Test que las sesiones del almacén heredan su longitud máxima"""
+        store = SessionStore(max_length=8)
+        _, session = store.create(policy, 'abc')
+        assert session.max_length == 8
+        with pytest.raises(ValueError):
+            store.create(policy, 'x' * 9)
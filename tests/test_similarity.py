@@ -0,0 +1,100 @@
+import random
+
+import pytest
+
+from similarity import ContextMatcher, context_tokens, similar_fields, substring_distance
+
+
+def brute_force_distance(pattern, text):
+    # Programación dinámica clásica; la fila 0 vale 0 (la subcadena empieza en cualquier sitio)
+    previous = list(range(len(pattern) + 1))
+    best = previous[-1]
+    for c in text:
+        current = [0]
+        for i, p in enumerate(pattern, 1):
+            current.append(min(previous[i] + 1, current[i - 1] + 1,
+                               previous[i - 1] + (p != c)))
+        previous = current
+        best = min(best, current[-1])
+    return best
+
+
+class TestSubstringDistance:
+    """Tests para la distancia de edición bit-paralela"""
+
+    def test_exact_and_edited(self):
+        """Test subcadena exacta, con una sustitución y con un borrado"""
+        assert substring_distance('smith', 'xxsmithyy') == 0
+        assert substring_distance('smith', 'xxsmythyy') == 1
+        assert substring_distance('smith', 'xxsmthyy') == 1
+        assert substring_distance('smith', '') == 5
+
+    def test_matches_dynamic_programming(self):
+        """Test que Myers coincide con la programación dinámica"""
+        rnd = random.Random(7)
+        for _ in range(500):
+            pattern = ''.join(rnd.choice('abc') for _ in range(rnd.randint(1, 12)))
+            text = ''.join(rnd.choice('abcd') for _ in range(rnd.randint(0, 30)))
+            assert substring_distance(pattern, text) == brute_force_distance(pattern, text)
+
+    def test_long_pattern(self):
+        """Test patrones de más de 64 caracteres (enteros de Python sin límite)"""
+        pattern = 'abcdefghij' * 8
+        text = 'zz' + pattern[:40] + 'X' + pattern[41:] + 'zz'
+        assert substring_distance(pattern, text) == 1
+
+
+class TestContextTokens:
+    """Tests para la extracción de tokens del contexto"""
+
+    def test_fields_and_email(self):
+        """Test palabras, parte local del email y palabras unidas"""
+        tokens = context_tokens({'username': 'JSmith', 'email': 'john.smith@acme.com'})
+        assert tokens == (('username', 'jsmith'), ('email', 'john'), ('email', 'smith'),
+                          ('email', 'johnsmith'))
+
+    def test_short_and_repeated_tokens(self):
+        """Test que se descartan tokens cortos y repetidos"""
+        assert context_tokens(['Al Bo', 'ana', 'ANA']) == (('context', 'albo'), ('context', 'ana'))
+        assert context_tokens({'username': None}) == ()
+
+    def test_rejects_non_text(self):
+        """Test que un valor que no es texto da TypeError"""
+        with pytest.raises(TypeError):
+            context_tokens({'username': 42})
+        with pytest.raises(TypeError):
+            context_tokens(42)
+
+
+class TestContextMatcher:
+    """Tests para la búsqueda de tokens en contraseñas"""
+
+    def test_contains_and_near_matches(self):
+        """Test token contenido, con una edición y sin parecido"""
+        matcher = ContextMatcher(context_tokens({'username': 'maria', 'company': 'Contoso'}))
+        assert matcher.match('Maria2024!') == ('username',)
+        assert matcher.match('xxMaryaxx') == ('username',)
+        assert matcher.match('C0ntoso#1') == ('company',)
+        assert matcher.match('Kp9#vLqz2W') == ()
+
+    def test_short_tokens_need_exact_match(self):
+        """Test que los tokens cortos sólo cuentan si aparecen tal cual"""
+        matcher = ContextMatcher(context_tokens({'username': 'ana'}), max_distance=2)
+        assert matcher.match('xxanaxx') == ('username',)
+        assert matcher.match('xxanexx') == ()
+
+    def test_matches_brute_force(self):
+        """Test que el filtro por trozos no pierde coincidencias"""
+        rnd = random.Random(3)
+        for _ in range(300):
+            token = ''.join(rnd.choice('abcd') for _ in range(rnd.randint(4, 10)))
+            password = ''.join(rnd.choice('abcde') for _ in range(rnd.randint(0, 24)))
+            matcher = ContextMatcher((('username', token),), max_distance=2)
+            allowed = min(2, len(token) // 4)
+            expected = brute_force_distance(token, password) <= allowed
+            assert bool(matcher.match(password)) == expected
+
+    def test_similar_fields(self):
+        """Test atajo similar_fields() con un solo texto"""
+        assert similar_fields('johnsmith!', 'John Smith') == ['context']
+        assert similar_fields('johnsmith!', 'John Smith', min_token_length=10) == []
@@ -0,0 +1,69 @@
+import time
+
+import pytest
+
+from strength import StrengthEstimator, estimate, ranked_dictionary
+
+
+class TestStrengthEstimator:
+    """Tests para el estimador de fortaleza por patrones"""
+
+    def test_repeated_password_is_weak(self):
+        """Test que 'Aa1!aaaaaa' puntúa mucho menos que una cadena aleatoria"""
+        weak = estimate('Aa1!aaaaaa')
+        random_like = estimate('x7$Kq!9zLm')
+        assert weak.guesses_log10 < random_like.guesses_log10 - 3
+        assert weak.score < random_like.score
+
+    @pytest.mark.parametrize('password, pattern', [
+        ('password', 'dictionary'),
+        ('drowssap', 'dictionary'),
+        ('abcdef', 'sequence'),
+        ('aaaaaaaa', 'repeat'),
+        ('asdfghjkl', 'spatial'),
+        ('19/08/1991', 'date'),
+    ])
+    def test_detects_patterns(self, password, pattern):
+        """Test que cada tipo de patrón se reconoce"""
+        result = estimate(password)
+        assert [m['pattern'] for m in result.sequence] == [pattern]
+        assert result.score <= 1
+
+    def test_sequence_covers_password(self):
+        """Test que la descomposición cubre toda la contraseña"""
+        password = 'Password2024qwerty!'
+        result = estimate(password)
+        assert ''.join(m['token'] for m in result.sequence) == password
+
+    def test_empty_password(self):
+        """Test contraseña vacía"""
+        result = estimate('')
+        assert result.guesses == 1
+        assert result.score == 0
+
+    def test_custom_dictionary(self):
+        """Test diccionarios personalizados"""
+        estimator = StrengthEstimator({'empresa': ranked_dictionary(['acmecorp'])})
+        result = estimator.estimate('acmecorp')
+        assert result.sequence[0]['dictionary'] == 'empresa'
+
+    def test_length_budget(self):
+        """Test que sólo se analiza el prefijo permitido"""
+        estimator = StrengthEstimator(max_length=8)
+        result = estimator.estimate('password' + 'x' * 20)
+        assert result.truncated
+        assert result.sequence[-1]['pattern'] == 'bruteforce'
+
+    def test_very_long_input(self):
+        """Test que una entrada enorme no desborda la estimación"""
+        result = StrengthEstimator().estimate('Aa1!' * 20000)
+        assert result.truncated and result.score == 4
+        assert result.guesses_log10 < 400
+
+    def test_time_budget_bounds_latency(self):
+        """Test que una entrada patológica respeta el presupuesto de tiempo"""
+        estimator = StrengthEstimator(time_budget=0.005)
+        started = time.perf_counter()
+        result = estimator.estimate('ab' * 32)
+        assert time.perf_counter() - started < 0.5
+        assert result.guesses > 0
@@ -50,9 +50,9 @@ class TestPasswordGeneratorEdgeCases:
         validator = PasswordValidator()
         validator.has_uppercase(5).has_lowercase(5).has_digits(5)
 
-        # Debe generar una contraseña válida aunque sea más larga de lo pedido
-        password = validator.generate_password(10)
-        assert len(password) >= 10
+        # Los mínimos suman 15: ninguna contraseña de 10 caracteres los cumple
+        with pytest.raises(ValueError):
+            validator.generate_password(10)
 
 
 class TestValidatorMessageVariations:
@@ -315,3 +315,280 @@ def test_generate_each_rule_type(self):
         # Contar caracteres no alfanuméricos
         non_alnum = sum(1 for c in p4 if not c.isalnum())
         assert non_alnum >= 1  # Al menos algún símbolo        
+
+
+class TestCompiledPolicy:
+    """Tests para el plan compilado de validación"""
+
+    def test_compile_is_cached(self):
+        """Test que compile() reutiliza el plan mientras no cambien las reglas"""
+        validator = PasswordValidator()
+        validator.min_length(8).has_digits()
+        assert validator.compile() is validator.compile()
+
+    def test_compile_after_new_rule(self):
+        """Test que añadir una regla genera un plan nuevo"""
+        validator = PasswordValidator()
+        validator.min_length(8)
+        first = validator.compile()
+        validator.has_symbols()
+        assert validator.compile() is not first
+        assert len(validator.validate('abcdefgh!')[1]) >= 2
+
+    def test_compiled_policy_is_immutable(self):
+        """Test que el plan compilado no se puede modificar"""
+        compiled = PasswordValidator().min_length(8).compile()
+        with pytest.raises(AttributeError):
+            compiled.rules = ()
+
+    def test_compiled_matches_validator(self):
+        """Test que el plan compilado devuelve lo mismo que validate()"""
+        validator = PasswordValidator()
+        validator.min_length(8).max_length(12).has_uppercase(2)\
+                 .has_lowercase().has_digits().has_symbols().no_spaces()
+        compiled = validator.compile()
+        for pwd in ['MyP@ssw0rd123', 'abc 123', 'AAAbbb111!!!', '', 'ÀÉ٣!x']:
+            assert compiled.validate(pwd) == validator.validate(pwd)
+
+    def test_scan_counts(self):
+        """Test conteos de la pasada única"""
+        compiled = PasswordValidator().has_uppercase().has_lowercase()\
+            .has_digits().has_symbols().no_spaces().compile()
+        scan = compiled.scan('Ab1! 2c')
+        assert scan.length == 7
+        assert scan.counts == {'U': 1, 'l': 2, 'd': 2, 's': 1, ' ': 1}
+
+    def test_repetition_ignores_newlines(self):
+        """Test que los saltos de línea repetidos no cuentan como repetición"""
+        compiled = PasswordValidator().compile()
+        assert not compiled.scan('a\n\n\nb').has_repetition
+        assert compiled.scan('a111b').has_repetition
+
+
+class TestValidateMany:
+    """Tests para la validación por lotes"""
+
+    def test_validate_many_matches_validate(self):
+        """Test que validate_many produce lo mismo que validate"""
+        validator = PasswordValidator()
+        validator.min_length(8).has_uppercase().has_digits()
+        passwords = ['Password1', 'short', 'NoDigitsHere']
+        assert list(validator.validate_many(passwords)) == \
+            [validator.validate(p) for p in passwords]
+
+    def test_validate_many_is_lazy(self):
+        """Test que validate_many consume la entrada bajo demanda"""
+        validator = PasswordValidator().min_length(8)
+        consumed = []
+
+        def passwords():
+            for pwd in ['uno', 'dos', 'tres']:
+                consumed.append(pwd)
+                yield pwd
+
+        results = validator.validate_many(passwords())
+        next(results)
+        assert consumed == ['uno']
+
+
+class TestSequenceDetection:
+    """Tests para la detección de secuencias y recorridos de teclado"""
+
+    def _sequence_result(self, validator, password):
+        results = validator.validate(password)[1]
+        return next((r for r in results if r['rule'] == 'Sin secuencias obvias'), None)
+
+    def test_spans_are_reported(self):
+        """Test que el resultado incluye los tramos detectados"""
+        result = self._sequence_result(PasswordValidator(), 'Zq!7654xQAZ')
+        assert result['spans'] == [[3, 7], [8, 11]]
+
+    def test_keyboard_layouts(self):
+        """Test recorridos de teclado QWERTY, AZERTY y QWERTZ"""
+        validator = PasswordValidator()
+        for pwd in ['P!qwerty9', 'P!azerty9', 'P!qwertz9', 'P!ytrewq9']:
+            assert self._sequence_result(validator, pwd) is not None
+
+    def test_banned_tokens(self):
+        """Test que los tokens prohibidos cuentan como secuencia"""
+        validator = PasswordValidator().banned_tokens(['Contoso'])
+        first = validator.compile()
+        assert self._sequence_result(validator, 'my-CONTOSO-9')['spans'] == [[3, 10]]
+        validator.banned_tokens('tailspin')
+        assert validator.compile() is not first
+        assert first.fingerprint != validator.compile().fingerprint
+        assert self._sequence_result(PasswordValidator(), 'my-CONTOSO-9') is None
+
+
+class TestCharacterClasses:
+    """Tests para la semántica configurable de dígitos y símbolos"""
+
+    def test_default_semantics_unchanged(self):
+        """Test que por defecto '²' es dígito y '€' no es símbolo"""
+        compiled = PasswordValidator().has_digits().has_symbols().compile()
+        assert compiled.scan('a²€').counts == {'d': 1, 's': 0}
+
+    def test_unicode_symbols(self):
+        """Test que con symbols='unicode' los símbolos no ASCII cuentan"""
+        validator = PasswordValidator().has_symbols().character_classes(symbols='unicode')
+        assert validator.validate('contraseña€')[1][0]['passed']
+        assert validator.compile().fingerprint != \
+            PasswordValidator().has_symbols().compile().fingerprint
+
+    def test_decimal_digits(self):
+        """Test que con digits='decimal' los superíndices no son dígitos"""
+        validator = PasswordValidator().has_digits().character_classes(digits='decimal')
+        assert not validator.validate('clave²')[1][0]['passed']
+        assert validator.validate('clave٣')[1][0]['passed']
+
+    def test_invalid_semantics(self):
+        """Test que una semántica desconocida se rechaza al configurarla"""
+        with pytest.raises(ValueError):
+            PasswordValidator().character_classes(digits='roman')
+
+
+class TestFailFast:
+    """Tests para is_valid() y los resultados compactos"""
+
+    PASSWORDS = ['', 'abc', 'MyP@ssw0rd', 'Tr0ub4dor&3', 'password', 'Aaa1!xyzw',
+                 'Zq!7 k2LmN', 'Zq!7k2LmN€', 'x' * 60, 'Kp9#vLqz2W']
+
+    def test_matches_validate(self):
+        """Test que is_valid() coincide siempre con validate()[0]"""
+        policy = PasswordValidator().min_length(8).max_length(50).has_uppercase()\
+            .has_lowercase().has_digits().has_symbols().no_spaces().compile()
+        for password in self.PASSWORDS:
+            assert policy.is_valid(password) == policy.validate(password)[0], password
+
+    def test_stops_at_first_failure(self, monkeypatch):
+        """Test que un fallo de longitud no llega a clasificar caracteres"""
+        policy = PasswordValidator().min_length(8).has_digits().compile()
+        monkeypatch.setattr(policy.classifier, 'counts', None)
+        assert not policy.is_valid('abc')
+
+    def test_compact_mask(self):
+        """Test máscara de reglas superadas, conteos y renderizado perezoso"""
+        policy = PasswordValidator().min_length(8).has_digits(2).compile()
+        assert policy.rule_ids == ('min_length', 'digits', 'common', 'sequence', 'repetition',
+                                   'context')
+        result = policy.compact('abcdefgh1')
+        assert result.counts == (9, 1)
+        assert result.failed_rules() == ['digits', 'sequence']
+        assert not result.valid and result.passed(0)
+        assert result.render() == policy.validate('abcdefgh1')
+        assert policy.compact('Kp9#vLqz2W').valid
+
+
+class TestPolicyExport:
+    """Tests para la definición exportada de la política"""
+
+    def test_rules_as_ranges(self):
+        """Test que cada regla se exporta como rango sobre un conteo"""
+        definition = PasswordValidator().min_length(8).max_length(20).has_symbols(2)\
+            .no_spaces().export()
+        assert definition['schema'] == 1
+        assert definition['rules'] == [
+            {'id': 'min_length', 'count': 'length', 'min': 8, 'max': None},
+            {'id': 'max_length', 'count': 'length', 'min': 0, 'max': 20},
+            {'id': 'symbols', 'count': 'symbol', 'min': 2, 'max': None},
+            {'id': 'no_spaces', 'count': 'space', 'min': 0, 'max': 0},
+        ]
+        assert definition['max_score'] == 40
+        assert definition['common'] == 'list'
+        assert definition['max_length'] == 20
+
+    def test_version_follows_policy(self):
+        """Test que la versión cambia con la política y los tokens viajan plegados"""
+        validator = PasswordValidator().min_length(8)
+        first = validator.export()
+        validator.banned_tokens(['Contoso'])
+        second = validator.export()
+        assert first['version'] != second['version']
+        assert second['version'] == validator.compile().fingerprint
+        assert second['sequences']['banned'] == ['contoso']
+        assert 'qwertyuiop' in second['sequences']['lines']
+
+    def test_common_count(self):
+        """Test consulta de la lista de comunes sin validar el resto"""
+        policy = PasswordValidator().compile()
+        assert policy.common_count('PassWord') == 1
+        assert policy.common_count('Tr0ub4dor&3') == 0
+
+    def test_compact_common_matches_common_count(self):
+        """Test que CompactResult.common coincide con common_count() sin volver a consultar"""
+        policy = PasswordValidator().min_length(8).check_dictionary(['dragon']).compile()
+        for password in ['PassWord', 'Tr0ub4dor&3', 'MyDr@gon99', 'abc']:
+            assert policy.compact(password).common == policy.common_count(password)
+
+
+class TestContextSimilarity:
+    """Tests para el parecido con los datos del usuario"""
+
+    def test_validate_with_context(self):
+        """Test que validate() rechaza contraseñas parecidas al contexto"""
+        validator = PasswordValidator().min_length(8)
+        context = {'username': 'jsmith', 'email': 'maria.lopez@acme.com'}
+        is_valid, results, _ = validator.validate('MariaL0pez#2024', 'en', context)
+        assert not is_valid
+        assert results[-1] == {'rule': 'Not similar to your details', 'passed': False,
+                               'message': 'Too similar to your details: email'}
+        assert validator.validate('MariaL0pez#2024')[0]
+
+    def test_compact_and_is_valid(self):
+        """Test que compact() e is_valid() aplican la misma regla"""
+        policy = PasswordValidator().min_length(8).compile()
+        result = policy.compact('jsmyth!2024x', {'username': 'JSmith'})
+        assert result.failed_rules() == ['context'] and result.similar == ('username',)
+        assert result.as_dict()['similar'] == ['username']
+        assert not policy.is_valid('jsmyth!2024x', {'username': 'JSmith'})
+        assert policy.is_valid('Kp9#vLqz2W', {'username': 'JSmith'})
+        assert policy.compact('Kp9#vLqz2W', {}).valid
+
+    def test_configurable_distance(self):
+        """Test que context_similarity() cambia la distancia y la huella"""
+        default = PasswordValidator().min_length(8)
+        exact = PasswordValidator().min_length(8).context_similarity(max_distance=0)
+        assert default.compile().fingerprint != exact.compile().fingerprint
+        assert not default.is_valid('jsmyth!2024x', {'username': 'jsmith'})
+        assert exact.is_valid('jsmyth!2024x', {'username': 'jsmith'})
+        with pytest.raises(ValueError):
+            PasswordValidator().context_similarity(max_distance=-1)
+
+
+class TestOverlongInput:
+    """Tests para las contraseñas más largas que max_length"""
+
+    def policy(self):
+        return PasswordValidator().min_length(8).max_length(50).has_digits()\
+            .check_dictionary(['dragon']).compile()
+
+    def test_only_counts_are_evaluated(self, monkeypatch):
+        """Test que sólo falla max_length y no se buscan patrones ni palabras"""
+        policy = self.policy()
+        monkeypatch.setattr(policy.sequences, 'find_spans', None)
+        monkeypatch.setattr(policy.dictionary, 'search', None)
+        password = 'dragon111' * 10
+        result = policy.compact(password, {'username': 'dragon'})
+        assert result.failed_rules() == ['max_length']
+        assert result.counts == (90, 90, 30) and result.overlong
+        assert result.as_dict()['overlong'] is True
+        assert not policy.dictionary_match(password)
+        is_valid, results, _ = policy.validate(password)
+        assert not is_valid and len(results) == 3
+
+    def test_within_limit_unchanged(self):
+        """Test que en el límite se siguen haciendo todas las comprobaciones"""
+        policy = self.policy()
+        result = policy.compact('dragon111' + 'x' * 41)
+        assert not result.overlong and result.dictionary
+        assert policy.overlong(51) and not policy.overlong(50)
+        assert PasswordValidator().min_length(8).compile().max_length is None
+
+    def test_work_is_bounded(self):
+        """Test que una entrada enorme se resuelve en tiempo de contar caracteres"""
+        import time
+        policy = self.policy()
+        password = 'Aa1!qwerty' * 100_000
+        started = time.perf_counter()
+        assert not policy.validate(password, context={'username': 'qwerty'})[0]
+        assert time.perf_counter() - started < 0.5
@@ -1,6 +1,560 @@
+import hashlib
+import os
 import re
-import string
-from typing import List, Dict, Tuple
+from time import perf_counter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from breach_index import BreachIndex
+from charclass import DIGIT, LOWER, SPACE, SYMBOL, UPPER, classifier
+from dictionary import WordDictionary
+from generator import BulkGenerator, bulk_generator, length_bounds, requirements
+from messages import CATALOGS, DEFAULT_LANGUAGE, Catalog, compile_catalog
+from patterns import MIN_PATTERN_LENGTH, build_automaton, fold, sequence_lines
+from similarity import (DEFAULT_MAX_DISTANCE, DEFAULT_MIN_TOKEN_LENGTH, Context,
+                        ContextMatcher, build_matcher, context_tokens)
+
+# Lineal en la práctica: en cada posición compara como mucho con los dos
+# siguientes caracteres y search() se detiene en la primera coincidencia
+_REPETITION = re.compile(r'(.)\1{2,}')
+
+# Tipo de regla -> clase contada; la clase None cuenta la longitud.
+# Etiquetas y mensajes están en messages.py
+_RULE_SPECS = {
+    'min_length': None,
+    'max_length': None,
+    'uppercase': UPPER,
+    'lowercase': LOWER,
+    'digits': DIGIT,
+    'symbols': SYMBOL,
+    'no_spaces': SPACE,
+}
+
+# Reglas adicionales, en el orden de sus bits tras las de la política
+EXTRA_RULES = ('common', 'sequence', 'repetition', 'context')
+
+_UNBOUNDED = float('inf')
+
+# Versión del formato de CompiledPolicy.export()
+EXPORT_SCHEMA = 1
+
+# Clase contada -> nombre en la definición exportada
+_COUNTED = {None: 'length', UPPER: 'upper', LOWER: 'lower', DIGIT: 'digit',
+            SYMBOL: 'symbol', SPACE: 'space'}
+
+# Fases de validate() que se cronometran cuando hay un observador (ver metrics.py)
+CHECKS = ('classes', 'sequences', 'repetition', 'rules', 'common', 'context')
+
+_observer = None
+_cached_observer = None
+
+
+def set_observer(observer, cached=None):
+    """Instala observer(policy, password, context) -> CompactResult en lugar de
+    compact() (y por tanto de validate()) y cached(policy, result), al que se
+    avisa de los resultados servidos desde una caché; None los quita."""
+    global _observer, _cached_observer
+    _observer = observer
+    _cached_observer = cached
+
+
+def observe_cached(policy, result):
+    """Notifica un resultado que no pasó por compact() (ver result_cache.py)."""
+    if _cached_observer is not None:
+        _cached_observer(policy, result)
+
+
+class Scan:
+    """Estadísticas de una contraseña obtenidas en CompiledPolicy.scan()."""
+
+    __slots__ = ('length', 'lowered', 'counts', 'sequence_spans',
+                 'has_repetition')
+
+    def __init__(self, length, lowered, counts, sequence_spans, has_repetition):
+        self.length = length
+        self.lowered = lowered
+        self.counts = counts
+        # Tramos [inicio, fin) con secuencias, recorridos de teclado o tokens prohibidos
+        self.sequence_spans = sequence_spans
+        self.has_repetition = has_repetition
+
+    @property
+    def has_sequence(self) -> bool:
+        return bool(self.sequence_spans)
+
+
+class CompactResult:
+    """Resultado de validación sin mensajes: un bit por regla superada.
+
+    Los bits siguen el orden de policy.rule_ids (reglas de la política y
+    después EXTRA_RULES); `counts` guarda el conteo de cada regla de la
+    política. Las etiquetas y mensajes sólo se generan en render(), en el
+    idioma pedido, así que el mismo resultado sirve para cualquier idioma.
+    """
+
+    __slots__ = ('policy', 'mask', 'counts', 'score', 'breaches', 'spans', 'similar',
+                 'dictionary', 'overlong')
+
+    def __init__(self, policy, mask, counts, score, breaches=0, spans=(), similar=(),
+                 dictionary=False, overlong=False):
+        self.policy = policy
+        self.mask = mask
+        self.counts = counts
+        self.score = score
+        # Apariciones en filtraciones (sólo con índice de filtraciones)
+        self.breaches = breaches
+        self.spans = spans
+        # Campos del contexto a los que se parece la contraseña
+        self.similar = similar
+        # Falló `common` por contener una palabra del diccionario
+        self.dictionary = dictionary
+        # Superaba max_length: sólo se evaluaron los conteos (ver CompiledPolicy.resolve)
+        self.overlong = overlong
+
+    @property
+    def valid(self) -> bool:
+        return self.mask == self.policy.full_mask
+
+    def passed(self, index: int) -> bool:
+        return bool(self.mask >> index & 1)
+
+    @property
+    def common(self) -> int:
+        """Como policy.common_count(), sin volver a consultar (0 si superaba max_length)."""
+        if self.breaches or self.dictionary or self.overlong:
+            return self.breaches
+        # Sin índice de filtraciones sólo puede fallar por la lista de comunes
+        return int(not self.passed(len(self.policy.rules)))
+
+    def failed_rules(self) -> List[str]:
+        """Identificadores (policy.rule_ids) de las reglas falladas."""
+        mask = self.mask
+        return [rule for i, rule in enumerate(self.policy.rule_ids) if not mask >> i & 1]
+
+    def as_dict(self) -> Dict:
+        """Formato compacto para JSON; los textos se describen en policy.describe()."""
+        data = {
+            'version': self.policy.fingerprint,
+            'valid': self.mask == self.policy.full_mask,
+            'mask': self.mask,
+            'counts': list(self.counts),
+            'score': self.score
+        }
+        if self.spans:
+            data['spans'] = [list(span) for span in self.spans]
+        if self.breaches:
+            data['breaches'] = self.breaches
+        if self.similar:
+            data['similar'] = list(self.similar)
+        if self.dictionary:
+            data['dictionary'] = True
+        if self.overlong:
+            data['overlong'] = True
+        return data
+
+    def render(self, language: str = DEFAULT_LANGUAGE) -> Tuple[bool, List[Dict], int]:
+        """(válida, resultados, puntuación) con el formato de validate()."""
+        catalog = self.policy.catalog(language)
+        mask = self.mask
+        results = []
+        bit = 1
+        for (label, prefix, passed_message, failed_message), found in zip(catalog.rules,
+                                                                         self.counts):
+            passed = bool(mask & bit)
+            if prefix is not None:
+                message = prefix + str(found)
+            else:
+                message = passed_message if passed else failed_message
+            results.append({
+                'rule': label,
+                'passed': passed,
+                'message': message
+            })
+            bit <<= 1
+
+        # Las reglas adicionales sólo aparecen cuando fallan
+        if not mask & bit:
+            label, message = catalog.common
+            if self.breaches:
+                message = catalog.breached.format(self.breaches)
+            elif self.dictionary:
+                message = catalog.dictionary
+            results.append({'rule': label, 'passed': False, 'message': message})
+        bit <<= 1
+        if not mask & bit:
+            label, message = catalog.sequence
+            results.append({
+                'rule': label,
+                'passed': False,
+                'message': message,
+                'spans': [list(span) for span in self.spans]
+            })
+        bit <<= 1
+        if not mask & bit:
+            label, message = catalog.repetition
+            results.append({'rule': label, 'passed': False, 'message': message})
+        bit <<= 1
+        if not mask & bit:
+            label, message = catalog.context
+            results.append({'rule': label, 'passed': False,
+                            'message': message.format(', '.join(self.similar))})
+
+        return mask == self.policy.full_mask, results, self.score
+
+
+class CompiledPolicy:
+    """Plan inmutable de validación generado por PasswordValidator.compile().
+
+    Las reglas se resuelven una sola vez (etiquetas incluidas) y cada
+    contraseña se clasifica en una única traducción por tabla (bytes si es
+    ASCII); los conteos de todas las reglas salen de esa cadena de clases.
+    is_valid() recorre las comprobaciones de la más barata a la más cara y
+    se detiene en el primer fallo. Una contraseña más larga que max_length
+    ya es inválida: sólo se cuentan sus clases (trabajo lineal en C) y no se
+    buscan patrones, palabras ni parecidos en ella.
+    """
+
+    __slots__ = ('rules', 'common_passwords', 'breach_index', 'banned_tokens',
+                 'classifier', 'sequences', 'fingerprint', 'rule_ids', 'full_mask',
+                 'rule_checks', '_plan', '_classes', '_max_score', '_length_checks', '_class_checks',
+                 '_catalogs', 'similarity', 'dictionary', 'max_length')
+
+    def __init__(self, rules, common_passwords, breach_index=None, banned_tokens=(),
+                 digits='numeric', symbols='ascii',
+                 similarity=(DEFAULT_MAX_DISTANCE, DEFAULT_MIN_TOKEN_LENGTH),
+                 dictionary=None):
+        plan = []
+        rule_ids = []
+        classes = set()
+        messages = CATALOGS[DEFAULT_LANGUAGE]['rules']
+        for rule, value in rules:
+            if rule not in _RULE_SPECS:
+                continue
+            cls = _RULE_SPECS[rule]
+            label, prefix = messages[rule]
+            rule_ids.append(rule)
+            if cls is not None:
+                classes.add(cls)
+            # Cada regla queda como un rango [low, high] sobre un conteo
+            if rule == 'max_length':
+                low, high = 0, value
+            elif rule == 'no_spaces':
+                low, high = 0, 0
+            else:
+                low, high = value, _UNBOUNDED
+            plan.append((cls, low, high, label.format(value), prefix))
+        set_ = super().__setattr__
+        set_('rules', tuple(rules))
+        set_('common_passwords', frozenset(common_passwords))
+        set_('breach_index', breach_index)
+        # Palabras buscadas como subcadenas, con variantes leet (dictionary.py)
+        set_('dictionary', dictionary)
+        set_('banned_tokens', tuple(sorted({''.join(map(fold, token))
+                                            for token in banned_tokens if token})))
+        # Qué cuenta como dígito o símbolo fuera de ASCII (ver charclass.py)
+        set_('classifier', classifier(digits, symbols))
+        # El autómata se comparte entre políticas con los mismos tokens
+        set_('sequences', build_automaton(self.banned_tokens))
+        # Huella estable de todo lo que influye en el resultado
+        breach_id = getattr(breach_index, 'path', None)
+        definition = repr((self.rules, sorted(self.common_passwords), breach_id))
+        if self.banned_tokens:
+            definition += repr(self.banned_tokens)
+        if (digits, symbols) != ('numeric', 'ascii'):
+            definition += repr((digits, symbols))
+        # (distancia máxima, longitud mínima de token) para el contexto
+        set_('similarity', tuple(similarity))
+        if self.similarity != (DEFAULT_MAX_DISTANCE, DEFAULT_MIN_TOKEN_LENGTH):
+            definition += repr(self.similarity)
+        if dictionary is not None:
+            definition += repr(dictionary.source_id)
+        set_('fingerprint', hashlib.sha256(definition.encode('utf-8')).hexdigest()[:16])
+        # Un bit por regla (ver CompactResult)
+        set_('rule_ids', tuple(rule_ids) + EXTRA_RULES)
+        set_('full_mask', (1 << len(self.rule_ids)) - 1)
+        set_('_plan', tuple(plan))
+        # (clase contada o None para la longitud, mínimo, máximo) de cada regla,
+        # en el orden de rule_ids: lo que necesita quien evalúe los conteos fuera (batch.py)
+        set_('rule_checks', tuple((cls, low, high) for cls, low, high, _, _ in plan))
+        # Límite superior de longitud (None sin max_length)
+        set_('max_length', length_bounds(rules)[1])
+        set_('_classes', tuple(sorted(classes)))
+        set_('_max_score', len(rules) * 10)
+        # Para is_valid(): primero la longitud (gratis), luego los conteos
+        set_('_length_checks', tuple((low, high) for cls, low, high, _, _ in plan
+                                     if cls is None))
+        set_('_class_checks', tuple((cls, low, high) for cls, low, high, _, _ in plan
+                                    if cls is not None))
+        # Idioma -> catálogo ya resuelto para estas reglas
+        set_('_catalogs', {})
+
+    def __setattr__(self, name, value):
+        raise AttributeError('CompiledPolicy es inmutable')
+
+    def __reduce__(self):
+        # Permite enviar la política a otros procesos (se recompila allí)
+        return (type(self), (self.rules, self.common_passwords, self.breach_index,
+                             self.banned_tokens, self.classifier.digits,
+                             self.classifier.symbols, self.similarity, self.dictionary))
+
+    def scan(self, password: str, laps: List[float] = None) -> Scan:
+        # Una sola pasada de clasificación; los conteos salen de ella.
+        # Con `laps` se anota perf_counter() al terminar cada fase (CHECKS)
+        counts = self.classifier.counts(password, self._classes)
+        if laps is not None:
+            laps.append(perf_counter())
+        if self.overlong(len(password)):
+            # Ya falla max_length: no se recorre una entrada que puede ser enorme
+            if laps is not None:
+                laps.extend((laps[-1], laps[-1]))
+            return Scan(len(password), '', counts, [], False)
+        spans = self.sequences.find_spans(password)
+        if laps is not None:
+            laps.append(perf_counter())
+        has_repetition = _REPETITION.search(password) is not None
+        if laps is not None:
+            laps.append(perf_counter())
+        return Scan(len(password), password.lower(), counts, spans, has_repetition)
+
+    @property
+    def counted_classes(self) -> Tuple[str, ...]:
+        """Clases de carácter (charclass) que cuentan las reglas."""
+        return self._classes
+
+    @property
+    def max_score(self) -> int:
+        """Puntuación bruta máxima: la de validate() es un porcentaje de ella."""
+        return self._max_score
+
+    def overlong(self, length: int) -> bool:
+        """Si una contraseña de `length` caracteres supera max_length."""
+        return self.max_length is not None and length > self.max_length
+
+    def catalog(self, language: str = DEFAULT_LANGUAGE) -> Catalog:
+        try:
+            return self._catalogs[language]
+        except KeyError:
+            catalog = self._catalogs[language] = compile_catalog(self.rules, language)
+            return catalog
+
+    def describe(self, language: str = DEFAULT_LANGUAGE) -> Dict:
+        """Textos de cada bit de CompactResult, para renderizar en el cliente.
+
+        Las reglas con `prefix` muestran prefijo + conteo; las demás `passed`
+        o `failed`. Las últimas (EXTRA_RULES) sólo se muestran al fallar; el
+        mensaje de `context` lleva {} para los campos parecidos.
+        """
+        catalog = self.catalog(language)
+        rules = []
+        for rule, (label, prefix, passed_message, failed_message) in zip(self.rule_ids,
+                                                                         catalog.rules):
+            if prefix is not None:
+                rules.append({'id': rule, 'label': label, 'prefix': prefix})
+            else:
+                rules.append({'id': rule, 'label': label, 'passed': passed_message,
+                              'failed': failed_message})
+        for rule, (label, message) in zip(EXTRA_RULES, (catalog.common, catalog.sequence,
+                                                        catalog.repetition, catalog.context)):
+            rules.append({'id': rule, 'label': label, 'failed': message})
+            if rule == 'common':
+                rules[-1]['breached'] = catalog.breached
+                rules[-1]['dictionary'] = catalog.dictionary
+        return {'version': self.fingerprint, 'language': language, 'rules': rules}
+
+    def export(self) -> Dict:
+        """Definición versionada de las reglas estructurales (JSON serializable).
+
+        Basta para reproducir fuera del servidor la máscara, los conteos y la
+        puntuación de compact(): cada regla es un rango [min, max] sobre un
+        conteo, las secuencias son los tramos de `lines` de longitud >=
+        `min_length` más los tokens prohibidos (plegados), y las repeticiones
+        son `repetition` caracteres iguales seguidos. Con más de `max_length`
+        caracteres sólo se evalúan las reglas. La lista de comunes, el
+        índice de filtraciones y el diccionario no se exportan: common_count()
+        y dictionary_match() los consultan, y `common` indica si el resultado
+        de common_count() es un número de filtraciones.
+        """
+        return {
+            'schema': EXPORT_SCHEMA,
+            'version': self.fingerprint,
+            'rules': [{'id': rule, 'count': _COUNTED[cls], 'min': low,
+                       'max': None if high == _UNBOUNDED else high}
+                      for rule, (cls, low, high, _, _) in zip(self.rule_ids, self._plan)],
+            'max_score': self._max_score,
+            'classes': self.classifier.export(),
+            'sequences': {'lines': sequence_lines(), 'min_length': MIN_PATTERN_LENGTH,
+                          'banned': list(self.banned_tokens)},
+            'repetition': 3,
+            'common': 'list' if self.breach_index is None else 'breach_index',
+            'max_length': self.max_length,
+        }
+
+    def common_count(self, password: str) -> int:
+        """Apariciones en filtraciones, o 1/0 si está en la lista de comunes."""
+        if self.breach_index is not None:
+            return self.breach_index.count(password)
+        return int(password.lower() in self.common_passwords)
+
+    def dictionary_match(self, password: str) -> bool:
+        """Si la contraseña contiene una palabra del diccionario (con variantes leet).
+
+        Las que superan max_length no se buscan: la política ya las rechaza.
+        """
+        return (self.dictionary is not None and not self.overlong(len(password))
+                and self.dictionary.search(password))
+
+    def context_matcher(self, context: Context) -> Optional[ContextMatcher]:
+        """Tokens del contexto del usuario compilados (None si no aporta ninguno)."""
+        if not context:
+            return None
+        max_distance, min_length = self.similarity
+        tokens = context_tokens(context, min_length)
+        return build_matcher(tokens, max_distance) if tokens else None
+
+    def validate(self, password: str, language: str = DEFAULT_LANGUAGE,
+                 context: Context = None) -> Tuple[bool, List[Dict], int]:
+        return self.compact(password, context).render(language)
+
+    def compact(self, password: str, context: Context = None) -> CompactResult:
+        """Resultado sin mensajes; render() los genera en el idioma pedido."""
+        if _observer is not None:
+            return _observer(self, password, context)
+        return self.resolve(password, self.scan(password), context=context)
+
+    def evaluate(self, password: str, scan: Scan,
+                 laps: List[float] = None) -> Tuple[bool, List[Dict], int]:
+        # Aplica las reglas a unas estadísticas ya calculadas (p. ej. incrementales)
+        return self.resolve(password, scan, laps).render()
+
+    def resolve(self, password: str, scan: Scan, laps: List[float] = None,
+                context: Context = None) -> CompactResult:
+        length = scan.length
+        counts = scan.counts
+        found_counts = []
+        mask = 0
+        bit = 1
+        score = 0
+
+        for cls, low, high, _, _ in self._plan:
+            found = length if cls is None else counts[cls]
+            found_counts.append(found)
+            if low <= found <= high:
+                mask |= bit
+                score += 10
+            bit <<= 1
+        if laps is not None:
+            laps.append(perf_counter())
+
+        if self.overlong(length):
+            # Falla max_length; las comprobaciones adicionales no se evalúan
+            # (cuentan como superadas y no aparecen en render())
+            if laps is not None:
+                laps.extend((laps[-1], laps[-1]))
+            mask |= ((1 << len(EXTRA_RULES)) - 1) * bit
+            return CompactResult(self, mask, tuple(found_counts),
+                                 self._percentage(score), overlong=True)
+
+        # Validaciones adicionales
+        breaches = 0
+        if self.breach_index is not None:
+            # El índice de filtraciones sustituye a la lista de comunes
+            breaches = self.breach_index.count(password)
+            common = breaches > 0
+        else:
+            common = scan.lowered in self.common_passwords
+        # Si no es común entera, se buscan palabras del diccionario dentro
+        dictionary = not common and self.dictionary_match(password)
+        if common or dictionary:
+            score = max(0, score - 20)
+        else:
+            mask |= bit
+        bit <<= 1
+        if laps is not None:
+            laps.append(perf_counter())
+
+        if scan.sequence_spans:
+            score = max(0, score - 10)
+        else:
+            mask |= bit
+        bit <<= 1
+
+        if scan.has_repetition:
+            score = max(0, score - 10)
+        else:
+            mask |= bit
+        bit <<= 1
+
+        # Parecido con los datos del usuario; sin contexto siempre se supera
+        matcher = self.context_matcher(context)
+        similar = matcher.match(password) if matcher is not None else ()
+        if similar:
+            score = max(0, score - 20)
+        else:
+            mask |= bit
+        if laps is not None:
+            laps.append(perf_counter())
+
+        return CompactResult(self, mask, tuple(found_counts), self._percentage(score),
+                             breaches, tuple(scan.sequence_spans), similar, dictionary)
+
+    def _percentage(self, score: int) -> int:
+        max_score = self._max_score
+        return int((score / max(max_score, 1)) * 100) if max_score > 0 else 0
+
+    def is_valid(self, password: str, context: Context = None) -> bool:
+        """validate(password)[0] sin construir resultados: comprueba de lo más
+        barato a lo más caro y se detiene en el primer fallo."""
+        length = len(password)
+        for low, high in self._length_checks:
+            if not low <= length <= high:
+                return False
+        if self.breach_index is None and password.lower() in self.common_passwords:
+            return False
+        if self._class_checks:
+            counts = self.classifier.counts(password, self._classes)
+            for cls, low, high in self._class_checks:
+                if not low <= counts[cls] <= high:
+                    return False
+        if _REPETITION.search(password) is not None:
+            return False
+        if self.sequences.search(password):
+            return False
+        matcher = self.context_matcher(context)
+        if matcher is not None and matcher.match(password):
+            return False
+        if self.dictionary_match(password):
+            return False
+        # Lo más caro al final: hash y búsqueda en el índice en disco
+        if self.breach_index is not None and self.breach_index.count(password):
+            return False
+        return True
+
+    def validate_many(self, passwords: Iterable[str]) -> Iterator[Tuple[bool, List[Dict], int]]:
+        # Generador perezoso: un resultado por contraseña, sin acumularlos
+        validate = self.validate
+        for password in passwords:
+            yield validate(password)
+
+    def generator(self) -> BulkGenerator:
+        """Generador que cumple las reglas, secuencias, tokens y repeticiones por construcción.
+
+        ValueError si las secuencias y tokens prohibidos no dejan formar contraseñas.
+        """
+        return bulk_generator(requirements(self.rules), self.banned_tokens,
+                              *length_bounds(self.rules))
+
+    def _generated_ok(self, password: str) -> bool:
+        # Lo que no se garantiza al construir: lista de comunes, diccionario y filtraciones
+        return not self.common_count(password) and not self.dictionary_match(password)
+
+    def generate_password(self, length: int = 12) -> str:
+        # ValueError si ninguna contraseña de esa longitud cumple la política
+        return self.generator().generate(length, self._generated_ok)
+
+    def generate_many(self, count: int, length: int = 12) -> Iterator[str]:
+        # Generador perezoso: las contraseñas se producen por lotes de os.urandom.
+        # La longitud se comprueba al llamar, no al pedir la primera
+        return self.generator().generate_many(count, length, self._generated_ok)
+
 
 class PasswordValidator:
     def __init__(self):
@@ -11,6 +565,13 @@ class PasswordValidator:
             'baseball', 'iloveyou', 'master', 'sunshine', 'ashley',
             'bailey', 'passw0rd', 'shadow', '123123', '654321'
         ]
+        self.breach_index = None
+        self.dictionary = None
+        self.banned = []
+        self.char_semantics = {'digits': 'numeric', 'symbols': 'ascii'}
+        self.similarity = (DEFAULT_MAX_DISTANCE, DEFAULT_MIN_TOKEN_LENGTH)
+        self._compiled = None
+        self._compiled_key = None
     
     def min_length(self, length: int):
         self.rules.append(('min_length', length))
@@ -40,143 +601,75 @@ class PasswordValidator:
         self.rules.append(('no_spaces', None))
         return self
     
-    def validate(self, password: str) -> Tuple[bool, List[Dict], int]:
-        results = []
-        score = 0
-        max_score = len(self.rules) * 10
-        
-        for rule, value in self.rules:
-            if rule == 'min_length':
-                passed = len(password) >= value
-                results.append({
-                    'rule': f'Mínimo {value} caracteres',
-                    'passed': passed,
-                    'message': f'Longitud actual: {len(password)}'
-                })
-                if passed:
-                    score += 10
-            
-            elif rule == 'max_length':
-                passed = len(password) <= value
-                results.append({
-                    'rule': f'Máximo {value} caracteres',
-                    'passed': passed,
-                    'message': f'Longitud actual: {len(password)}'
-                })
-                if passed:
-                    score += 10
-            
-            elif rule == 'uppercase':
-                count = sum(1 for c in password if c.isupper())
-                passed = count >= value
-                results.append({
-                    'rule': f'Al menos {value} mayúscula(s)',
-                    'passed': passed,
-                    'message': f'Encontradas: {count}'
-                })
-                if passed:
-                    score += 10
-            
-            elif rule == 'lowercase':
-                count = sum(1 for c in password if c.islower())
-                passed = count >= value
-                results.append({
-                    'rule': f'Al menos {value} minúscula(s)',
-                    'passed': passed,
-                    'message': f'Encontradas: {count}'
-                })
-                if passed:
-                    score += 10
-            
-            elif rule == 'digits':
-                count = sum(1 for c in password if c.isdigit())
-                passed = count >= value
-                results.append({
-                    'rule': f'Al menos {value} número(s)',
-                    'passed': passed,
-                    'message': f'Encontrados: {count}'
-                })
-                if passed:
-                    score += 10
-            
-            elif rule == 'symbols':
-                count = sum(1 for c in password if c in string.punctuation)
-                passed = count >= value
-                results.append({
-                    'rule': f'Al menos {value} símbolo(s)',
-                    'passed': passed,
-                    'message': f'Encontrados: {count}'
-                })
-                if passed:
-                    score += 10
-            
-            elif rule == 'no_spaces':
-                passed = ' ' not in password
-                results.append({
-                    'rule': 'Sin espacios',
-                    'passed': passed,
-                    'message': 'Espacios encontrados' if not passed else 'OK'
-                })
-                if passed:
-                    score += 10
-        
-        # Validaciones adicionales
-        if password.lower() in self.common_passwords:
-            results.append({
-                'rule': 'No usar contraseñas comunes',
-                'passed': False,
-                'message': 'Esta es una contraseña muy común'
-            })
-            score = max(0, score - 20)
-        
-        # Detectar secuencias
-        sequences = ['abc', '123', 'qwe', 'asd', 'zxc']
-        has_sequence = any(seq in password.lower() for seq in sequences)
-        if has_sequence:
-            results.append({
-                'rule': 'Sin secuencias obvias',
-                'passed': False,
-                'message': 'Contiene secuencias como abc, 123, etc.'
-            })
-            score = max(0, score - 10)
-        
-        # Detectar repeticiones
-        has_repetition = bool(re.search(r'(.)\1{2,}', password))
-        if has_repetition:
-            results.append({
-                'rule': 'Sin caracteres repetidos',
-                'passed': False,
-                'message': 'Contiene 3+ caracteres repetidos'
-            })
-            score = max(0, score - 10)
-        
-        all_passed = all(r['passed'] for r in results)
-        score_percentage = int((score / max(max_score, 1)) * 100) if max_score > 0 else 0
-        
-        return all_passed, results, score_percentage
-    
+    def check_breaches(self, index):
+        # index: BreachIndex o ruta a un índice generado con breach_index.py
+        if isinstance(index, (str, os.PathLike)):
+            index = BreachIndex(index)
+        self.breach_index = index
+        return self
+
+    def check_dictionary(self, dictionary):
+        # dictionary: WordDictionary, ruta a un diccionario generado con
+        # dictionary.py o lista de palabras (se compila en memoria)
+        if isinstance(dictionary, (str, os.PathLike)):
+            dictionary = WordDictionary(dictionary)
+        elif not isinstance(dictionary, WordDictionary):
+            dictionary = WordDictionary.from_words(dictionary)
+        self.dictionary = dictionary
+        return self
+
+    def banned_tokens(self, tokens: Iterable[str]):
+        # Palabras prohibidas (nombre de la empresa, del producto...), sin distinguir mayúsculas
+        if isinstance(tokens, str):
+            tokens = [tokens]
+        self.banned.extend(tokens)
+        return self
+
+    def character_classes(self, digits: str = 'numeric', symbols: str = 'ascii'):
+        # Semántica Unicode de dígitos ('numeric', 'decimal', 'ascii') y
+        # símbolos ('ascii', 'unicode'); ver charclass.py
+        classifier(digits, symbols)
+        self.char_semantics = {'digits': digits, 'symbols': symbols}
+        return self
+
+    def context_similarity(self, max_distance: int = DEFAULT_MAX_DISTANCE,
+                           min_token_length: int = DEFAULT_MIN_TOKEN_LENGTH):
+        # Ediciones admitidas al buscar los datos del usuario en la contraseña
+        # y longitud mínima de los tokens que se buscan; ver similarity.py
+        if max_distance < 0 or min_token_length < 1:
+            raise ValueError('max_distance debe ser >= 0 y min_token_length >= 1')
+        self.similarity = (max_distance, min_token_length)
+        return self
+
+    def compile(self) -> CompiledPolicy:
+        # Se recompila solo si cambió algo de lo que depende el plan
+        key = (tuple(self.rules), tuple(self.common_passwords), self.breach_index,
+               tuple(self.banned), tuple(self.char_semantics.items()), self.similarity,
+               self.dictionary)
+        if self._compiled is None or self._compiled_key != key:
+            self._compiled = CompiledPolicy(self.rules, self.common_passwords,
+                                            self.breach_index, self.banned,
+                                            similarity=self.similarity,
+                                            dictionary=self.dictionary,
+                                            **self.char_semantics)
+            self._compiled_key = key
+        return self._compiled
+
+    def validate(self, password: str, language: str = DEFAULT_LANGUAGE,
+                 context: Context = None) -> Tuple[bool, List[Dict], int]:
+        return self.compile().validate(password, language, context)
+
+    def is_valid(self, password: str, context: Context = None) -> bool:
+        return self.compile().is_valid(password, context)
+
+    def export(self) -> Dict:
+        return self.compile().export()
+
+    def validate_many(self, passwords: Iterable[str]) -> Iterator[Tuple[bool, List[Dict], int]]:
+        return self.compile().validate_many(passwords)
+
     def generate_password(self, length: int = 12) -> str:
-        chars = string.ascii_letters + string.digits + string.punctuation
-        import random   #pragma: no cover
-        
-        password = []
-        
-        # Asegurar que cumple las reglas
-        for rule, value in self.rules:
-            if rule == 'uppercase':
-                password.extend(random.choices(string.ascii_uppercase, k=value))
-            elif rule == 'lowercase':
-                password.extend(random.choices(string.ascii_lowercase, k=value))
-            elif rule == 'digits':
-                password.extend(random.choices(string.digits, k=value))
-            elif rule == 'symbols':
-                password.extend(random.choices(string.punctuation, k=value))
-        
-        # Completar hasta la longitud deseada
-        remaining = length - len(password)
-        if remaining > 0:
-            password.extend(random.choices(chars, k=remaining))
-        
-        # Mezclar
-        random.shuffle(password)
-        return ''.join(password)
+        return self.compile().generate_password(length)
+
+    def generate_many(self, count: int, length: int = 12) -> Iterator[str]:
+        return self.compile().generate_many(count, length)